@@ -0,0 +1,63 @@
+"""order_history append-only: migrate legacy status_history JSON
+
+Revision ID: 3c9e51a7d2f4
+Revises: 7806fe1744b1
+Create Date: 2026-10-19 12:00:00.000000
+
+Переносить записи з JSON колонки orders.status_history в таблицю
+order_history (пропускаючи ті, що вже були продубльовані адмін-панеллю)
+та видаляє колонку. Історія статусів далі тільки дописується в order_history.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e51a7d2f4'
+down_revision: Union[str, None] = '7806fe1744b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Legacy JSON записи: {"old_status", "new_status", "changed_by", "changed_at", "comment"}
+    # Адмін-панель писала і в order_history, і в JSON - такі дублікати пропускаємо
+    op.execute("""
+        INSERT INTO order_history (order_id, manager_id, manager_name, previous_status, new_status, comment, changed_at)
+        SELECT
+            o.id,
+            u.id,
+            COALESCE(u.name, u.email, u.phone, 'Legacy'),
+            COALESCE(e.value->>'old_status', ''),
+            e.value->>'new_status',
+            e.value->>'comment',
+            COALESCE((e.value->>'changed_at')::timestamptz, o.updated_at)
+        FROM orders o
+        CROSS JOIN LATERAL json_array_elements(o.status_history) AS e(value)
+        LEFT JOIN users u ON u.id = NULLIF(e.value->>'changed_by', '')::int
+        WHERE o.status_history IS NOT NULL
+          AND json_typeof(o.status_history) = 'array'
+          AND e.value->>'new_status' IS NOT NULL
+          AND NOT EXISTS (
+              SELECT 1 FROM order_history h
+              WHERE h.order_id = o.id
+                AND h.previous_status = COALESCE(e.value->>'old_status', '')
+                AND h.new_status = e.value->>'new_status'
+                AND abs(extract(epoch FROM h.changed_at - COALESCE((e.value->>'changed_at')::timestamptz, o.updated_at))) < 60
+          )
+    """)
+
+    op.drop_column('orders', 'status_history')
+
+    # Складений індекс покриває і фільтр по order_id, і сортування по changed_at
+    op.create_index('ix_order_history_order_id_changed_at', 'order_history', ['order_id', 'changed_at'], unique=False)
+    op.drop_index('ix_order_history_order_id', table_name='order_history')
+
+
+def downgrade() -> None:
+    op.create_index('ix_order_history_order_id', 'order_history', ['order_id'], unique=False)
+    op.drop_index('ix_order_history_order_id_changed_at', table_name='order_history')
+    # Дані не відновлюються - історія залишається в order_history
+    op.add_column('orders', sa.Column('status_history', sa.JSON(), nullable=True))
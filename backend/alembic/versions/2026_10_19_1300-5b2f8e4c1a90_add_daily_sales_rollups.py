@@ -0,0 +1,71 @@
+"""add daily_sales_rollups
+
+Revision ID: 5b2f8e4c1a90
+Revises: 3c9e51a7d2f4
+Create Date: 2026-10-19 13:00:00.000000
+
+Денний rollup продажів для адмін-статистики. Початкове заповнення -
+з таблиці orders (дні в часовому поясі магазину Europe/Kyiv).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b2f8e4c1a90'
+down_revision: Union[str, None] = '3c9e51a7d2f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'daily_sales_rollups',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=50), nullable=False),
+        sa.Column('payment_method', sa.String(length=50), nullable=False),
+        sa.Column('delivery_type', sa.String(length=20), nullable=False),
+        sa.Column('promo_code_id', sa.Integer(), nullable=False),
+        sa.Column('orders_count', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('discount', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('new_customers', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'status', 'payment_method', 'delivery_type', 'promo_code_id', name='uq_daily_sales_rollups_key')
+    )
+    op.create_index(op.f('ix_daily_sales_rollups_day'), 'daily_sales_rollups', ['day'], unique=False)
+    # Пошук попередніх замовлень клієнта (new_customers)
+    op.create_index('ix_orders_customer_phone_id', 'orders', ['customer_phone', 'id'], unique=False)
+
+    op.execute("""
+        INSERT INTO daily_sales_rollups (
+            day, status, payment_method, delivery_type, promo_code_id,
+            orders_count, revenue, discount, new_customers, updated_at
+        )
+        SELECT
+            (o.created_at AT TIME ZONE 'Europe/Kyiv')::date,
+            o.status,
+            COALESCE(o.payment_method, 'unknown'),
+            CASE WHEN o.address_id IS NULL THEN 'pickup' ELSE 'delivery' END,
+            COALESCE(o.promo_code_id, 0),
+            count(*),
+            COALESCE(sum(o.total_amount), 0),
+            COALESCE(sum(o.discount), 0),
+            count(*) FILTER (WHERE NOT EXISTS (
+                SELECT 1 FROM orders e
+                WHERE e.customer_phone = o.customer_phone AND e.id < o.id
+            )),
+            now()
+        FROM orders o
+        GROUP BY 1, 2, 3, 4, 5
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_customer_phone_id', table_name='orders')
+    op.drop_index(op.f('ix_daily_sales_rollups_day'), table_name='daily_sales_rollups')
+    op.drop_table('daily_sales_rollups')
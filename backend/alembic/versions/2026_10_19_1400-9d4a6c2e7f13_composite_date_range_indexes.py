@@ -0,0 +1,49 @@
+"""composite indexes for date-range listings
+
+Revision ID: 9d4a6c2e7f13
+Revises: 5b2f8e4c1a90
+Create Date: 2026-10-19 14:00:00.000000
+
+Фільтри по датах тепер напіввідкриті діапазони по created_at (без func.date),
+тому списки з фільтром по статусу / користувачу можуть йти по складених
+індексах. Одноколонкові індекси, які стали їх префіксом, видаляються.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a6c2e7f13'
+down_revision: Union[str, None] = '5b2f8e4c1a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_orders_status_created_at', 'orders', ['status', 'created_at'], unique=False)
+    op.create_index('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at'], unique=False)
+    op.drop_index('ix_orders_status', table_name='orders')
+    op.drop_index('ix_orders_user_id', table_name='orders')
+
+    op.create_index('ix_audit_logs_user_id_created_at', 'audit_logs', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_audit_logs_resource_type_created_at', 'audit_logs', ['resource_type', 'created_at'], unique=False)
+    op.drop_index('ix_audit_logs_user_id', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_resource_type', table_name='audit_logs')
+
+    op.create_index('ix_order_history_changed_at', 'order_history', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_history_changed_at', table_name='order_history')
+
+    op.create_index('ix_audit_logs_resource_type', 'audit_logs', ['resource_type'], unique=False)
+    op.create_index('ix_audit_logs_user_id', 'audit_logs', ['user_id'], unique=False)
+    op.drop_index('ix_audit_logs_resource_type_created_at', table_name='audit_logs')
+    op.drop_index('ix_audit_logs_user_id_created_at', table_name='audit_logs')
+
+    op.create_index('ix_orders_user_id', 'orders', ['user_id'], unique=False)
+    op.create_index('ix_orders_status', 'orders', ['status'], unique=False)
+    op.drop_index('ix_orders_user_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_status_created_at', table_name='orders')
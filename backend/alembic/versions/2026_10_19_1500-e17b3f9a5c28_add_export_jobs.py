@@ -0,0 +1,47 @@
+"""add export_jobs
+
+Revision ID: e17b3f9a5c28
+Revises: 9d4a6c2e7f13
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e17b3f9a5c28'
+down_revision: Union[str, None] = '9d4a6c2e7f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'export_jobs',
+        sa.Column('id', sa.String(length=36), nullable=False),
+        sa.Column('kind', sa.String(length=50), nullable=False),
+        sa.Column('format', sa.String(length=10), nullable=False),
+        sa.Column('params', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('processed_rows', sa.Integer(), nullable=False),
+        sa.Column('total_rows', sa.Integer(), nullable=True),
+        sa.Column('file_path', sa.String(length=500), nullable=True),
+        sa.Column('file_size', sa.Integer(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['created_by'], ['users.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_export_jobs_created_at'), 'export_jobs', ['created_at'], unique=False)
+    op.create_index(op.f('ix_export_jobs_created_by'), 'export_jobs', ['created_by'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_export_jobs_created_by'), table_name='export_jobs')
+    op.drop_index(op.f('ix_export_jobs_created_at'), table_name='export_jobs')
+    op.drop_table('export_jobs')
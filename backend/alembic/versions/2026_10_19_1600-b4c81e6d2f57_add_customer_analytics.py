@@ -0,0 +1,54 @@
+"""add customer_rfm and cohort_retention
+
+Revision ID: b4c81e6d2f57
+Revises: e17b3f9a5c28
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c81e6d2f57'
+down_revision: Union[str, None] = 'e17b3f9a5c28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'customer_rfm',
+        sa.Column('customer_phone', sa.String(length=20), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('first_order_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_order_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('recency_days', sa.Integer(), nullable=False),
+        sa.Column('frequency', sa.Integer(), nullable=False),
+        sa.Column('monetary', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('r_score', sa.Integer(), nullable=False),
+        sa.Column('f_score', sa.Integer(), nullable=False),
+        sa.Column('m_score', sa.Integer(), nullable=False),
+        sa.Column('segment', sa.String(length=30), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('customer_phone')
+    )
+    op.create_index('ix_customer_rfm_segment_monetary', 'customer_rfm', ['segment', 'monetary'], unique=False)
+    op.create_table(
+        'cohort_retention',
+        sa.Column('cohort_month', sa.Date(), nullable=False),
+        sa.Column('period', sa.Integer(), nullable=False),
+        sa.Column('customers', sa.Integer(), nullable=False),
+        sa.Column('retention', sa.Numeric(precision=6, scale=4), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('cohort_month', 'period')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cohort_retention')
+    op.drop_index('ix_customer_rfm_segment_monetary', table_name='customer_rfm')
+    op.drop_table('customer_rfm')
@@ -4,7 +4,7 @@ from fastapi import APIRouter
 from app.api.v1.endpoints.admin import (
     categories, products, orders, users, reviews,
     promotions, promo_codes,
-    statistics, settings, audit_logs, newsletter
+    statistics, settings, audit_logs, newsletter, exports
 )
 
 admin_router = APIRouter()
@@ -60,6 +60,11 @@ admin_router.include_router(
     prefix="/audit-logs",
     tags=["admin-audit-logs"]
 )
+admin_router.include_router(
+    exports.router,
+    prefix="/exports",
+    tags=["admin-exports"]
+)
 admin_router.include_router(
     newsletter.router,
     prefix="/newsletter",
@@ -1,15 +1,17 @@
 """Admin endpoints для Audit Log"""
 from typing import List, Optional
 from datetime import datetime, date
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from pydantic import BaseModel, ConfigDict
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
-from app.models.user import User
+from app.core.user_cache import AuthUser
 from app.models.audit_log import AuditLog
+from app.api.v1.endpoints.admin.exports import ExportJobResponse, start_export
+from app.utils.dates import date_range_conditions
 
 router = APIRouter()
 
@@ -41,7 +43,7 @@ async def get_audit_logs(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список audit logs"""
     query = select(AuditLog)
@@ -57,11 +59,7 @@ async def get_audit_logs(
     if user_id:
         conditions.append(AuditLog.user_id == user_id)
     
-    if date_from:
-        conditions.append(func.date(AuditLog.created_at) >= date_from)
-    
-    if date_to:
-        conditions.append(func.date(AuditLog.created_at) <= date_to)
+    conditions.extend(date_range_conditions(AuditLog.created_at, date_from, date_to))
     
     if conditions:
         query = query.where(and_(*conditions))
@@ -74,21 +72,29 @@ async def get_audit_logs(
     return logs
 
 
-@router.get("/export")
+@router.get("/export", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def export_audit_logs(
+    request: Request,
     format: str = Query("csv", pattern="^(csv|excel)$"),
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    user_id: Optional[int] = None,
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
-    """Експорт audit logs"""
-    # TODO: Реалізувати експорт в CSV/Excel
+    """Експорт audit logs - фонова задача.
     
-    return {
-        "message": "Експорт audit logs",
-        "format": format,
-        "date_from": date_from,
-        "date_to": date_to
+    Повертає стан задачі; прогрес - GET /admin/exports/{id},
+    файл - за download_url після завершення.
+    """
+    params = {
+        "action": action,
+        "resource_type": resource_type,
+        "user_id": user_id,
+        "date_from": date_from.isoformat() if date_from else None,
+        "date_to": date_to.isoformat() if date_to else None,
     }
-
+    params = {key: value for key, value in params.items() if value is not None}
+    return await start_export(db, request, "audit_logs", format, params, current_user)
@@ -7,8 +7,8 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException
-from app.models.user import User
 from app.models.category import Category
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 
@@ -31,7 +31,7 @@ async def get_categories(
     limit: int = Query(100, ge=1, le=1000),
     is_active: bool = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список категорій (адмін)"""
     query = select(Category)
@@ -50,7 +50,7 @@ async def get_categories(
 async def create_category(
     category_data: CategoryCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Створити категорію"""
     # Перевірка чи slug вже існує
@@ -91,12 +91,77 @@ async def create_category(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Статичні шляхи - до /{category_id}, інакше "reorder" і "bulk-delete" потрапляють у нього (422)
+@router.put("/bulk-delete", status_code=status.HTTP_204_NO_CONTENT)
+async def bulk_delete_categories(
+    request: BulkDeleteRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Масове видалення категорій"""
+    # Валідація: обмежуємо кількість категорій для безпеки
+    if not request.ids:
+        raise BadRequestException("Список ID не може бути порожнім")
+    
+    if len(request.ids) > 100:
+        raise BadRequestException("Максимальна кількість категорій для масового видалення: 100")
+    
+    # Валідація: перевірка що всі ID - це числа
+    if not all(isinstance(id, int) and id > 0 for id in request.ids):
+        raise BadRequestException("Всі ID повинні бути додатніми числами")
+    
+    result = await db.execute(
+        select(Category).where(Category.id.in_(request.ids))
+    )
+    categories = result.scalars().all()
+    
+    # Правильний спосіб видалення в SQLAlchemy 2.0 async
+    if categories:
+        category_ids = [c.id for c in categories]
+        await db.execute(delete(Category).where(Category.id.in_(category_ids)))
+    
+    await db.commit()
+    
+    return None
+
+
+@router.put("/reorder", status_code=status.HTTP_204_NO_CONTENT)
+async def reorder_categories(
+    request: ReorderRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Зміна порядку категорій"""
+    positions = {}
+    for item in request.items:
+        category_id = item.get("id")
+        position = item.get("position")
+        
+        if category_id and position is not None:
+            try:
+                positions[int(category_id)] = position
+            except (TypeError, ValueError):
+                continue
+    
+    # Усі категорії одним SELECT замість запиту на кожен елемент
+    if positions:
+        result = await db.execute(
+            select(Category).where(Category.id.in_(positions))
+        )
+        for category in result.scalars().all():
+            category.position = positions[category.id]
+    
+    await db.commit()
+    
+    return None
+
+
 @router.put("/{category_id}", response_model=CategoryResponse)
 async def update_category(
     category_id: int,
     category_data: CategoryUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити категорію"""
     result = await db.execute(select(Category).where(Category.id == category_id))
@@ -132,7 +197,7 @@ async def update_category(
 async def delete_category(
     category_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Видалити категорію"""
     result = await db.execute(select(Category).where(Category.id == category_id))
@@ -150,62 +215,3 @@ async def delete_category(
     await db.commit()
     
     return None
-
-
-@router.put("/bulk-delete", status_code=status.HTTP_204_NO_CONTENT)
-async def bulk_delete_categories(
-    request: BulkDeleteRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
-):
-    """Масове видалення категорій"""
-    # Валідація: обмежуємо кількість категорій для безпеки
-    if not request.ids:
-        raise BadRequestException("Список ID не може бути порожнім")
-    
-    if len(request.ids) > 100:
-        raise BadRequestException("Максимальна кількість категорій для масового видалення: 100")
-    
-    # Валідація: перевірка що всі ID - це числа
-    if not all(isinstance(id, int) and id > 0 for id in request.ids):
-        raise BadRequestException("Всі ID повинні бути додатніми числами")
-    
-    result = await db.execute(
-        select(Category).where(Category.id.in_(request.ids))
-    )
-    categories = result.scalars().all()
-    
-    # Правильний спосіб видалення в SQLAlchemy 2.0 async
-    if categories:
-        category_ids = [c.id for c in categories]
-        await db.execute(delete(Category).where(Category.id.in_(category_ids)))
-    
-    await db.commit()
-    
-    return None
-
-
-@router.put("/reorder", status_code=status.HTTP_204_NO_CONTENT)
-async def reorder_categories(
-    request: ReorderRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
-):
-    """Зміна порядку категорій"""
-    for item in request.items:
-        category_id = item.get("id")
-        position = item.get("position")
-        
-        if category_id and position is not None:
-            result = await db.execute(
-                select(Category).where(Category.id == category_id)
-            )
-            category = result.scalar_one_or_none()
-            
-            if category:
-                category.position = position
-    
-    await db.commit()
-    
-    return None
-
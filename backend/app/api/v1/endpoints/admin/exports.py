@@ -0,0 +1,153 @@
+"""Admin endpoints для фонових експортів"""
+import logging
+from typing import List, Literal, Optional
+from datetime import datetime, date
+from pathlib import Path
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import FileResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+
+from app.database import get_db
+from app.core.config import settings
+from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
+from app.core.exceptions import NotFoundException, ConflictException
+from app.models.export_job import ExportJob
+from app.services.export import XLSX_MEDIA_TYPE
+from app.services.export_jobs import (
+    create_export_job,
+    enqueue_export_job,
+    export_download_name,
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class ExportJobCreate(BaseModel):
+    """Запит на фоновий експорт"""
+    kind: Literal["orders", "audit_logs"]
+    format: str = Field("csv", pattern="^(csv|excel)$")
+    date_from: Optional[date] = None
+    date_to: Optional[date] = None
+    statuses: Optional[List[str]] = None  # для orders
+    action: Optional[str] = None  # для audit_logs
+    resource_type: Optional[str] = None  # для audit_logs
+    user_id: Optional[int] = None  # для audit_logs
+
+
+class ExportJobResponse(BaseModel):
+    """Стан фонового експорту"""
+    id: str
+    kind: str
+    format: str
+    status: str
+    processed_rows: int
+    total_rows: Optional[int]
+    progress: float  # 0-100
+    file_size: Optional[int]
+    error: Optional[str]
+    created_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    download_url: Optional[str]
+
+
+def export_job_response(job: ExportJob, request: Request) -> ExportJobResponse:
+    if job.status == "completed":
+        progress = 100.0
+    elif job.total_rows:
+        progress = round(min(job.processed_rows / job.total_rows, 1) * 100, 1)
+    else:
+        progress = 0.0
+
+    download_url = None
+    if job.status == "completed":
+        download_url = str(request.url_for("download_export", job_id=job.id))
+
+    return ExportJobResponse(
+        id=job.id,
+        kind=job.kind,
+        format=job.format,
+        status=job.status,
+        processed_rows=job.processed_rows,
+        total_rows=job.total_rows,
+        progress=progress,
+        file_size=job.file_size,
+        error=job.error,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        download_url=download_url,
+    )
+
+
+async def start_export(
+    db: AsyncSession,
+    request: Request,
+    kind: str,
+    format: str,
+    params: dict,
+    user: AuthUser,
+) -> ExportJobResponse:
+    """Створити задачу експорту, зафіксувати її і поставити в чергу воркеру"""
+    job = await create_export_job(db, kind, format, params, user_id=user.id)
+    await db.commit()
+
+    try:
+        enqueue_export_job(job.id)
+    except Exception as e:
+        logger.error(f"Failed to enqueue export job {job.id}: {e}")
+        job.status = "failed"
+        job.error = "Не вдалося поставити експорт в чергу"
+        await db.commit()
+
+    await db.refresh(job)
+    return export_job_response(job, request)
+
+
+@router.post("", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_export(
+    export_data: ExportJobCreate,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Запустити фоновий експорт (CSV стиснений gzip або Excel)"""
+    params = export_data.model_dump(mode="json", exclude={"kind", "format"}, exclude_none=True)
+    return await start_export(db, request, export_data.kind, export_data.format, params, current_user)
+
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+async def get_export(
+    job_id: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Статус і прогрес експорту"""
+    job = await db.get(ExportJob, job_id, populate_existing=True)
+    if not job:
+        raise NotFoundException("Експорт не знайдено")
+    return export_job_response(job, request)
+
+
+@router.get("/{job_id}/download", name="download_export")
+async def download_export(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Завантажити готовий файл експорту"""
+    job = await db.get(ExportJob, job_id, populate_existing=True)
+    if not job:
+        raise NotFoundException("Експорт не знайдено")
+    if job.status != "completed" or not job.file_path:
+        raise ConflictException("Експорт ще не готовий")
+
+    file_path = Path(settings.UPLOAD_DIR) / job.file_path
+    if not file_path.is_file():
+        raise NotFoundException("Файл експорту вже видалено, запустіть експорт повторно")
+
+    media_type = XLSX_MEDIA_TYPE if job.format == "excel" else "application/gzip"
+    return FileResponse(file_path, media_type=media_type, filename=export_download_name(job))
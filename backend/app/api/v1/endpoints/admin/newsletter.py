@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.models.newsletter import NewsletterSubscriber
 from app.models.user import User
 from app.schemas.newsletter import NewsletterSubscriberResponse, NewsletterSendRequest
@@ -29,7 +30,7 @@ async def read_subscribers(
     db: AsyncSession = Depends(get_db),
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_admin_user),
+    current_user: AuthUser = Depends(get_current_admin_user),
 ) -> Any:
     """Retrieve newsletter subscribers."""
     result = await db.execute(select(NewsletterSubscriber).offset(skip).limit(limit))
@@ -41,7 +42,7 @@ async def send_newsletter(
     data: NewsletterSendRequest,
     background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user),
+    current_user: AuthUser = Depends(get_current_admin_user),
 ) -> Any:
     """Send newsletter to subscribers."""
     recipients = []
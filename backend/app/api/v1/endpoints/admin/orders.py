@@ -1,20 +1,33 @@
 """Admin endpoints для управління замовленнями"""
 from typing import List, Optional
 from datetime import datetime, date, timezone
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, func
+from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload, noload
 from pydantic import BaseModel
 import json
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user, get_current_manager_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.events import (
+    EventService,
+    ADMIN_ORDER_EVENTS_CHANNEL,
+    FINAL_ORDER_STATUSES,
+    SSE_KEEPALIVE,
+    format_sse,
+)
 from app.models.user import User
 from app.models.order import Order, OrderItem
 from app.models.order_history import OrderHistory
 from app.schemas.order import OrderResponse, OrderStatusUpdate, OrderHistoryLogResponse, OrderListResponse
+from app.services.order_hooks import on_order_status_changed
+from app.services.sales_rollup import record_order_status_change
+from app.services.export import ORDERS_EXPORT_HEADERS, export_response, orders_export_query
+from app.utils.dates import date_range_conditions, shop_today
 
 router = APIRouter()
 
@@ -41,7 +54,7 @@ async def get_orders(
     min_amount: Optional[float] = None,
     max_amount: Optional[float] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
     """Отримати список замовлень з фільтрацією"""
     # Використовуємо noload для "важких" зв'язків
@@ -62,11 +75,7 @@ async def get_orders(
              
         conditions.append(Order.status.in_(status_filter))
     
-    if date_from:
-        conditions.append(func.date(Order.created_at) >= date_from)
-    
-    if date_to:
-        conditions.append(func.date(Order.created_at) <= date_to)
+    conditions.extend(date_range_conditions(Order.created_at, date_from, date_to))
     
     if search:
         conditions.append(
@@ -101,7 +110,7 @@ async def get_history_log(
     limit: int = Query(50, ge=1, le=200),
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
     """
     Отримати повний журнал змін статусів (Audit Log).
@@ -146,22 +155,96 @@ async def get_history_log(
 async def export_orders(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
+    status_filter: Optional[List[str]] = Query(None, alias="status"),
     format: str = Query("csv", pattern="^(csv|excel)$"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
+):
+    """Експорт замовлень в CSV/Excel (потоково, без ліміту на кількість)"""
+    if status_filter and len(status_filter) == 1 and "," in status_filter[0]:
+        status_filter = status_filter[0].split(",")
+    
+    return export_response(
+        db,
+        orders_export_query(date_from, date_to, status_filter),
+        headers=ORDERS_EXPORT_HEADERS,
+        filename=f"orders_{date_from or 'all'}_{date_to or shop_today()}",
+        format=format,
+    )
+
+
+@router.get("/stream")
+async def stream_orders(
+    request: Request,
+    limit: int = Query(200, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
-    """Експорт замовлень"""
-    # TODO: Реалізувати експорт в CSV/Excel
-    # Поки що повертаємо пустий список
+    """Live-дошка замовлень (Server-Sent Events).
+    
+    Перша подія `snapshot` - відкриті замовлення у форматі OrderListResponse,
+    далі події `order_created` та `status_changed` з Redis pub/sub.
+    Замінює періодичне опитування GET /admin/orders вкладками менеджерів.
+    """
+    # Підписуємось ДО знімку, щоб не пропустити події між ними
+    # (локальна черга - окремого з'єднання з Redis не відкриває)
+    subscription = EventService.subscribe(ADMIN_ORDER_EVENTS_CHANNEL)
+    try:
+        result = await db.execute(
+            select(Order)
+            .options(
+                noload(Order.items),
+                noload(Order.history),
+                noload(Order.reviews),
+                noload(Order.address),
+                noload(Order.user)
+            )
+            .where(Order.status.not_in(FINAL_ORDER_STATUSES))
+            .order_by(Order.created_at.desc())
+            .limit(limit)
+        )
+        snapshot = [
+            OrderListResponse.model_validate(order).model_dump(mode="json")
+            for order in result.scalars().all()
+        ]
+    except Exception:
+        EventService.unsubscribe(subscription)
+        raise
+    
+    # Звільняємо з'єднання з БД - далі стрім живе тільки на подіях
+    await db.close()
+    
+    async def event_stream():
+        try:
+            yield format_sse({"orders": snapshot}, event="snapshot")
+            if subscription is None:
+                return
+            
+            async for event in EventService.listen(subscription):
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield SSE_KEEPALIVE
+                    continue
+                yield format_sse(event, event=event.get("type"))
+        finally:
+            EventService.unsubscribe(subscription)
     
-    return {"message": "Експорт буде реалізовано", "format": format}
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 async def get_order(
     order_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
     """Детальний перегляд замовлення"""
     result = await db.execute(
@@ -188,7 +271,7 @@ async def update_order_status(
     order_id: int,
     status_data: OrderStatusUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
     """Змінити статус замовлення"""
     """Змінити статус замовлення"""
@@ -222,7 +305,8 @@ async def update_order_status(
         
         # 3. ЗАПИСУЄМО В ІСТОРІЮ (Audit Log)
         # Ensure manager_name is not None
-        manager_name = current_user.name or current_user.email or f"Manager #{current_user.id}"
+        manager = await db.get(User, current_user.id)
+        manager_name = manager.name or manager.email or f"Manager #{current_user.id}"
         
         log_entry = OrderHistory(
             order_id=order.id,
@@ -233,20 +317,11 @@ async def update_order_status(
             comment=comment_text # Save reason as comment
         )
         db.add(log_entry)
-        
-        # Legacy updates
-        history = order.status_history or []
-        history.append({
-            "old_status": old_status,
-            "new_status": status_data.status,
-            "changed_by": current_user.id,
-            "changed_at": datetime.now(timezone.utc).isoformat(),
-            "comment": status_data.comment
-        })
-        order.status_history = history
+        await record_order_status_change(db, order, old_status)
         
         await db.commit()
         # Reload with full options to ensure relationships (like items.product) are loaded for Pydantic
+        # populate_existing: history вже завантажена в сесії і не містить щойно доданого рядка
         result = await db.execute(
             select(Order)
             .where(Order.id == order_id)
@@ -256,9 +331,13 @@ async def update_order_status(
                 selectinload(Order.address),
                 selectinload(Order.user)
             )
+            .execution_options(populate_existing=True)
         )
         order = result.scalar_one_or_none()
         
+        # Real-time оновлення для клієнтів на сторінці відстеження (SSE)
+        await on_order_status_changed(order, old_status, comment_text)
+        
         # Відправка сповіщень клієнту через Celery (асинхронно)
         try:
             # Email сповіщення
@@ -307,7 +386,7 @@ async def add_order_comment(
     order_id: int,
     comment_data: OrderCommentRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
     """Додати внутрішній коментар до замовлення"""
     result = await db.execute(select(Order).where(Order.id == order_id))
@@ -317,8 +396,9 @@ async def add_order_comment(
         raise NotFoundException("Замовлення не знайдено")
     
     # Додаємо коментар до існуючого
+    manager = await db.get(User, current_user.id)
     existing_comment = order.internal_comment or ""
-    new_comment = f"[{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')}] {current_user.name or 'Manager'}: {comment_data.comment}\n"
+    new_comment = f"[{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')}] {manager.name or 'Manager'}: {comment_data.comment}\n"
     order.internal_comment = existing_comment + new_comment
     
     await db.commit()
@@ -331,7 +411,7 @@ async def assign_courier(
     order_id: int,
     courier_data: AssignCourierRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_manager_user)
+    current_user: AuthUser = Depends(get_current_manager_user)
 ):
     """Призначити кур'єра до замовлення"""
     result = await db.execute(select(Order).where(Order.id == order_id))
@@ -8,10 +8,11 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException
-from app.models.user import User
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate, ProductResponse
+from app.services.export import export_response
 
 router = APIRouter()
 
@@ -33,7 +34,7 @@ async def get_products(
     is_available: Optional[bool] = None,
     search: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список товарів (адмін)"""
     query = select(Product)
@@ -59,7 +60,7 @@ async def get_products(
 async def create_product(
     product_data: ProductCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Створити товар"""
     # Перевірка чи slug вже існує
@@ -100,7 +101,7 @@ async def create_product(
 async def get_product(
     product_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати товар за ID (адмін)"""
     result = await db.execute(
@@ -121,7 +122,7 @@ async def update_product(
     product_id: int,
     product_data: ProductUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити товар"""
     result = await db.execute(select(Product).where(Product.id == product_id))
@@ -165,7 +166,7 @@ async def update_product(
 async def delete_product(
     product_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Видалити товар"""
     result = await db.execute(select(Product).where(Product.id == product_id))
@@ -186,7 +187,7 @@ async def upload_product_images(
     product_id: int,
     files: List[UploadFile] = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Завантажити зображення товару"""
     # Валідація: обмеження кількості файлів
@@ -230,7 +231,7 @@ async def delete_product_image(
     product_id: int,
     image_id: str,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Видалити зображення товару"""
     result = await db.execute(select(Product).where(Product.id == product_id))
@@ -250,7 +251,7 @@ async def delete_product_image(
 async def bulk_update_products(
     request: BulkUpdateRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Масове оновлення товарів"""
     # Валідація: обмежуємо кількість товарів для безпеки
@@ -290,7 +291,7 @@ async def bulk_update_products(
 async def bulk_delete_products(
     request: BulkDeleteRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Масове видалення товарів"""
     # Валідація: перевірка списку ID
@@ -321,7 +322,7 @@ async def bulk_delete_products(
 async def import_products(
     file: UploadFile = File(...),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Імпорт товарів з CSV/Excel"""
     # TODO: Реалізувати імпорт товарів з файлу
@@ -347,48 +348,32 @@ async def export_products(
     format: str = Query("csv", pattern="^(csv|excel)$"),
     category_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
-    """Експорт товарів в CSV/Excel"""
-    from fastapi.responses import StreamingResponse
-    import io
-    import csv
-    
-    # Отримуємо товари
-    query = select(Product)
+    """Експорт товарів в CSV/Excel (потоково)"""
+    query = select(
+        Product.id,
+        Product.name,
+        Product.slug,
+        Product.description,
+        Product.price,
+        Product.old_price,
+        Product.category_id,
+        Product.is_available,
+        Product.is_new,
+        Product.is_popular
+    ).order_by(Product.id)
     if category_id:
         query = query.where(Product.category_id == category_id)
     
-    result = await db.execute(query)
-    products = result.scalars().all()
-    
-    # TODO: Реалізувати повноцінний експорт з Excel підтримкою
-    # Поки що експорт CSV
-    if format == "csv":
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Заголовки
-        writer.writerow([
+    return export_response(
+        db,
+        query,
+        headers=[
             "ID", "Назва", "Slug", "Опис", "Ціна", "Стара ціна",
             "Категорія", "Доступний", "Новинка", "Популярний"
-        ])
-        
-        # Дані
-        for product in products:
-            writer.writerow([
-                product.id, product.name, product.slug, product.description or "",
-                product.price, product.old_price or "", product.category_id,
-                product.is_available, product.is_new, product.is_popular
-            ])
-        
-        output.seek(0)
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={"Content-Disposition": f"attachment; filename=products.csv"}
-        )
-    else:
-        # TODO: Excel експорт
-        return {"message": "Excel експорт буде реалізовано", "format": format}
+        ],
+        filename="products",
+        format=format,
+    )
 
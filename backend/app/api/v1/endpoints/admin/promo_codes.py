@@ -9,11 +9,11 @@ from sqlalchemy.exc import IntegrityError
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException
-from app.models.user import User
 from app.models.promo_code import PromoCode
 from app.models.product import Product
-from app.models.order import Order
+from app.models.sales_rollup import DailySalesRollup
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy import func
 
@@ -68,7 +68,7 @@ async def get_promo_codes(
     limit: int = Query(50, ge=1, le=200),
     is_active: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список промокодів"""
     query = select(PromoCode)
@@ -88,7 +88,7 @@ async def get_promo_codes(
 async def create_promo_code(
     promo_code_data: PromoCodeCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Створити промокод"""
     # Перевірка чи код вже існує
@@ -114,7 +114,7 @@ async def update_promo_code(
     promo_code_id: int,
     promo_code_data: PromoCodeUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити промокод"""
     result = await db.execute(
@@ -152,7 +152,7 @@ async def update_promo_code(
 async def delete_promo_code(
     promo_code_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Видалити промокод"""
     result = await db.execute(
@@ -185,23 +185,32 @@ class PromoCodeStats(BaseModel):
 @router.get("/stats/all", response_model=List[PromoCodeStats])
 async def get_promo_code_stats(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати статистику використання промокодів"""
-    # Групуємо замовлення за промокодом
+    # Використання промокодів з денного rollup (замість GROUP BY по orders)
+    usage = (
+        select(
+            DailySalesRollup.promo_code_id,
+            func.sum(DailySalesRollup.orders_count).label("total_uses"),
+            func.sum(DailySalesRollup.discount).label("total_discount")
+        )
+        .where(DailySalesRollup.promo_code_id != 0)
+        .group_by(DailySalesRollup.promo_code_id)
+        .subquery()
+    )
     query = (
         select(
             PromoCode.id,
             PromoCode.code,
-            func.count(Order.id).label("total_uses"),
-            func.sum(func.coalesce(Order.discount, 0)).label("total_discount"),
+            func.coalesce(usage.c.total_uses, 0).label("total_uses"),
+            usage.c.total_discount,
             Product.name.label("product_name"),
             Product.price.label("product_price")
         )
-        .outerjoin(Order, Order.promo_code_id == PromoCode.id)
+        .outerjoin(usage, usage.c.promo_code_id == PromoCode.id)
         .outerjoin(Product, PromoCode.product_id == Product.id)
-        .group_by(PromoCode.id, PromoCode.code, Product.name, Product.price)
-        .order_by(func.sum(func.coalesce(Order.discount, 0)).desc())
+        .order_by(func.coalesce(usage.c.total_discount, 0).desc())
     )
     
     result = await db.execute(query)
@@ -8,8 +8,8 @@ from sqlalchemy import select, delete
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException
-from app.models.user import User
 from app.models.promotion import Promotion
 from app.schemas.promotion import PromotionCreate, PromotionUpdate, PromotionResponse
 
@@ -24,7 +24,7 @@ async def get_promotions(
     category_id: Optional[int] = None,
     product_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список акцій"""
     query = select(Promotion)
@@ -50,7 +50,7 @@ async def get_promotions(
 async def create_promotion(
     promotion_data: PromotionCreate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Створити акцію"""
     # Перевірка чи slug вже існує
@@ -75,7 +75,7 @@ async def create_promotion(
 async def get_promotion(
     promotion_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати акцію за ID"""
     result = await db.execute(
@@ -95,7 +95,7 @@ async def update_promotion(
     promotion_id: int,
     promotion_data: PromotionUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити акцію"""
     result = await db.execute(
@@ -133,7 +133,7 @@ async def update_promotion(
 async def delete_promotion(
     promotion_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Видалити акцію"""
     result = await db.execute(
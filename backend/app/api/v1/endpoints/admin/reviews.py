@@ -7,8 +7,8 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException
-from app.models.user import User
 from app.models.review import Review
 from app.schemas.review import ReviewResponse, ReviewUpdate
 
@@ -28,7 +28,7 @@ async def get_reviews(
     rating: Optional[int] = Query(None, ge=1, le=5),
     product_id: Optional[int] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список відгуків"""
     query = select(Review)
@@ -55,7 +55,7 @@ async def update_review(
     review_id: int,
     review_data: ReviewUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити відгук"""
     result = await db.execute(select(Review).where(Review.id == review_id))
@@ -79,7 +79,7 @@ async def update_review(
 async def delete_review(
     review_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Видалити відгук"""
     result = await db.execute(select(Review).where(Review.id == review_id))
@@ -99,7 +99,7 @@ async def delete_review(
 async def publish_review(
     review_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Опублікувати відгук"""
     result = await db.execute(select(Review).where(Review.id == review_id))
@@ -119,7 +119,7 @@ async def publish_review(
 async def hide_review(
     review_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Приховати відгук"""
     result = await db.execute(select(Review).where(Review.id == review_id))
@@ -140,7 +140,7 @@ async def reply_to_review(
     review_id: int,
     reply_data: ReviewReplyRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Відповісти на відгук"""
     from datetime import datetime, timezone
@@ -6,8 +6,8 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
 from app.core.config import settings
-from app.models.user import User
 
 router = APIRouter()
 
@@ -57,7 +57,7 @@ class SettingsUpdate(BaseModel):
 @router.get("", response_model=SettingsResponse)
 async def get_settings(
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати налаштування сайту"""
     
@@ -93,7 +93,7 @@ async def get_settings(
 async def update_settings(
     settings_data: SettingsUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити налаштування сайту"""
     from app.models.setting import Setting
@@ -101,15 +101,19 @@ async def update_settings(
     
     update_data = settings_data.model_dump(exclude_unset=True)
     
+    # Існуючі налаштування - одним запитом для всіх ключів
+    existing = {}
+    if update_data:
+        result = await db.execute(select(Setting).where(Setting.key.in_(update_data)))
+        existing = {item.key: item for item in result.scalars().all()}
+    
     for key, value in update_data.items():
         # Конвертуємо значення в стрічку для збереження
         str_value = str(value) if value is not None else ""
         if isinstance(value, bool):
             str_value = "true" if value else "false"
             
-        # Шукаємо існуюче налаштування
-        result = await db.execute(select(Setting).where(Setting.key == key))
-        setting_item = result.scalar_one_or_none()
+        setting_item = existing.get(key)
         
         if setting_item:
             setting_item.value = str_value
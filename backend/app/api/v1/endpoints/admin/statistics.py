@@ -1,22 +1,32 @@
 """Admin endpoints для статистики та аналітики"""
 from typing import Optional, List
-from datetime import datetime, date, timedelta, timezone
+from datetime import datetime, date, timedelta
 from decimal import Decimal
 from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_, case
 from sqlalchemy.orm import selectinload
 from pydantic import BaseModel
-import csv
-import io
 
-from app.database import get_db
+from app.database import get_db, get_read_db
+from app.core.config import settings
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser
+from app.core.exceptions import BadRequestException
 from app.models.user import User
 from app.models.order import Order, OrderItem
 from app.models.product import Product
 from app.models.category import Category
+from app.models.sales_rollup import DailySalesRollup
+from app.models.customer_analytics import CustomerRFM, CohortRetention
+from app.services.analytics_lake import AnalyticsLake
+from app.services.customer_analytics import SEGMENTS as RFM_SEGMENTS, DEFAULT_SEGMENT
+from app.services.dashboard_counters import DashboardCounters
+from app.services.export import export_response
+from app.services.leaderboards import LeaderboardService, WINDOWS as LEADERBOARD_WINDOWS
+from app.services.revenue_series import RevenueSeriesCache
+from app.services.unique_counts import UniqueCounters, count_distinct_customers, STANDARD_ERROR
+from app.utils.dates import date_range_conditions, shop_today, shop_day_start
 
 router = APIRouter()
 
@@ -38,58 +48,58 @@ class DashboardStats(BaseModel):
 
 @router.get("/dashboard", response_model=DashboardStats)
 async def get_dashboard_stats(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати ключові метрики для дашборду.
     
-    Оптимізовано: всі дані отримуються за 2 запити замість 11+
+    Основне джерело - лічильники в Redis (один MGET). Без них метрики
+    замовлень читаються з денного rollup (десятки рядків замість
+    сканування orders). Межі днів - в часовому поясі магазину.
     """
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    week_start = today_start - timedelta(days=7)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    year_start = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    counters = await DashboardCounters.read()
+    if counters is not None:
+        return DashboardStats(**counters)
+
+    today = shop_today()
+    week_start = today - timedelta(days=7)
+    month_start = today.replace(day=1)
+    year_start = today.replace(month=1, day=1)
+
+    R = DailySalesRollup
+    not_cancelled = R.status != "cancelled"
+
+    def orders_since(start: date):
+        return func.sum(case((R.day >= start, R.orders_count), else_=0))
+
+    def revenue_since(start: date):
+        return func.sum(case((and_(R.day >= start, not_cancelled), R.revenue), else_=Decimal("0")))
 
-    # ЄДИНИЙ запит для всіх метрик замовлень (замість 9 окремих)
     order_stats_query = select(
-        # Кількість замовлень за періодами
-        func.count(case((Order.created_at >= today_start, Order.id))).label("orders_today"),
-        func.count(case((Order.created_at >= week_start, Order.id))).label("orders_week"),
-        func.count(case((Order.created_at >= month_start, Order.id))).label("orders_month"),
-        func.count(case((Order.created_at >= year_start, Order.id))).label("orders_year"),
-        
-        # Виручка (тільки не скасовані замовлення)
-        func.sum(case(
-            (and_(Order.created_at >= today_start, Order.status != "cancelled"), Order.total_amount),
-            else_=Decimal("0")
-        )).label("rev_today"),
-        func.sum(case(
-            (and_(Order.created_at >= week_start, Order.status != "cancelled"), Order.total_amount),
-            else_=Decimal("0")
-        )).label("rev_week"),
-        func.sum(case(
-            (and_(Order.created_at >= month_start, Order.status != "cancelled"), Order.total_amount),
-            else_=Decimal("0")
-        )).label("rev_month"),
-        func.sum(case(
-            (and_(Order.created_at >= year_start, Order.status != "cancelled"), Order.total_amount),
-            else_=Decimal("0")
-        )).label("rev_year"),
-        
-        # Середній чек за місяць
-        func.avg(case(
-            (and_(Order.created_at >= month_start, Order.status != "cancelled"), Order.total_amount)
-        )).label("avg_check")
-    )
+        orders_since(today).label("orders_today"),
+        orders_since(week_start).label("orders_week"),
+        orders_since(month_start).label("orders_month"),
+        orders_since(year_start).label("orders_year"),
+        revenue_since(today).label("rev_today"),
+        revenue_since(week_start).label("rev_week"),
+        revenue_since(month_start).label("rev_month"),
+        revenue_since(year_start).label("rev_year"),
+        # Для середнього чеку за місяць (тільки не скасовані)
+        func.sum(case((and_(R.day >= month_start, not_cancelled), R.orders_count), else_=0)).label("paid_month"),
+    ).where(R.day >= min(week_start, year_start))
     
     order_result = await db.execute(order_stats_query)
     order_stats = order_result.one()
 
+    rev_month = Decimal(order_stats.rev_month or 0)
+    average_check = rev_month / order_stats.paid_month if order_stats.paid_month else Decimal("0")
+
     # Окремий запит для користувачів (інша таблиця)
+    today_start = shop_day_start(today)
+    month_start_at = shop_day_start(month_start)
     user_stats_query = select(
         func.count(case((User.created_at >= today_start, User.id))).label("new_today"),
-        func.count(case((User.created_at >= month_start, User.id))).label("new_month")
+        func.count(case((User.created_at >= month_start_at, User.id))).label("new_month")
     )
     
     user_result = await db.execute(user_stats_query)
@@ -102,9 +112,9 @@ async def get_dashboard_stats(
         orders_year=order_stats.orders_year or 0,
         revenue_today=order_stats.rev_today or Decimal("0"),
         revenue_week=order_stats.rev_week or Decimal("0"),
-        revenue_month=order_stats.rev_month or Decimal("0"),
+        revenue_month=rev_month,
         revenue_year=order_stats.rev_year or Decimal("0"),
-        average_check=order_stats.avg_check or Decimal("0"),
+        average_check=average_check.quantize(Decimal("0.01")),
         new_customers_today=user_stats.new_today or 0,
         new_customers_month=user_stats.new_month or 0,
     )
@@ -118,6 +128,7 @@ class OrderStatistics(BaseModel):
     pending_orders: int
     total_revenue: Decimal
     average_check: Decimal
+    new_customers: int
     orders: List[dict]
 
 
@@ -126,34 +137,35 @@ async def get_orders_statistics(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     limit: int = Query(100, le=500),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Статистика по замовленнях за період"""
     # Встановлюємо дати за замовчуванням (останні 30 днів)
     if not date_to:
-        date_to = datetime.now(timezone.utc).date()
+        date_to = shop_today()
     if not date_from:
         date_from = date_to - timedelta(days=30)
     
     # Базові умови
-    conditions = [
-        func.date(Order.created_at) >= date_from,
-        func.date(Order.created_at) <= date_to
-    ]
+    conditions = date_range_conditions(Order.created_at, date_from, date_to)
     
-    # Агрегована статистика одним запитом
+    # Агрегована статистика з денного rollup
+    R = DailySalesRollup
     stats_query = select(
-        func.count(Order.id).label("total"),
-        func.count(case((Order.status == "completed", Order.id))).label("completed"),
-        func.count(case((Order.status == "cancelled", Order.id))).label("cancelled"),
-        func.count(case((Order.status == "pending", Order.id))).label("pending"),
-        func.sum(case((Order.status != "cancelled", Order.total_amount), else_=Decimal("0"))).label("revenue"),
-        func.avg(case((Order.status != "cancelled", Order.total_amount))).label("avg_check")
-    ).where(and_(*conditions))
+        func.sum(R.orders_count).label("total"),
+        func.sum(case((R.status == "completed", R.orders_count), else_=0)).label("completed"),
+        func.sum(case((R.status == "cancelled", R.orders_count), else_=0)).label("cancelled"),
+        func.sum(case((R.status == "pending", R.orders_count), else_=0)).label("pending"),
+        func.sum(case((R.status != "cancelled", R.orders_count), else_=0)).label("paid"),
+        func.sum(case((R.status != "cancelled", R.revenue), else_=Decimal("0"))).label("revenue"),
+        func.sum(R.new_customers).label("new_customers"),
+    ).where(R.day >= date_from, R.day <= date_to)
     
     stats_result = await db.execute(stats_query)
     stats = stats_result.one()
+    revenue = Decimal(stats.revenue or 0)
+    average_check = (revenue / stats.paid).quantize(Decimal("0.01")) if stats.paid else Decimal("0")
     
     # Список замовлень
     orders_query = (
@@ -171,8 +183,9 @@ async def get_orders_statistics(
         "completed_orders": stats.completed or 0,
         "cancelled_orders": stats.cancelled or 0,
         "pending_orders": stats.pending or 0,
-        "total_revenue": stats.revenue or Decimal("0"),
-        "average_check": stats.avg_check or Decimal("0"),
+        "total_revenue": revenue,
+        "average_check": average_check,
+        "new_customers": stats.new_customers or 0,
         "date_from": date_from.isoformat(),
         "date_to": date_to.isoformat(),
         "orders": [
@@ -188,12 +201,63 @@ async def get_orders_statistics(
     }
 
 
+def _window_start(window: str) -> Optional[datetime]:
+    """Початок вікна лідерборду (None - за весь час)"""
+    days = LEADERBOARD_WINDOWS[window]
+    if days is None:
+        return None
+    return shop_day_start(shop_today() - timedelta(days=days - 1))
+
+
 @router.get("/products")
 async def get_products_statistics(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    window: str = Query("all", pattern="^(all|30d|7d)$"),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
-    """Top 5 продуктів за кількістю продажів"""
+    """Top 5 продуктів за кількістю продажів (за весь час, 30 або 7 днів)"""
+    top = await LeaderboardService.top("products", window, 5)
+    
+    if top is not None:
+        # Лідерборд з Redis - з БД тільки назви та зображення за PK
+        products = {}
+        if top:
+            result = await db.execute(
+                select(Product.id, Product.name, Product.image_url)
+                .where(Product.id.in_([product_id for product_id, _, _ in top]))
+            )
+            products = {row.id: row for row in result.all()}
+        return [
+            {
+                "id": product_id,
+                "name": products[product_id].name if product_id in products else None,
+                "image_url": products[product_id].image_url if product_id in products else None,
+                "sales": int(sales),
+                "revenue": round(revenue, 2)
+            }
+            for product_id, sales, revenue in top
+        ]
+    
+    # Fallback без Redis: колонковий знімок (DuckDB, дані на момент нічного вивантаження),
+    # без нього - агрегація по замовленнях
+    start = _window_start(window)
+    rows = await AnalyticsLake.top_products(start, 5)
+    if rows is not None:
+        return [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "image_url": row["image_url"],
+                "sales": int(row["sales"] or 0),
+                "revenue": float(row["revenue"] or 0)
+            }
+            for row in rows
+        ]
+    
+    conditions = [Order.status != "cancelled"]
+    if start is not None:
+        conditions.append(Order.created_at >= start)
+    
     query = (
         select(
             Product.id,
@@ -204,7 +268,7 @@ async def get_products_statistics(
         )
         .join(OrderItem.product)
         .join(OrderItem.order)
-        .where(Order.status != "cancelled")
+        .where(*conditions)
         .group_by(Product.id, Product.name, Product.image_url)
         .order_by(func.sum(OrderItem.quantity).desc())
         .limit(5)
@@ -227,13 +291,15 @@ async def get_products_statistics(
 
 @router.get("/customers")
 async def get_customers_statistics(
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    window: str = Query("all", pattern="^(all|30d|7d)$"),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Статистика по клієнтах"""
-    now = datetime.now(timezone.utc)
-    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    # Межі дня / місяця - за часом магазину, як і в решті статистики
+    today = shop_today()
+    today_start = shop_day_start(today)
+    month_start = shop_day_start(today.replace(day=1))
     
     # Агрегована статистика одним запитом
     stats_query = select(
@@ -247,23 +313,72 @@ async def get_customers_statistics(
     stats = result.one()
     
     # Топ клієнтів за сумою замовлень
-    top_customers_query = (
-        select(
-            User.id,
-            User.name,
-            User.phone,
-            func.count(Order.id).label("orders_count"),
-            func.sum(Order.total_amount).label("total_spent")
-        )
-        .join(Order, Order.user_id == User.id)
-        .where(Order.status != "cancelled")
-        .group_by(User.id, User.name, User.phone)
-        .order_by(func.sum(Order.total_amount).desc())
-        .limit(10)
-    )
+    top = await LeaderboardService.top("customers", window, 10)
+    # Fallback без Redis: колонковий знімок (DuckDB, на момент вивантаження)
+    lake_rows = await AnalyticsLake.top_customers(_window_start(window), 10) if top is None else None
     
-    top_result = await db.execute(top_customers_query)
-    top_customers = top_result.all()
+    if top is not None:
+        users = {}
+        if top:
+            users_result = await db.execute(
+                select(User.id, User.name, User.phone)
+                .where(User.id.in_([user_id for user_id, _, _ in top]))
+            )
+            users = {row.id: row for row in users_result.all()}
+        top_customers = [
+            {
+                "id": user_id,
+                "name": users[user_id].name if user_id in users else None,
+                "phone": users[user_id].phone if user_id in users else None,
+                "orders_count": int(orders_count),
+                "total_spent": round(total_spent, 2)
+            }
+            for user_id, total_spent, orders_count in top
+        ]
+    elif lake_rows is not None:
+        top_customers = [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "phone": row["phone"],
+                "orders_count": int(row["orders_count"]),
+                "total_spent": float(row["total_spent"] or 0)
+            }
+            for row in lake_rows
+        ]
+    else:
+        # Без Redis і знімка: агрегація по замовленнях
+        conditions = [Order.status != "cancelled"]
+        start = _window_start(window)
+        if start is not None:
+            conditions.append(Order.created_at >= start)
+        
+        top_customers_query = (
+            select(
+                User.id,
+                User.name,
+                User.phone,
+                func.count(Order.id).label("orders_count"),
+                func.sum(Order.total_amount).label("total_spent")
+            )
+            .join(Order, Order.user_id == User.id)
+            .where(*conditions)
+            .group_by(User.id, User.name, User.phone)
+            .order_by(func.sum(Order.total_amount).desc())
+            .limit(10)
+        )
+        
+        top_result = await db.execute(top_customers_query)
+        top_customers = [
+            {
+                "id": c.id,
+                "name": c.name,
+                "phone": c.phone,
+                "orders_count": c.orders_count,
+                "total_spent": float(c.total_spent or 0)
+            }
+            for c in top_result.all()
+        ]
     
     return {
         "total_customers": stats.total or 0,
@@ -271,13 +386,7 @@ async def get_customers_statistics(
         "new_month": stats.new_month or 0,
         "active_customers": stats.active or 0,
         "top_customers": [
-            {
-                "id": c.id,
-                "name": c.name or "Без імені",
-                "phone": c.phone,
-                "orders_count": c.orders_count,
-                "total_spent": float(c.total_spent or 0)
-            }
+            {**c, "name": c["name"] or "Без імені"}
             for c in top_customers
         ]
     }
@@ -287,12 +396,12 @@ async def get_customers_statistics(
 async def get_revenue_statistics(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Статистика по виручці (останні 7 днів за замовчуванням)"""
     if not date_to:
-        date_to = datetime.now(timezone.utc).date()
+        date_to = shop_today()
     if not date_from:
         date_from = date_to - timedelta(days=6)
         
@@ -303,21 +412,22 @@ async def get_revenue_statistics(
         date_list.append(current_date)
         current_date += timedelta(days=1)
         
+    R = DailySalesRollup
     query = (
         select(
-            func.date(Order.created_at).label("date"),
-            func.sum(Order.total_amount).label("sales"),
-            func.count(Order.id).label("orders")
+            R.day.label("date"),
+            func.sum(R.revenue).label("sales"),
+            func.sum(R.orders_count).label("orders")
         )
         .where(
             and_(
-                func.date(Order.created_at) >= date_from,
-                func.date(Order.created_at) <= date_to,
-                Order.status != "cancelled"
+                R.day >= date_from,
+                R.day <= date_to,
+                R.status != "cancelled"
             )
         )
-        .group_by(func.date(Order.created_at))
-        .order_by(func.date(Order.created_at))
+        .group_by(R.day)
+        .order_by(R.day)
     )
     
     result = await db.execute(query)
@@ -338,64 +448,225 @@ async def get_revenue_statistics(
     return chart_data
 
 
+# Діапазон за замовчуванням і максимальний діапазон (днів) для гранулярності
+SERIES_DEFAULT_DAYS = {"hour": 1, "day": 30, "week": 84, "month": 365}
+SERIES_MAX_DAYS = {"hour": 31, "day": 366, "week": 366 * 3, "month": 366 * 10}
+
+
+@router.get("/revenue/series")
+async def get_revenue_series(
+    granularity: str = Query("day", pattern="^(hour|day|week|month)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Часовий ряд виручки по годинах / днях / тижнях / місяцях (час магазину).
+    
+    Закриті bucket-и читаються з кешу, з БД - тільки поточний.
+    """
+    if not date_to:
+        date_to = shop_today()
+    if not date_from:
+        date_from = date_to - timedelta(days=SERIES_DEFAULT_DAYS[granularity] - 1)
+    if date_from > date_to:
+        raise BadRequestException("date_from не може бути пізніше date_to")
+    if (date_to - date_from).days + 1 > SERIES_MAX_DAYS[granularity]:
+        raise BadRequestException(
+            f"Максимальний діапазон для '{granularity}' - {SERIES_MAX_DAYS[granularity]} днів"
+        )
+    
+    points = await RevenueSeriesCache.series(db, granularity, date_from, date_to)
+    return {
+        "granularity": granularity,
+        "timezone": settings.SHOP_TIMEZONE,
+        "points": [
+            {"bucket": bucket.isoformat(), "sales": round(sales, 2), "orders": orders}
+            for bucket, (sales, orders) in points
+        ]
+    }
+
+
+@router.get("/unique")
+async def get_unique_counts(
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Унікальні клієнти (телефони із замовленнями) і відвідувачі за сьогодні,
+    7 / 30 днів та поточний місяць.
+    
+    З Redis HyperLogLog - наближено (похибка ~0.81%), без Redis клієнти
+    рахуються точно з БД, а відвідувачі недоступні.
+    """
+    counts = await UniqueCounters.counts()
+    approximate = counts is not None and None not in counts["customers"].values()
+    if counts is None:
+        counts = {"customers": None, "visitors": None}
+    if not approximate:
+        counts["customers"] = await count_distinct_customers(db)
+    
+    return {
+        **counts,
+        "approximate": approximate,
+        "standard_error": STANDARD_ERROR if approximate else 0
+    }
+
+
+@router.get("/rfm")
+async def get_rfm_segments(
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """RFM-сегменти клієнтів (з останнього перерахунку)"""
+    query = (
+        select(
+            CustomerRFM.segment,
+            func.count().label("customers"),
+            func.avg(CustomerRFM.recency_days).label("avg_recency_days"),
+            func.avg(CustomerRFM.frequency).label("avg_frequency"),
+            func.avg(CustomerRFM.monetary).label("avg_monetary"),
+            func.sum(CustomerRFM.monetary).label("total_monetary"),
+            func.max(CustomerRFM.computed_at).label("computed_at")
+        )
+        .group_by(CustomerRFM.segment)
+    )
+    result = await db.execute(query)
+    rows = {row.segment: row for row in result.all()}
+    
+    segments = []
+    for segment in (*RFM_SEGMENTS, DEFAULT_SEGMENT):
+        row = rows.get(segment)
+        segments.append({
+            "segment": segment,
+            "customers": row.customers if row else 0,
+            "avg_recency_days": round(float(row.avg_recency_days), 1) if row else 0,
+            "avg_frequency": round(float(row.avg_frequency), 2) if row else 0,
+            "avg_monetary": round(float(row.avg_monetary), 2) if row else 0,
+            "total_monetary": float(row.total_monetary) if row else 0,
+        })
+    
+    computed = [row.computed_at for row in rows.values() if row.computed_at]
+    return {
+        "computed_at": max(computed) if computed else None,
+        "total_customers": sum(s["customers"] for s in segments),
+        "segments": segments
+    }
+
+
+@router.get("/rfm/customers")
+async def get_rfm_customers(
+    segment: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Клієнти з RFM-оцінками (за сумою покупок), опційно одного сегмента"""
+    conditions = []
+    if segment:
+        conditions.append(CustomerRFM.segment == segment)
+    
+    total = await db.scalar(select(func.count()).select_from(CustomerRFM).where(*conditions))
+    result = await db.execute(
+        select(CustomerRFM)
+        .where(*conditions)
+        .order_by(CustomerRFM.monetary.desc(), CustomerRFM.customer_phone)
+        .offset(skip)
+        .limit(limit)
+    )
+    
+    return {
+        "total": total or 0,
+        "items": [
+            {
+                "customer_phone": c.customer_phone,
+                "user_id": c.user_id,
+                "segment": c.segment,
+                "recency_days": c.recency_days,
+                "frequency": c.frequency,
+                "monetary": float(c.monetary),
+                "r_score": c.r_score,
+                "f_score": c.f_score,
+                "m_score": c.m_score,
+                "first_order_at": c.first_order_at,
+                "last_order_at": c.last_order_at
+            }
+            for c in result.scalars().all()
+        ]
+    }
+
+
+@router.get("/cohorts")
+async def get_cohorts(
+    months: int = Query(12, ge=1, le=60),
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_admin_user)
+):
+    """Місячні когорти утримання за останні `months` місяців"""
+    recent = (
+        select(CohortRetention.cohort_month)
+        .where(CohortRetention.period == 0)
+        .order_by(CohortRetention.cohort_month.desc())
+        .limit(months)
+    )
+    result = await db.execute(
+        select(CohortRetention)
+        .where(CohortRetention.cohort_month.in_(recent.scalar_subquery()))
+        .order_by(CohortRetention.cohort_month, CohortRetention.period)
+    )
+    
+    cohorts = {}
+    for cell in result.scalars().all():
+        cohort = cohorts.setdefault(cell.cohort_month, {
+            "cohort_month": cell.cohort_month.strftime("%Y-%m"),
+            "size": 0,
+            "periods": []
+        })
+        if cell.period == 0:
+            cohort["size"] = cell.customers
+        cohort["periods"].append({
+            "period": cell.period,
+            "customers": cell.customers,
+            "retention": float(cell.retention),
+            "revenue": float(cell.revenue)
+        })
+    
+    return list(cohorts.values())
+
+
 @router.get("/export")
 async def export_statistics(
-    format: str = Query("csv", pattern="^(csv)$"),
+    format: str = Query("csv", pattern="^(csv|excel)$"),
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
+    # Серверний курсор живе до кінця відповіді і потребує транзакції - тому get_db
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
-    """Експорт статистики в CSV"""
+    """Експорт замовлень за період в CSV / Excel (потоково)"""
     if not date_to:
-        date_to = datetime.now(timezone.utc).date()
+        date_to = shop_today()
     if not date_from:
         date_from = date_to - timedelta(days=30)
     
-    # Отримуємо замовлення
     query = (
-        select(Order)
-        .where(
-            and_(
-                func.date(Order.created_at) >= date_from,
-                func.date(Order.created_at) <= date_to
-            )
+        select(
+            Order.id,
+            Order.order_number,
+            Order.status,
+            Order.total_amount,
+            Order.customer_name,
+            Order.customer_phone,
+            Order.created_at
         )
+        .where(*date_range_conditions(Order.created_at, date_from, date_to))
         .order_by(Order.created_at.desc())
-        .limit(1000)
     )
     
-    result = await db.execute(query)
-    orders = result.scalars().all()
-    
-    # Генеруємо CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Заголовки
-    writer.writerow([
-        "ID", "Номер замовлення", "Статус", "Сума", 
-        "Клієнт", "Телефон", "Дата створення"
-    ])
-    
-    # Дані
-    for order in orders:
-        writer.writerow([
-            order.id,
-            order.order_number,
-            order.status,
-            float(order.total_amount),
-            order.customer_name or "",
-            order.customer_phone or "",
-            order.created_at.strftime("%Y-%m-%d %H:%M") if order.created_at else ""
-        ])
-    
-    output.seek(0)
-    
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={
-            "Content-Disposition": f"attachment; filename=orders_{date_from}_{date_to}.csv"
-        }
+    return export_response(
+        db,
+        query,
+        headers=["ID", "Номер замовлення", "Статус", "Сума", "Клієнт", "Телефон", "Дата створення"],
+        filename=f"orders_{date_from}_{date_to}",
+        format=format,
     )
@@ -8,6 +8,7 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.core.dependencies import get_current_admin_user
+from app.core.user_cache import AuthUser, UserAuthCache
 from app.core.exceptions import NotFoundException, BadRequestException
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserResponse
@@ -30,7 +31,7 @@ async def get_users(
     is_admin: Optional[bool] = None,
     role: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Отримати список користувачів"""
     query = select(User)
@@ -63,7 +64,7 @@ async def get_users(
 async def get_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Деталі користувача"""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -80,7 +81,7 @@ async def update_user(
     user_id: int,
     user_data: UserUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Оновити користувача"""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -111,6 +112,8 @@ async def update_user(
             setattr(user, field, value)
     
     await db.commit()
+    # Роль могла змінитись - права діють одразу, а не після TTL кешу
+    await UserAuthCache.invalidate(user.id)
     await db.refresh(user)
     
     return user
@@ -120,7 +123,7 @@ async def update_user(
 async def block_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Заблокувати користувача"""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -134,6 +137,7 @@ async def block_user(
     
     user.is_active = False
     await db.commit()
+    await UserAuthCache.invalidate(user.id)
     await db.refresh(user)
     
     return user
@@ -143,7 +147,7 @@ async def block_user(
 async def unblock_user(
     user_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Розблокувати користувача"""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -154,6 +158,7 @@ async def unblock_user(
     
     user.is_active = True
     await db.commit()
+    await UserAuthCache.invalidate(user.id)
     await db.refresh(user)
     
     return user
@@ -164,7 +169,7 @@ async def add_bonus(
     user_id: int,
     bonus_data: AddBonusRequest,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Нарахувати бонуси користувачу"""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -196,7 +201,7 @@ async def add_bonus(
 async def export_users(
     format: str = Query("csv", pattern="^(csv|excel)$"),
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_admin_user)
+    current_user: AuthUser = Depends(get_current_admin_user)
 ):
     """Експорт бази користувачів"""
     # TODO: Реалізувати експорт в CSV/Excel
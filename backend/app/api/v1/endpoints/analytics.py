@@ -1,7 +1,8 @@
 from fastapi import APIRouter, status
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.core.metrics import upsell_conversion
+from app.services.unique_counts import UniqueCounters
 
 router = APIRouter()
 
@@ -17,3 +18,16 @@ async def track_upsell(event: UpsellEvent):
     """
     upsell_conversion.inc()
     return {"status": "ok"}
+
+
+class VisitEvent(BaseModel):
+    # Анонімний id, який frontend генерує один раз і зберігає в браузері
+    visitor_id: str = Field(..., min_length=8, max_length=64)
+
+@router.post("/visit", status_code=status.HTTP_200_OK)
+async def track_visit(event: VisitEvent):
+    """
+    Track a site visit for unique visitor statistics (HyperLogLog per day).
+    """
+    await UniqueCounters.record_visit(event.visitor_id)
+    return {"status": "ok"}
@@ -2,18 +2,18 @@
 from typing import Optional
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import json
-import redis
 
 from app.database import get_db
-from app.core.config import settings
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    hash_password_async,
+    verify_and_update_password,
     create_access_token,
     create_refresh_token,
+    decode_access_token,
     decode_refresh_token,
     generate_2fa_secret,
     generate_2fa_qr_code,
@@ -23,7 +23,10 @@ from app.core.security import (
     validate_password_strength,
     is_password_common
 )
-from app.core.dependencies import get_current_active_user, get_optional_user
+from app.core.attempts import register_attempt, consume_code
+from app.core.dependencies import get_current_active_user, get_current_auth_user, get_optional_user, security
+from app.core.token_revocation import TokenRevocation
+from app.core.user_cache import AuthUser, UserAuthCache
 from app.core.exceptions import (
     UnauthorizedException,
     BadRequestException,
@@ -46,15 +49,11 @@ from app.schemas.user import (
     SMSResponse,
     RefreshTokenRequest
 )
+from app.core.redis import RedisManager
+from app.services.dashboard_counters import DashboardCounters
 
 router = APIRouter()
 
-# Підключення до Redis для зберігання SMS кодів та rate limiting
-try:
-    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-except Exception:
-    redis_client = None
-
 
 def get_client_ip(request: Request) -> str:
     """Отримання IP адреси клієнта з урахуванням проксі"""
@@ -117,7 +116,7 @@ async def register(
         if is_password_common(user_data.password):
             raise BadRequestException("Пароль занадто простий. Оберіть більш складний пароль")
         
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
     
     # Створення користувача з обробкою race condition
     from sqlalchemy.exc import IntegrityError
@@ -134,6 +133,7 @@ async def register(
         db.add(new_user)
         await db.commit()
         await db.refresh(new_user)
+        await DashboardCounters.record_user_registered(new_user)
         
         # Send welcome email
         if new_user.email:
@@ -195,9 +195,15 @@ async def login(
     if not user.hashed_password:
         raise UnauthorizedException("Пароль не встановлено. Відновіть пароль")
     
-    if not verify_password(credentials.password, user.hashed_password):
+    is_valid, new_hash = await verify_and_update_password(credentials.password, user.hashed_password)
+    if not is_valid:
         raise UnauthorizedException("Невірний телефон або пароль")
     
+    # Змінилась вартість bcrypt - зберігаємо новий хеш, поки є відкритий пароль
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+    
     # Перевірка 2FA
     if user.two_factor_enabled:
         # Потрібно повернути спеціальний статус для 2FA
@@ -330,19 +336,29 @@ async def disable_2fa(
 
 @router.post("/logout")
 async def logout(
-    current_user: User = Depends(get_current_active_user)
+    token_data: Optional[RefreshTokenRequest] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
-    """Вихід користувача (на клієнті видаляється токен)"""
-    # В майбутньому можна додати blacklist для токенів
+    """Вихід користувача: відкликання поточного access (і переданого refresh) токену"""
+    await TokenRevocation.revoke_token(decode_access_token(credentials.credentials))
+    
+    if token_data:
+        refresh_payload = decode_refresh_token(token_data.refresh_token)
+        # Чужий refresh токен відкликати не можна
+        if refresh_payload and refresh_payload.get("sub") == str(current_user.id):
+            await TokenRevocation.revoke_token(refresh_payload)
+    
     return {"message": "Вихід виконано успішно"}
 
 
 @router.post("/logout-all")
 async def logout_all(
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
-    """Вихід з усіх пристроїв (на клієнті видаляються всі токени)"""
-    # В майбутньому можна додати генерацію нового secret для інвалідації всіх токенів
+    """Вихід з усіх пристроїв: усі видані раніше токени користувача стають недійсними"""
+    await TokenRevocation.revoke_user(current_user.id)
+    await UserAuthCache.invalidate(current_user.id)
     return {"message": "Вихід з усіх пристроїв виконано"}
 
 
@@ -353,6 +369,7 @@ async def send_sms_code(
     db: AsyncSession = Depends(get_db)
 ):
     """Відправка SMS коду для швидкого входу"""
+    redis_client = RedisManager.get_client()
     if not redis_client:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -365,25 +382,16 @@ async def send_sms_code(
         raise BadRequestException("Невірний номер телефону")
     
     # Rate limiting: максимум 3 запити на 15 хвилин для одного номера
-    rate_limit_key = f"sms_send_rate:{phone}"
-    attempts = redis_client.get(rate_limit_key)
-    
-    if attempts and int(attempts) >= 3:
+    if not await register_attempt(redis_client, f"sms_send_rate:{phone}", 3, 900):
         raise BadRequestException(
             "Перевищено ліміт запитів. Спробуйте пізніше (макс 3 на 15 хвилин)"
         )
     
-    # Збільшуємо лічильник
-    if attempts:
-        redis_client.incr(rate_limit_key)
-    else:
-        redis_client.setex(rate_limit_key, 900, 1)  # 15 хвилин TTL
-    
     # Генерація коду
     code = generate_sms_code()
     
     # Зберігаємо код в Redis на 5 хвилин
-    redis_client.setex(f"sms_code:{phone}", 300, code)
+    await redis_client.setex(f"sms_code:{phone}", 300, code)
     
     # Відправка SMS через Celery task (асинхронно)
     from app.tasks.sms import send_verification_code
@@ -400,6 +408,7 @@ async def verify_sms_code(
     db: AsyncSession = Depends(get_db)
 ):
     """Підтвердження SMS коду для входу"""
+    redis_client = RedisManager.get_client()
     if not redis_client:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -417,30 +426,18 @@ async def verify_sms_code(
         raise BadRequestException("Невірний формат коду")
     
     # Rate limiting: максимум 5 спроб на 15 хвилин для одного номера
+    # Спроба зараховується до перевірки коду - паралельні запити не обійдуть ліміт
     rate_limit_key = f"sms_verify_rate:{phone}"
-    attempts = redis_client.get(rate_limit_key)
-    
-    if attempts and int(attempts) >= 5:
+    if not await register_attempt(redis_client, rate_limit_key, 5, 900):
         raise BadRequestException(
             "Перевищено ліміт спроб. Спробуйте пізніше (макс 5 на 15 хвилин)"
         )
     
-    # КРИТИЧНО: Перевірка коду з Redis ПЕРЕД будь-якою іншою логікою
-    stored_code = redis_client.get(f"sms_code:{phone}")
-    
-    if not stored_code or stored_code != code:
-        # Збільшуємо лічильник невдалих спроб
-        if attempts:
-            redis_client.incr(rate_limit_key)
-        else:
-            redis_client.setex(rate_limit_key, 900, 1)  # 15 хвилин TTL
-        
+    # КРИТИЧНО: Перевірка коду з Redis ПЕРЕД будь-якою іншою логікою.
+    # Вірний код видаляється разом з лічильником спроб одним скриптом
+    if not await consume_code(redis_client, f"sms_code:{phone}", code, rate_limit_key):
         raise UnauthorizedException("Невірний SMS код")
     
-    # Код вірний - видаляємо його з Redis та скидаємо rate limit
-    redis_client.delete(f"sms_code:{phone}")
-    redis_client.delete(rate_limit_key)
-    
     # Тільки після успішної валідації коду:
     # Пошук користувача
     result = await db.execute(select(User).where(User.phone == phone))
@@ -456,6 +453,7 @@ async def verify_sms_code(
         db.add(user)
         await db.commit()
         await db.refresh(user)
+        await DashboardCounters.record_user_registered(user)
     
     if not user.is_active:
         raise ForbiddenException("Користувач неактивний")
@@ -485,6 +483,7 @@ async def reset_password(
     db: AsyncSession = Depends(get_db)
 ):
     """Відновлення пароля (відправка SMS коду)"""
+    redis_client = RedisManager.get_client()
     if not redis_client:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -504,27 +503,20 @@ async def reset_password(
         raise NotFoundException("Користувач не знайдено")
     
     # Rate limiting: максимум 3 запити на 15 хвилин для одного номера
-    rate_limit_key = f"reset_password_rate:{phone}"
-    attempts = redis_client.get(rate_limit_key)
-    
-    if attempts and int(attempts) >= 3:
+    if not await register_attempt(redis_client, f"reset_password_rate:{phone}", 3, 900):
         raise BadRequestException(
             "Перевищено ліміт запитів. Спробуйте пізніше (макс 3 на 15 хвилин)"
         )
     
-    # Збільшуємо лічильник
-    if attempts:
-        redis_client.incr(rate_limit_key)
-    else:
-        redis_client.setex(rate_limit_key, 900, 1)  # 15 хвилин TTL
-    
     # Генерація коду
     code = generate_sms_code()
     
     # Зберігаємо код в Redis на 10 хвилин (більше часу для password reset)
     # Два ключі: phone -> code та code -> phone для швидкого пошуку
-    redis_client.setex(f"reset_password:{phone}", 600, code)
-    redis_client.setex(f"reset_password_code:{code}", 600, phone)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.setex(f"reset_password:{phone}", 600, code)
+        pipe.setex(f"reset_password_code:{code}", 600, phone)
+        await pipe.execute()
     
     # Відправка SMS через Celery task (асинхронно)
     from app.tasks.sms import send_verification_code
@@ -552,6 +544,7 @@ async def change_password(
         if not request_data.reset_code:
             raise UnauthorizedException("Потрібна авторизація або код відновлення")
         
+        redis_client = RedisManager.get_client()
         if not redis_client:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -564,14 +557,15 @@ async def change_password(
             raise BadRequestException("Невірний формат коду")
         
         # Отримуємо phone за кодом з Redis
-        phone = redis_client.get(f"reset_password_code:{reset_code}")
+        code_key = f"reset_password_code:{reset_code}"
+        phone = await redis_client.get(code_key)
         
         if not phone:
             raise UnauthorizedException("Код відновлення недійсний або застарів")
         
-        # Перевіряємо код з іншого ключа (для додаткової безпеки)
-        stored_code = redis_client.get(f"reset_password:{phone}")
-        if not stored_code or stored_code != reset_code:
+        # Перевіряємо код з іншого ключа (для додаткової безпеки) і одразу
+        # видаляємо обидва ключі - код не спрацює вдруге паралельним запитом
+        if not await consume_code(redis_client, f"reset_password:{phone}", reset_code, code_key):
             raise UnauthorizedException("Невірний код відновлення")
         
         # Знаходимо користувача
@@ -580,10 +574,6 @@ async def change_password(
         
         if not user:
             raise NotFoundException("Користувач не знайдено")
-        
-        # Видаляємо коди з Redis після успішної перевірки
-        redis_client.delete(f"reset_password:{phone}")
-        redis_client.delete(f"reset_password_code:{reset_code}")
     
     # Перевірка, що користувач знайдено
     if not user:
@@ -594,10 +584,11 @@ async def change_password(
     if not request_data.reset_code:
         if not request_data.old_password:
              raise BadRequestException("Потрібно вказати старий пароль")
-        if not verify_password(request_data.old_password, user.hashed_password):
+        is_valid, _ = await verify_and_update_password(request_data.old_password, user.hashed_password)
+        if not is_valid:
             raise UnauthorizedException("Невірний старий пароль")
 
-    user.hashed_password = get_password_hash(request_data.new_password)
+    user.hashed_password = await hash_password_async(request_data.new_password)
     await db.commit()
     
     return {"message": "Пароль успішно змінено"}
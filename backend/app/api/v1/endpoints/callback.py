@@ -2,12 +2,12 @@
 from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
-import redis
 import json
 
 from app.database import get_db
-from app.core.config import settings
+from app.core.attempts import register_attempt
 from app.core.exceptions import BadRequestException, NotFoundException
+from app.core.redis import RedisManager
 from app.schemas.callback import CallbackRequest, CallbackResponse, CallbackSchema, CallbackUpdate
 from app.models.callback import Callback, CallbackStatus
 from sqlalchemy import select
@@ -15,12 +15,6 @@ from typing import Optional
 
 router = APIRouter()
 
-# Підключення до Redis для rate limiting
-try:
-    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-except Exception:
-    redis_client = None
-
 
 def get_client_ip(request: Request) -> str:
     """Отримання IP адреси клієнта з урахуванням проксі"""
@@ -56,24 +50,10 @@ async def request_callback(
     client_ip = get_client_ip(request)
     
     # Rate limiting: 3 запити на годину з одного IP
+    redis_client = RedisManager.get_client()
     if redis_client:
-        rate_limit_key = f"callback:{client_ip}"
-        current_requests = redis_client.get(rate_limit_key)
-        
-        # Безпечне перетворення в int з обробкою помилок
-        try:
-            requests_count = int(current_requests) if current_requests else 0
-        except (ValueError, TypeError):
-            requests_count = 0
-        
-        if requests_count >= 3:
+        if not await register_attempt(redis_client, f"callback:{client_ip}", 3, 3600):
             raise BadRequestException("Перевищено ліміт запитів. Спробуйте пізніше (макс 3 на годину)")
-        
-        # Збільшуємо лічильник (TTL 1 година)
-        if current_requests:
-            redis_client.incr(rate_limit_key)
-        else:
-            redis_client.setex(rate_limit_key, 3600, 1)
     
     # Зберігаємо в БД
     from app.models.callback import Callback, CallbackStatus
@@ -3,7 +3,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
-from app.database import get_db
+from app.database import get_read_db
 from app.core.exceptions import NotFoundException
 from app.models.category import Category
 from app.schemas.category import CategoryResponse
@@ -21,7 +21,7 @@ from app.models.product import Product
 async def get_categories(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати список активних категорій"""
     stmt = (
@@ -49,7 +49,7 @@ async def get_categories(
 @cache_endpoint(ttl=300, prefix="category_detail")
 async def get_category_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати категорію за slug"""
     stmt = (
@@ -3,21 +3,33 @@ from typing import List, Optional
 from datetime import datetime, timezone
 from decimal import Decimal
 import secrets
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, insert
 from sqlalchemy.orm import selectinload, noload, joinedload
 
-from app.database import get_db
-from app.core.dependencies import get_current_active_user, get_optional_user
+from app.database import get_db, get_read_db
+from app.core.dependencies import get_current_active_user, get_current_auth_user, get_optional_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException
+from app.core.events import (
+    EventService,
+    ORDER_EVENTS_CHANNEL,
+    FINAL_ORDER_STATUSES,
+    SSE_KEEPALIVE,
+    format_sse,
+)
 from app.models.order import Order, OrderItem
+from app.models.order_history import OrderHistory
 from app.models.product import Product
 from app.models.product_size import ProductSize
 from app.models.user import User
 from app.models.address import Address
 from app.schemas.order import OrderCreate, OrderResponse, OrderTrack, OrderStatusUpdate, OrderListResponse
 from app.schemas.address import AddressCreate
+from app.services.order_hooks import on_order_created, on_order_status_changed
+from app.services.sales_rollup import record_order_created, record_order_status_change
 
 router = APIRouter()
 
@@ -273,18 +285,12 @@ async def create_order(
         else:
             raise BadRequestException("Не вдалося згенерувати унікальний номер замовлення")
         
-        # Створення позицій замовлення
-        for item_data in order_items_data:
-            order_item = OrderItem(
-                order_id=new_order.id,
-                product_id=item_data["product_id"],
-                product_name=item_data["product_name"],
-                size_id=item_data.get("size_id"),
-                size_name=item_data.get("size_name"),
-                quantity=item_data["quantity"],
-                price=item_data["price"]
-            )
-            db.add(order_item)
+        # Створення позицій замовлення одним multi-row INSERT
+        await db.execute(
+            insert(OrderItem),
+            [{"order_id": new_order.id, **item_data} for item_data in order_items_data]
+        )
+        await record_order_created(db, new_order)
         
         await db.commit()
         
@@ -329,6 +335,9 @@ async def create_order(
             logging.getLogger(__name__).error(f"Metrics error: {e}")
         # ---------------
         
+        # Real-time дошка замовлень в адмін-панелі
+        await on_order_created(new_order)
+        
         # Stop Timer
         try:
             timer.__exit__(None, None, None)
@@ -391,7 +400,7 @@ async def create_order(
 @router.get("/{order_number}/track", response_model=OrderTrack)
 async def track_order(
     order_number: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Відстеження замовлення за номером (публічний endpoint)"""
     result = await db.execute(
@@ -400,7 +409,10 @@ async def track_order(
         .options(
             selectinload(Order.address),
             selectinload(Order.items).selectinload(OrderItem.product),
-            selectinload(Order.history)
+            # Для відстеження потрібні тільки статус, час та коментар
+            selectinload(Order.history).load_only(
+                OrderHistory.new_status, OrderHistory.changed_at, OrderHistory.comment
+            )
         )
     )
     order = result.scalar_one_or_none()
@@ -410,6 +422,10 @@ async def track_order(
     
     # Мапимо адресу якщо вона є
     response_data = OrderTrack.model_validate(order)
+    response_data.status_history = [
+        {"status": entry.new_status, "changed_at": entry.changed_at, "comment": entry.comment}
+        for entry in order.history
+    ]
     
     # Визначаємо тип доставки
     if not order.address_id:
@@ -428,12 +444,69 @@ async def track_order(
     return response_data
 
 
+@router.get("/{order_number}/events")
+async def order_events(
+    order_number: str,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    """Server-Sent Events стрім статусу замовлення (публічний endpoint).
+    
+    Перша подія - поточний статус з БД, далі - зміни статусу з Redis pub/sub
+    (через спільного слухача воркера). БД не опитується, поки клієнт чекає.
+    Якщо Redis недоступний, стрім закривається після першої події і клієнт
+    повертається до /track.
+    """
+    result = await db.execute(
+        select(Order.order_number, Order.status, Order.delivery_time, Order.updated_at)
+        .where(Order.order_number == order_number)
+    )
+    snapshot = result.one_or_none()
+    if not snapshot:
+        raise NotFoundException("Замовлення не знайдено")
+    
+    # Підписка лише для наявного і ще не завершеного замовлення
+    subscription = None
+    if snapshot.status not in FINAL_ORDER_STATUSES:
+        subscription = EventService.subscribe(ORDER_EVENTS_CHANNEL.format(order_number=order_number))
+    
+    # Звільняємо з'єднання з БД - далі стрім живе тільки на подіях
+    await db.close()
+    
+    async def event_stream():
+        try:
+            yield format_sse(dict(snapshot._mapping), event="status")
+            if subscription is None:
+                return
+            
+            async for event in EventService.listen(subscription):
+                if await request.is_disconnected():
+                    break
+                if event is None:
+                    yield SSE_KEEPALIVE
+                    continue
+                yield format_sse(event, event="status")
+                if event.get("status") in FINAL_ORDER_STATUSES:
+                    break
+        finally:
+            EventService.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Вимикаємо буферизацію nginx
+        }
+    )
+
+
 @router.get("/me", response_model=List[OrderListResponse])
 async def get_my_orders(
     skip: int = 0,
     limit: int = 20,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Отримання моїх замовлень"""
     result = await db.execute(
@@ -441,7 +514,6 @@ async def get_my_orders(
         .where(Order.user_id == current_user.id)
         .options(
             noload(Order.reviews),
-            noload(Order.status_history),
             joinedload(Order.address)
             # items завантажаться автоматично через lazy="selectin" в моделі
             # АЛЕ оскільки ми використовуємо OrderListResponse, вони не будуть серіалізовані
@@ -459,8 +531,8 @@ async def get_my_orders(
 @router.get("/me/{order_id}", response_model=OrderResponse)
 async def get_my_order(
     order_id: int,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Отримання деталей мого замовлення"""
     result = await db.execute(
@@ -617,27 +689,31 @@ async def reorder(
     db.add(new_order)
     await db.flush()
     
-    # Створення позицій замовлення (ціни завжди з БД)
-    for item_data in order_items_data:
-        new_item = OrderItem(
-            order_id=new_order.id,
-            product_id=item_data["product_id"],
-            product_name=item_data["product_name"],
-            size_id=item_data.get("size_id"),
-            size_name=item_data.get("size_name"),
-            quantity=item_data["quantity"],
-            price=item_data["price"]  # Ціна завжди з БД
-        )
-        db.add(new_item)
+    # Створення позицій замовлення одним multi-row INSERT (ціни завжди з БД)
+    await db.execute(
+        insert(OrderItem),
+        [{"order_id": new_order.id, **item_data} for item_data in order_items_data]
+    )
+    await record_order_created(db, new_order)
     
     await db.commit()
-    await db.refresh(new_order)
     
+    # Reload with relationships
     result = await db.execute(
-        select(OrderItem).where(OrderItem.order_id == new_order.id)
+        select(Order)
+        .where(Order.id == new_order.id)
+        .options(
+            selectinload(Order.items).joinedload(OrderItem.product),
+            selectinload(Order.address),
+            selectinload(Order.history)
+        )
     )
-    new_order.items = result.scalars().all()
+    new_order = result.scalar_one()
     
+    await on_order_created(new_order)
+    
+    return new_order
+
 
 @router.patch("/{order_id}/status", response_model=OrderResponse)
 async def update_order_status(
@@ -667,21 +743,33 @@ async def update_order_status(
         
     order.status = new_status
     
-    # Оновлення історії
-    history = order.status_history or []
-    history.append({
-        "old_status": old_status,
-        "new_status": new_status,
-        "changed_by": current_user.id,
-        "changed_at": datetime.now(timezone.utc).isoformat(),
-        "comment": status_data.comment or "Зміна статусу адміністратором"
-    })
-    order.status_history = history
+    # Оновлення історії (append-only)
+    db.add(OrderHistory(
+        order_id=order.id,
+        manager_id=current_user.id,
+        manager_name=current_user.name or current_user.email or f"Manager #{current_user.id}",
+        previous_status=old_status,
+        new_status=new_status,
+        comment=status_data.comment or "Зміна статусу адміністратором"
+    ))
+    await record_order_status_change(db, order, old_status)
     
     await db.commit()
-    await db.refresh(order)
     
-    # Тут можна додати відправку сповіщень користувачу про зміну статусу
+    # Reload with relationships
+    result = await db.execute(
+        select(Order)
+        .where(Order.id == order.id)
+        .options(
+            selectinload(Order.items).joinedload(OrderItem.product),
+            selectinload(Order.address),
+            selectinload(Order.history)
+        )
+        .execution_options(populate_existing=True)
+    )
+    order = result.scalar_one()
+    
+    await on_order_status_changed(order, old_status, status_data.comment)
     
     return order
 
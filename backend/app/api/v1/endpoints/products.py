@@ -6,7 +6,7 @@ from sqlalchemy import select, and_, or_
 from sqlalchemy.orm import noload
 from pydantic import BaseModel, Field
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.core.exceptions import NotFoundException
 from app.models.product import Product
 from app.models.category import Category
@@ -34,7 +34,7 @@ async def get_products(
     is_vegan: Optional[bool] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати список продуктів з фільтрацією"""
     query = select(Product).where(Product.is_available == True)
@@ -88,7 +88,7 @@ async def get_products(
 @cache_endpoint(ttl=300, prefix="products_popular")
 async def get_popular_products(
     limit: int = Query(10, ge=1, le=50),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати популярні товари"""
     result = await db.execute(
@@ -110,7 +110,7 @@ async def get_popular_products(
 async def get_product_recommendations(
     product_id: int,
     limit: int = Query(4, ge=1, le=20),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати рекомендації товарів (похожі товари)"""
     # Знаходимо товар
@@ -140,7 +140,7 @@ async def get_product_recommendations(
 @router.get("/{slug}", response_model=ProductResponse)
 async def get_product_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати продукт за slug"""
     result = await db.execute(
@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from app.database import get_db
+from app.database import get_read_db
 from app.core.exceptions import NotFoundException
 from app.models.promotion import Promotion
 from app.schemas.promotion import PromotionResponse, PromotionPublic
@@ -18,7 +18,7 @@ async def get_promotions(
     limit: int = Query(20, ge=1, le=100),
     category_id: Optional[int] = None,
     product_id: Optional[int] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримання активних акцій"""
     # Використовуємо локальний час сервера для порівняння з датами без timezone
@@ -63,7 +63,7 @@ async def get_promotions(
 @router.get("/{slug}", response_model=PromotionPublic)
 async def get_promotion_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримання акції за slug"""
     now = datetime.now()
@@ -5,8 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, delete
 from sqlalchemy.orm import selectinload
 
-from app.database import get_db
-from app.core.dependencies import get_current_active_user, get_optional_user
+from app.database import get_db, get_read_db
+from app.core.dependencies import get_current_auth_user, get_optional_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import NotFoundException, BadRequestException, ForbiddenException
 from app.models.review import Review
 from app.models.user import User
@@ -26,7 +27,7 @@ async def get_reviews(
     limit: int = Query(20, ge=1, le=100),
     product_id: Optional[int] = None,
     rating: Optional[int] = Query(None, ge=1, le=5),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримання публічних відгуків"""
     query = select(Review).where(Review.is_published == True)
@@ -138,7 +139,7 @@ async def get_product_reviews(
     product_id: int,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримання відгуків по товару"""
     # Перевірка чи існує товар
@@ -285,8 +286,8 @@ async def create_review(
 async def get_my_reviews(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_read_db, scope="function"),
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Отримання моїх відгуків"""
     result = await db.execute(
@@ -306,7 +307,7 @@ async def update_my_review(
     review_id: int,
     review_data: ReviewUpdate,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Оновлення мого відгуку"""
     result = await db.execute(
@@ -343,7 +344,7 @@ async def update_my_review(
 async def delete_my_review(
     review_id: int,
     db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Видалення мого відгуку"""
     result = await db.execute(
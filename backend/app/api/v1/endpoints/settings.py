@@ -1,7 +1,7 @@
 """API endpoints для публічних налаштувань"""
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import get_db
+from app.database import get_read_db
 from pydantic import BaseModel
 from typing import Optional
 
@@ -24,7 +24,7 @@ class PublicSettingsResponse(BaseModel):
 
 @router.get("/public", response_model=PublicSettingsResponse)
 async def get_public_settings(
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db, scope="function")
 ):
     """Отримати публічні налаштування (графік роботи, контакти)"""
     from app.models.setting import Setting
@@ -5,9 +5,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 
 from app.database import get_db
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_auth_user
+from app.core.user_cache import AuthUser
 from app.core.exceptions import ForbiddenException
-from app.models.user import User
 from app.utils.file_upload import (
     save_uploaded_file,
     save_image_with_processing,
@@ -30,7 +30,7 @@ async def upload_image(
     file: UploadFile = File(...),
     subdirectory: str = "images",
     create_thumbnail: bool = False,
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Завантаження зображення (тільки для авторизованих користувачів)"""
     # Валідація subdirectory - захист від path traversal
@@ -63,7 +63,7 @@ async def upload_image_admin(
     file: UploadFile = File(...),
     subdirectory: str = "admin",
     create_thumbnail: bool = True,
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Завантаження зображення для адмін-панелі (тільки для адмінів)"""
     if not current_user.is_admin:
@@ -98,7 +98,7 @@ async def upload_image_admin(
 async def upload_file(
     file: UploadFile = File(...),
     subdirectory: str = "files",
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Завантаження файлу (тільки для авторизованих користувачів)"""
     # Валідація subdirectory - захист від path traversal
@@ -128,7 +128,7 @@ async def upload_file(
 @router.delete("/file")
 async def delete_file_endpoint(
     file_url: str,
-    current_user: User = Depends(get_current_active_user)
+    current_user: AuthUser = Depends(get_current_auth_user)
 ):
     """Видалення файлу (тільки для авторизованих користувачів)"""
     # Адміни можуть видаляти будь-які файли
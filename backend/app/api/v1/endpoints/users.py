@@ -3,11 +3,12 @@ from typing import List, Optional
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException, status, Query, File, UploadFile, Form
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, delete
+from sqlalchemy import select, func, delete, insert, update
 from sqlalchemy.orm import selectinload, joinedload
 
 from app.database import get_db
-from app.core.dependencies import get_current_active_user
+from app.core.dependencies import get_current_active_user, get_current_auth_user
+from app.core.user_cache import AuthUser, UserAuthCache
 from app.core.exceptions import (
     NotFoundException,
     BadRequestException,
@@ -16,6 +17,7 @@ from app.core.exceptions import (
 from app.models.user import User
 from app.models.address import Address
 from app.models.order import Order, OrderItem
+from app.models.order_history import OrderHistory
 from app.models.product import Product
 from app.models.product_size import ProductSize
 from app.models.review import Review
@@ -27,6 +29,8 @@ from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse
 from app.models.cart import Cart, CartItem
 from app.schemas.cart import CartResponse, CartSave
 from app.schemas.favorite import FavoriteResponse
+from app.services.order_hooks import on_order_created, on_order_status_changed
+from app.services.sales_rollup import record_order_created, record_order_status_change
 
 router = APIRouter()
 
@@ -76,6 +80,7 @@ async def delete_my_account(
     """Видалення акаунту (деактивація)"""
     current_user.is_active = False
     await db.commit()
+    await UserAuthCache.invalidate(current_user.id)
     
     return None
 
@@ -84,7 +89,7 @@ async def delete_my_account(
 
 @router.get("/me/addresses", response_model=List[AddressResponse])
 async def get_my_addresses(
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Отримання моїх адрес"""
@@ -97,22 +102,24 @@ async def get_my_addresses(
     return addresses
 
 
+async def _reset_default_addresses(db: AsyncSession, user_id: int, keep_id: Optional[int] = None) -> None:
+    """Зняти позначку default з адрес користувача одним UPDATE (замість циклу по адресах)"""
+    query = update(Address).where(Address.user_id == user_id, Address.is_default.is_(True))
+    if keep_id is not None:
+        query = query.where(Address.id != keep_id)
+    await db.execute(query.values(is_default=False))
+
+
 @router.post("/me/addresses", response_model=AddressResponse, status_code=status.HTTP_201_CREATED)
 async def create_address(
     address_data: AddressCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Додати нову адресу"""
     # Якщо це перша адреса або встановлено як default, зробити її default
     if address_data.is_default:
-        # Скинути всі інші адреси
-        result = await db.execute(
-            select(Address).where(Address.user_id == current_user.id)
-        )
-        existing_addresses = result.scalars().all()
-        for addr in existing_addresses:
-            addr.is_default = False
+        await _reset_default_addresses(db, current_user.id)
     
     new_address = Address(
         user_id=current_user.id,
@@ -130,7 +137,7 @@ async def create_address(
 async def update_address(
     address_id: int,
     address_data: AddressUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Оновити адресу"""
@@ -152,13 +159,7 @@ async def update_address(
     
     # Якщо встановлюється як default
     if address_data.is_default:
-        result = await db.execute(
-            select(Address).where(Address.user_id == current_user.id)
-        )
-        existing_addresses = result.scalars().all()
-        for addr in existing_addresses:
-            if addr.id != address_id:
-                addr.is_default = False
+        await _reset_default_addresses(db, current_user.id, keep_id=address_id)
     
     await db.commit()
     await db.refresh(address)
@@ -169,7 +170,7 @@ async def update_address(
 @router.delete("/me/addresses/{address_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_address(
     address_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Видалити адресу"""
@@ -211,7 +212,7 @@ async def delete_address(
 @router.put("/me/addresses/{address_id}/default", response_model=AddressResponse)
 async def set_default_address(
     address_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Встановити адресу за замовчуванням"""
@@ -227,12 +228,7 @@ async def set_default_address(
         raise NotFoundException("Адреса не знайдена")
     
     # Скинути всі інші адреси
-    result = await db.execute(
-        select(Address).where(Address.user_id == current_user.id)
-    )
-    existing_addresses = result.scalars().all()
-    for addr in existing_addresses:
-        addr.is_default = False
+    await _reset_default_addresses(db, current_user.id, keep_id=address_id)
     
     address.is_default = True
     await db.commit()
@@ -247,7 +243,7 @@ async def set_default_address(
 async def get_my_orders(
     skip: int = 0,
     limit: int = 20,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Отримання моїх замовлень"""
@@ -270,7 +266,7 @@ async def get_my_orders(
 @router.get("/me/orders/{order_id}", response_model=OrderResponse)
 async def get_my_order(
     order_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Деталі мого замовлення"""
@@ -419,18 +415,12 @@ async def reorder(
     db.add(new_order)
     await db.flush()
     
-    # Створення позицій замовлення (ціни завжди з БД)
-    for item_data in order_items_data:
-        new_item = OrderItemModel(
-            order_id=new_order.id,
-            product_id=item_data["product_id"],
-            product_name=item_data["product_name"],
-            size_id=item_data.get("size_id"),
-            size_name=item_data.get("size_name"),
-            quantity=item_data["quantity"],
-            price=item_data["price"]  # Ціна завжди з БД
-        )
-        db.add(new_item)
+    # Створення позицій замовлення одним multi-row INSERT (ціни завжди з БД)
+    await db.execute(
+        insert(OrderItemModel),
+        [{"order_id": new_order.id, **item_data} for item_data in order_items_data]
+    )
+    await record_order_created(db, new_order)
     
     await db.commit()
     await db.commit()
@@ -448,6 +438,8 @@ async def reorder(
     )
     new_order = result.scalar_one()
     
+    await on_order_created(new_order)
+    
     return new_order
 
 
@@ -458,8 +450,6 @@ async def cancel_order(
     db: AsyncSession = Depends(get_db)
 ):
     """Скасувати замовлення"""
-    from datetime import datetime, timezone
-    
     result = await db.execute(
         select(Order).where(
             Order.id == order_id,
@@ -491,22 +481,22 @@ async def cancel_order(
     old_status = order.status
     order.status = "cancelled"
     
-    # Оновлення історії статусів
-    history = order.status_history or []
-    history.append({
-        "old_status": old_status,
-        "new_status": "cancelled",
-        "changed_by": current_user.id,
-        "changed_at": datetime.now(timezone.utc).isoformat(),
-        "comment": "Скасовано користувачем"
-    })
-    order.status_history = history
+    # Оновлення історії статусів (append-only)
+    db.add(OrderHistory(
+        order_id=order.id,
+        manager_id=current_user.id,
+        manager_name=current_user.name or current_user.phone,
+        previous_status=old_status,
+        new_status="cancelled",
+        comment="Скасовано користувачем"
+    ))
+    await record_order_status_change(db, order, old_status)
     
     await db.commit()
     await db.commit()
     # await db.refresh(order)
     
-    # Reload with relationships
+    # Reload with relationships (populate_existing - щоб підхопити новий рядок історії)
     result = await db.execute(
         select(Order)
         .where(Order.id == order.id)
@@ -515,9 +505,12 @@ async def cancel_order(
             selectinload(Order.address),
             selectinload(Order.history)
         )
+        .execution_options(populate_existing=True)
     )
     order = result.scalar_one()
     
+    await on_order_status_changed(order, old_status, "Скасовано користувачем")
+    
     return order
 
 
@@ -530,7 +523,7 @@ async def create_review(
     order_id: int = Form(None),
     product_id: int = Form(None),
     images: List[UploadFile] = File(None),
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Додати відгук"""
@@ -583,7 +576,7 @@ async def create_review(
 async def get_my_reviews(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Мої відгуки"""
@@ -602,7 +595,7 @@ async def get_my_reviews(
 async def update_my_review(
     review_id: int,
     review_data: ReviewUpdate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Редагувати відгук"""
@@ -635,7 +628,7 @@ async def update_my_review(
 @router.delete("/me/reviews/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_my_review(
     review_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Видалити відгук"""
@@ -661,7 +654,7 @@ async def delete_my_review(
 
 @router.get("/me/favorites", response_model=List[FavoriteResponse])
 async def get_my_favorites(
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Отримання обраних товарів"""
@@ -678,7 +671,7 @@ async def get_my_favorites(
 @router.post("/me/favorites/{product_id}", status_code=status.HTTP_201_CREATED)
 async def add_to_favorites(
     product_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Додати товар в обране"""
@@ -717,7 +710,7 @@ async def add_to_favorites(
 @router.delete("/me/favorites/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_from_favorites(
     product_id: int,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Видалити товар з обраного"""
@@ -818,7 +811,7 @@ async def get_referral_info(
 
 @router.get("/me/cart", response_model=CartResponse)
 async def get_my_cart(
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Отримання кошика користувача"""
@@ -874,7 +867,7 @@ async def get_my_cart(
 
 @router.delete("/me/cart", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_my_cart(
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Очищення кошика користувача"""
@@ -900,7 +893,7 @@ async def delete_my_cart(
 @router.post("/me/cart", status_code=status.HTTP_204_NO_CONTENT)
 async def save_my_cart(
     cart_data: CartSave,
-    current_user: User = Depends(get_current_active_user),
+    current_user: AuthUser = Depends(get_current_auth_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Збереження/Синхронізація кошика"""
@@ -923,32 +916,40 @@ async def save_my_cart(
         await db.commit()
         return None
 
-    # Додаємо нові товари
+    # Перевіряємо існування продуктів та розмірів одним запитом на таблицю
+    product_ids = {item.product_id for item in cart_data.items}
+    size_ids = {item.size_id for item in cart_data.items if item.size_id}
+    
+    products_result = await db.execute(select(Product.id).where(Product.id.in_(product_ids)))
+    existing_product_ids = set(products_result.scalars().all())
+    
+    existing_size_ids = set()
+    if size_ids:
+        sizes_result = await db.execute(select(ProductSize.id).where(ProductSize.id.in_(size_ids)))
+        existing_size_ids = set(sizes_result.scalars().all())
+    
+    cart_items_data = []
     for item_data in cart_data.items:
-        # Перевіряємо чи існує продукт
-        product_result = await db.execute(select(Product).where(Product.id == item_data.product_id))
-        product = product_result.scalar_one_or_none()
-        
-        if not product:
+        if item_data.product_id not in existing_product_ids:
             continue # Пропускаємо видалені продукти
             
         # Якщо розмір 0 або null, вважаємо як null
         size_id = item_data.size_id if item_data.size_id else None
         
-        # Перевіряємо чи існує розмір, якщо він вказаний
-        if size_id:
-            size_result = await db.execute(select(ProductSize).where(ProductSize.id == size_id))
-            size = size_result.scalar_one_or_none()
-            if not size:
-                size_id = None # Якщо розмір видалено, пробуємо додати без розміру (або можна continue)
+        # Якщо розмір видалено, пробуємо додати без розміру (або можна continue)
+        if size_id and size_id not in existing_size_ids:
+            size_id = None
         
-        new_item = CartItem(
-            cart_id=cart.id,
-            product_id=item_data.product_id,
-            size_id=size_id,
-            quantity=item_data.quantity
-        )
-        db.add(new_item)
+        cart_items_data.append({
+            "cart_id": cart.id,
+            "product_id": item_data.product_id,
+            "size_id": size_id,
+            "quantity": item_data.quantity
+        })
+    
+    # Додаємо нові товари одним multi-row INSERT
+    if cart_items_data:
+        await db.execute(insert(CartItem), cart_items_data)
         
     await db.commit()
     return None
@@ -12,6 +12,8 @@ celery_app = Celery(
         "app.tasks.image_processing",
         "app.tasks.email",
         "app.tasks.sms",
+        "app.tasks.statistics",
+        "app.tasks.export",
     ]
 )
 
@@ -52,4 +54,36 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.image_processing.cleanup_old_files",
         "schedule": crontab(hour=3, minute=0),
     },
+    # Звірка денного rollup продажів за останні 3 дні
+    "rebuild-sales-rollup": {
+        "task": "app.tasks.statistics.rebuild_sales_rollup",
+        "schedule": crontab(hour=3, minute=30),
+        "kwargs": {"days": 3},
+    },
+    # Звірка лідербордів топ-товарів / топ-клієнтів щогодини
+    "rebuild-leaderboards": {
+        "task": "app.tasks.statistics.rebuild_leaderboards",
+        "schedule": crontab(minute=5),
+    },
+    # Звірка лічильників дашборду кожні 10 хвилин
+    "rebuild-dashboard-counters": {
+        "task": "app.tasks.statistics.rebuild_dashboard_counters",
+        "schedule": crontab(minute="*/10"),
+    },
+    # Звірка HyperLogLog унікальних клієнтів щодня о 3:45
+    "rebuild-unique-customers": {
+        "task": "app.tasks.statistics.rebuild_unique_customers",
+        "schedule": crontab(hour=3, minute=45),
+        "kwargs": {"days": 31},
+    },
+    # Parquet-знімок таблиць для звітів (DuckDB) щодня о 2:30
+    "export-analytics-lake": {
+        "task": "app.tasks.statistics.export_analytics_lake",
+        "schedule": crontab(hour=2, minute=30),
+    },
+    # RFM-сегменти та когорти клієнтів щодня о 4:00
+    "compute-customer-analytics": {
+        "task": "app.tasks.statistics.compute_customer_analytics",
+        "schedule": crontab(hour=4, minute=0),
+    },
 }
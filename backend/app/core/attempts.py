@@ -0,0 +1,43 @@
+"""Атомарні лічильники спроб і одноразові коди в Redis (Lua-скрипти).
+
+Перевірка ліміту і збільшення лічильника виконуються одним скриптом, тож
+паралельні запити не можуть "проскочити" між GET і INCR. Так само код
+(SMS / відновлення пароля) перевіряється і видаляється атомарно - один код
+не можна використати двічі паралельними запитами.
+"""
+import redis.asyncio as redis
+
+# KEYS[1] - лічильник, ARGV[1] - ліміт, ARGV[2] - вікно в секундах.
+# Повертає новий лічильник або -1, якщо ліміт уже вичерпано (без збільшення).
+_HIT_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if current >= tonumber(ARGV[1]) then
+    return -1
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return current
+"""
+
+# KEYS[1] - ключ з кодом, решта KEYS видаляються разом з ним при збігу.
+_CONSUME_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    redis.call('DEL', unpack(KEYS))
+    return 1
+end
+return 0
+"""
+
+
+async def register_attempt(client: redis.Redis, key: str, limit: int, window: int) -> bool:
+    """Зарахувати спробу; False - ліміт `limit` за `window` секунд вичерпано"""
+    script = client.register_script(_HIT_SCRIPT)
+    return await script(keys=[key], args=[limit, window]) != -1
+
+
+async def consume_code(client: redis.Redis, code_key: str, code: str, *related_keys: str) -> bool:
+    """Перевірити код і, якщо він вірний, видалити його разом з related_keys"""
+    script = client.register_script(_CONSUME_SCRIPT)
+    return await script(keys=[code_key, *related_keys], args=[code]) == 1
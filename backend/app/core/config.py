@@ -9,6 +9,8 @@ class Settings(BaseSettings):
     VERSION: str = "0.1.0"
     API_V1_PREFIX: str = "/api/v1"
     ENVIRONMENT: str = "development"  # development, production, testing
+    # Часовий пояс магазину: межі днів для статистики та звітів
+    SHOP_TIMEZONE: str = "Europe/Kyiv"
     
     # Database Connection Vars (loaded from .env)
     POSTGRES_SERVER: str = "localhost"
@@ -35,12 +37,22 @@ class Settings(BaseSettings):
     POSTGRES_POOL_TIMEOUT: int = 30
     POSTGRES_CONNECT_TIMEOUT: int = 10
     POSTGRES_COMMAND_TIMEOUT: int = 30
+    # Репліки для читання (через кому); порожньо - всі запити йдуть на primary
+    DATABASE_REPLICA_URLS: Union[List[str], str] = []
+    # Скільки секунд після власного запису клієнт читає з primary (затримка реплікації)
+    READ_YOUR_WRITES_SECONDS: int = 5
     
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Вартість bcrypt (log2 раундів). Хеші з іншою вартістю перехешовуються при вході
+    BCRYPT_ROUNDS: int = 12
+    # Скільки хешувань паролів виконується паралельно (окремі потоки)
+    PASSWORD_HASH_WORKERS: int = 4
+    # Скільки секунд кешуються id / is_active / role для перевірки доступу (0 - вимкнено)
+    USER_AUTH_CACHE_TTL: int = 5
     
     # CORS
     ALLOWED_HOSTS: Union[List[str], str] = ["*"]
@@ -55,7 +67,7 @@ class Settings(BaseSettings):
         "https://api.crocosushi.com"
     ]
     
-    @field_validator("CORS_ORIGINS", "ALLOWED_HOSTS", mode="before")
+    @field_validator("CORS_ORIGINS", "ALLOWED_HOSTS", "DATABASE_REPLICA_URLS", mode="before")
     @classmethod
     def parse_list_from_str(cls, v: Any) -> List[str]:
         if isinstance(v, str):
@@ -67,9 +79,25 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     
+    # Rate limiting (політики - в app/core/rate_limit.py)
+    RATE_LIMIT_ENABLED: bool = True
+    
+    # Middleware: запити, довші за це (мс), пишуться в лог як повільні (0 - вимкнено)
+    SLOW_REQUEST_MS: int = 1000
+    # Gzip у застосунку; в production стискає Caddy, тому за замовчуванням вимкнено
+    GZIP_ENABLED: bool = False
+    GZIP_MIN_SIZE: int = 1000
+    
     # File Upload
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 5 * 1024 * 1024  # 5MB
+    # Файли фонових експортів (підкаталог UPLOAD_DIR, не віддається як статика)
+    EXPORT_SUBDIR: str = "exports"
+    EXPORT_RETENTION_DAYS: int = 2
+    
+    # Parquet-знімки таблиць для звітності через DuckDB
+    ANALYTICS_DATA_DIR: str = "analytics_data"
+    ANALYTICS_SNAPSHOTS_KEEP: int = 2
     
     # Celery
     CELERY_BROKER_URL: Optional[str] = None
@@ -92,7 +120,17 @@ class Settings(BaseSettings):
     
     # Logging
     LOG_LEVEL: str = "INFO"
+    # echo=True engine-а (кожен запит з параметрами) - лише для локального налагодження
     ECHO_SQL: bool = False
+    # Трасування SQL (app/core/sql_tracing.py): X-DB-Queries, Server-Timing db, метрики,
+    # пошук N+1. None - увімкнено лише при ENVIRONMENT=development
+    SQL_TRACING_ENABLED: Optional[bool] = None
+    # Частка HTTP запитів, у яких текст кожного SQL пишеться в лог (0.0 - 1.0)
+    SQL_TRACE_SAMPLE_RATE: float = 0.0
+    # SQL запити, довші за це (мс), завжди пишуться в лог (0 - вимкнено)
+    SQL_SLOW_QUERY_MS: int = 200
+    # Однаковий SQL, виконаний стільки разів за HTTP запит, - ймовірний N+1 (0 - не шукати)
+    SQL_N_PLUS_ONE_THRESHOLD: int = 5
     
     # Email & SMS ... (kept as is, truncated here implicitly if unchanged in file)
     SMTP_SERVER: Optional[str] = None
@@ -7,18 +7,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.database import get_db
 from app.core.security import decode_access_token, get_token_data
 from app.core.exceptions import UnauthorizedException, ForbiddenException
+from app.core.user_cache import AuthUser, UserAuthCache
 from app.models.user import User, UserRole
 from sqlalchemy import select
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
-    """Отримання поточного користувача з токену"""
-    token = credentials.credentials
+def _user_id_from_token(token: str) -> int:
+    """ID користувача з access токену"""
     payload = decode_access_token(token)
     
     if payload is None:
@@ -29,22 +26,59 @@ async def get_current_user(
         raise UnauthorizedException("Невірний токен")
     
     try:
-        user_id_int = int(user_id)
+        return int(user_id)
     except ValueError:
         raise UnauthorizedException("Невірний формат ID користувача")
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> User:
+    """Отримання поточного користувача з токену (повний запис з БД)"""
+    user_id = _user_id_from_token(credentials.credentials)
     
-    result = await db.execute(select(User).where(User.id == user_id_int))
+    result = await db.execute(select(User).where(User.id == user_id))
     user = result.scalar_one_or_none()
     
     if user is None:
         raise UnauthorizedException("Користувач не знайдено")
     
+    await UserAuthCache.set(AuthUser.from_user(user))
+    
     if not user.is_active:
         raise ForbiddenException("Користувач неактивний")
     
     return user
 
 
+async def get_current_auth_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_db)
+) -> AuthUser:
+    """Поточний користувач для перевірки доступу: id, is_active, role.
+    
+    Для обробників, яким не потрібні інші поля користувача - зазвичай без запиту до БД.
+    """
+    user_id = _user_id_from_token(credentials.credentials)
+    
+    auth = await UserAuthCache.get(user_id)
+    if auth is None:
+        result = await db.execute(
+            select(User.id, User.is_active, User.role).where(User.id == user_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            raise UnauthorizedException("Користувач не знайдено")
+        auth = AuthUser(id=row.id, is_active=row.is_active, role=UserRole(row.role))
+        await UserAuthCache.set(auth)
+    
+    if not auth.is_active:
+        raise ForbiddenException("Користувач неактивний")
+    
+    return auth
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -55,8 +89,8 @@ async def get_current_active_user(
 
 
 async def get_current_admin_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthUser = Depends(get_current_auth_user)
+) -> AuthUser:
     """Отримання адміна"""
     if not current_user.is_admin:
         raise ForbiddenException("Недостатньо прав доступу")
@@ -64,8 +98,8 @@ async def get_current_admin_user(
 
 
 async def get_current_manager_user(
-    current_user: User = Depends(get_current_active_user)
-) -> User:
+    current_user: AuthUser = Depends(get_current_auth_user)
+) -> AuthUser:
     """Отримання менеджера (або адміна)"""
     if current_user.role not in [UserRole.ADMIN, UserRole.MANAGER]:
         raise ForbiddenException("Недостатньо прав доступу")
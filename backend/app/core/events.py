@@ -0,0 +1,194 @@
+"""Real-time події через Redis pub/sub (для Server-Sent Events).
+
+Воркер тримає одне pub/sub з'єднання з Redis (EventService.start у lifespan):
+канал адмін-дошки і шаблон каналів замовлень. Кожен SSE стрім отримує власну
+чергу (Subscription), куди слухач роздає події його каналу, - кількість
+з'єднань з Redis не залежить від кількості відкритих стрімів.
+"""
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from app.core.redis import RedisManager
+from app.schemas.order import OrderListResponse
+
+logger = logging.getLogger(__name__)
+
+# Канал подій конкретного замовлення (публічне відстеження)
+ORDER_EVENTS_CHANNEL = "order_events:{order_number}"
+# Канал усіх замовлень для адмін-панелі (нові замовлення та зміни статусів)
+ADMIN_ORDER_EVENTS_CHANNEL = "admin_order_events"
+
+# Інтервал keepalive-коментарів, щоб проксі не закривали "тихе" з'єднання
+SSE_KEEPALIVE_SECONDS = 15
+SSE_KEEPALIVE = ": keepalive\n\n"
+
+# Після цих статусів оновлень вже не буде - стрім можна закривати
+FINAL_ORDER_STATUSES = {"completed", "cancelled"}
+
+# Пауза перед повторною підпискою, якщо з'єднання з Redis обірвалось
+RESUBSCRIBE_DELAY = 5
+# Подій у черзі одного стріму; для повільного клієнта старіші відкидаються
+SUBSCRIPTION_QUEUE_SIZE = 100
+# Кінець стріму (слухач втратив з'єднання з Redis)
+_CLOSED = object()
+
+
+class Subscription:
+    """Черга подій одного SSE стріму"""
+    __slots__ = ("channel", "queue")
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def put(self, event: Any) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+
+class EventService:
+    # канал -> черги стрімів цього воркера
+    _subscriptions: Dict[str, Set[Subscription]] = {}
+    _listener: Optional[asyncio.Task] = None
+    _connected: bool = False
+
+    @staticmethod
+    def queue_publish(pipe, channel: str, data: dict) -> None:
+        """Публікація в складі pipeline (виконує і обробляє помилки викликач)"""
+        pipe.publish(channel, json.dumps(data, default=str))
+
+    @classmethod
+    def subscribe(cls, channel: str) -> Optional[Subscription]:
+        """Підписка стріму на канал. None, якщо слухач воркера не підключений до Redis."""
+        if not cls._connected:
+            return None
+        subscription = Subscription(channel)
+        cls._subscriptions.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    @classmethod
+    def unsubscribe(cls, subscription: Optional[Subscription]) -> None:
+        if subscription is None:
+            return
+        subscribers = cls._subscriptions.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del cls._subscriptions[subscription.channel]
+
+    @staticmethod
+    async def listen(
+        subscription: Subscription,
+        timeout: float = SSE_KEEPALIVE_SECONDS,
+    ) -> AsyncIterator[Optional[dict]]:
+        """Події каналу; None - якщо за `timeout` секунд нічого не прийшло"""
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            if event is _CLOSED:
+                return
+            yield event
+
+    @classmethod
+    def _dispatch(cls, channel: str, raw: Any) -> None:
+        subscribers = cls._subscriptions.get(channel)
+        if not subscribers:
+            return
+        try:
+            event = json.loads(raw)
+        except (TypeError, json.JSONDecodeError):
+            logger.warning(f"Skipping malformed event on {channel}: {raw!r}")
+            return
+        for subscription in subscribers:
+            subscription.put(event)
+
+    @classmethod
+    def _close_all(cls) -> None:
+        cls._connected = False
+        for subscribers in cls._subscriptions.values():
+            for subscription in subscribers:
+                subscription.put(_CLOSED)
+
+    @classmethod
+    async def _listen(cls) -> None:
+        while True:
+            client = RedisManager.get_client()
+            if not client:
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+                continue
+            pubsub = client.pubsub()
+            try:
+                await pubsub.subscribe(ADMIN_ORDER_EVENTS_CHANNEL)
+                await pubsub.psubscribe(ORDER_EVENTS_CHANNEL.format(order_number="*"))
+                cls._connected = True
+                async for message in pubsub.listen():
+                    if message["type"] in ("message", "pmessage"):
+                        cls._dispatch(message["channel"], message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event listener error: {e}")
+            finally:
+                # Відкриті стріми завершуються - клієнти перепідключаться
+                cls._close_all()
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    @classmethod
+    async def start(cls) -> None:
+        if cls._listener is None:
+            cls._listener = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._listener is not None:
+            cls._listener.cancel()
+            try:
+                await cls._listener
+            except asyncio.CancelledError:
+                pass
+            cls._listener = None
+
+
+def format_sse(data: Any, event: Optional[str] = None) -> str:
+    """Серіалізація події у формат text/event-stream"""
+    lines = []
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, default=str, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def order_status_events(order, previous_status: Optional[str], comment: Optional[str] = None) -> List[Tuple[str, dict]]:
+    """Події зміни статусу: клієнту (відстеження) та в адмін-панель"""
+    event = {
+        "order_id": order.id,
+        "order_number": order.order_number,
+        "status": order.status,
+        "previous_status": previous_status,
+        "comment": comment,
+        "changed_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return [
+        (ORDER_EVENTS_CHANNEL.format(order_number=order.order_number), event),
+        (ADMIN_ORDER_EVENTS_CHANNEL, {"type": "status_changed", **event}),
+    ]
+
+
+def order_created_events(order) -> List[Tuple[str, dict]]:
+    """Подія нового замовлення для адмін-панелі (компактний рядок для дошки)"""
+    return [(
+        ADMIN_ORDER_EVENTS_CHANNEL,
+        {"type": "order_created", "order": OrderListResponse.model_validate(order).model_dump(mode="json")},
+    )]
+
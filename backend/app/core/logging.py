@@ -4,13 +4,14 @@ import sys
 from pathlib import Path
 from logging.handlers import RotatingFileHandler
 from app.core.config import settings
+from app.core.middleware import RequestIdLogFilter
 
 # Створюємо директорію для логів
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
 # Формат логів
-LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Конфігурація логування
@@ -57,6 +58,11 @@ def setup_logging():
     error_handler.setFormatter(file_formatter)
     root_logger.addHandler(error_handler)
     
+    # request_id поточного запиту (RequestIdMiddleware) для всіх handlers
+    request_id_filter = RequestIdLogFilter()
+    for handler in root_logger.handlers:
+        handler.addFilter(request_id_filter)
+    
     # Налаштування для сторонніх бібліотек
     logging.getLogger("uvicorn").setLevel(logging.INFO)
     logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
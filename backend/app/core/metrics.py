@@ -29,3 +29,16 @@ order_creation_seconds = Histogram(
     "Time taken to process order creation",
     buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
 )
+
+# SQL per request (app/core/sql_tracing.py, при SQL_TRACING_ENABLED)
+db_queries_per_request = Histogram(
+    "crocosushi_db_queries_per_request",
+    "Number of SQL statements executed per HTTP request",
+    buckets=[0, 1, 2, 5, 10, 20, 50, 100]
+)
+
+db_time_per_request_seconds = Histogram(
+    "crocosushi_db_time_per_request_seconds",
+    "Total SQL execution time per HTTP request",
+    buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0]
+)
@@ -0,0 +1,103 @@
+"""Чисті ASGI middleware застосунку.
+
+На відміну від BaseHTTPMiddleware (dispatch + call_next), вони не перекачують
+тіло відповіді через anyio-потоки і не створюють Request/Response на кожен
+запит - лише дивляться на scope і дописують заголовки в повідомлення
+http.response.start. Стрімінг (SSE, експорти) проходить без буферизації.
+
+Rate limiter - в app/core/rate_limit.py, стиснення - starlette GZipMiddleware
+(теж чистий ASGI).
+"""
+import logging
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+# Вхідний id приймаємо тільки "безпечний" - він потрапляє в логи і заголовки
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> Optional[str]:
+    """Id поточного запиту (None поза обробкою запиту)"""
+    return request_id_var.get()
+
+
+class RequestIdLogFilter(logging.Filter):
+    """Додає request_id поточного запиту в кожен запис логу"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class RequestIdMiddleware:
+    """Id запиту з X-Request-ID (від проксі) або новий; повертається у відповіді"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        scope.setdefault("state", {})["request_id"] = request_id
+        token = request_id_var.set(request_id)
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class TimingMiddleware:
+    """Час обробки до початку відповіді в Server-Timing; повільні запити - в лог"""
+
+    def __init__(self, app: ASGIApp, slow_request_ms: int = 1000):
+        self.app = app
+        self.slow_request_ms = slow_request_ms
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                MutableHeaders(scope=message).append("Server-Timing", f"app;dur={elapsed_ms:.1f}")
+                if self.slow_request_ms and elapsed_ms >= self.slow_request_ms:
+                    logger.warning(
+                        f"Slow request {scope['method']} {scope['path']}: "
+                        f"{elapsed_ms:.0f} ms (status {message['status']})"
+                    )
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,211 @@
+"""Rate limiting як чистий ASGI middleware з політиками по маршрутах.
+
+Кожен запит знімає токен з локального token bucket-а (політика + IP) - без
+мережевих викликів на гарячому шляху. Раз на SYNC_INTERVAL секунд фонове
+завдання воркера додає накопичені запити до спільних лічильників у Redis
+(фіксоване вікно rate_limit:{policy}:{ip}:{n}) і зменшує локальні bucket-и на
+те, що клієнт уже витратив на інших воркерах. Ліміт між воркерами тому
+наближений (може бути перевищений в межах одного інтервалу синхронізації).
+"""
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.redis import RedisManager
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "rate_limit"
+SYNC_INTERVAL = 1.0
+# Вище цього числа bucket-ів найдавніше активні витісняються (ключ залежить від X-Forwarded-For)
+MAX_BUCKETS = 10_000
+
+# Не лімітуються: статика, документація, метрики, health-check
+EXEMPT_PREFIXES = ("/static", "/docs", "/redoc", "/openapi.json", "/metrics", "/health")
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    name: str
+    limit: int  # запитів за вікно (і місткість bucket-а)
+    window: int  # секунд
+    prefixes: Tuple[str, ...] = ()  # порожньо - будь-який шлях
+    methods: Optional[FrozenSet[str]] = None  # None - будь-який метод
+
+    def matches(self, method: str, path: str) -> bool:
+        if self.methods is not None and method not in self.methods:
+            return False
+        return not self.prefixes or path.startswith(self.prefixes)
+
+
+# Перша політика, що підходить, і застосовується
+POLICIES: Tuple[RateLimitPolicy, ...] = (
+    RateLimitPolicy("auth", limit=30, window=60, prefixes=("/api/v1/auth/",)),
+    RateLimitPolicy("callback", limit=5, window=60, prefixes=("/api/v1/callback",), methods=frozenset({"POST"})),
+    RateLimitPolicy(
+        "catalog", limit=600, window=60,
+        prefixes=(
+            "/api/v1/products", "/api/v1/categories", "/api/v1/promotions",
+            "/api/v1/reviews", "/api/v1/delivery", "/api/v1/settings",
+        ),
+        methods=frozenset({"GET", "HEAD"}),
+    ),
+    RateLimitPolicy("default", limit=300, window=60),
+)
+
+
+def client_ip_from_scope(scope: Scope) -> str:
+    """IP клієнта з урахуванням проксі (перший IP з X-Forwarded-For)"""
+    for name, value in scope.get("headers", ()):
+        if name == b"x-forwarded-for":
+            client_ip = value.decode("latin-1").split(",")[0].strip()
+            if client_ip and len(client_ip) <= 45:
+                return client_ip
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated", "pending")
+
+    def __init__(self, tokens: float, now: float):
+        self.tokens = tokens
+        self.updated = now
+        self.pending = 0  # запити, ще не додані до лічильника в Redis
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        policies: Sequence[RateLimitPolicy] = POLICIES,
+        sync_interval: float = SYNC_INTERVAL,
+    ):
+        self.app = app
+        self.policies = tuple(policies)
+        self.sync_interval = sync_interval
+        # Порядок вставки - порядок останньої активності: спереду найдавніші
+        self.buckets: Dict[Tuple[str, str], _Bucket] = {}
+        self._windows = {policy.name: policy.window for policy in self.policies}
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def policy_for(self, method: str, path: str) -> Optional[RateLimitPolicy]:
+        if method == "OPTIONS" or path.startswith(EXEMPT_PREFIXES):
+            return None
+        for policy in self.policies:
+            if policy.matches(method, path):
+                return policy
+        return None
+
+    def take(self, policy: RateLimitPolicy, client_ip: str) -> int:
+        """Зняти токен; 0 - запит дозволено, інакше - через скільки секунд повторити"""
+        now = time.monotonic()
+        rate = policy.limit / policy.window
+        key = (policy.name, client_ip)
+        bucket = self.buckets.pop(key, None)
+        if bucket is None:
+            bucket = _Bucket(policy.limit, now)
+        else:
+            bucket.tokens = min(policy.limit, bucket.tokens + (now - bucket.updated) * rate)
+            bucket.updated = now
+        # Переносимо в кінець - найдавніше активні лишаються спереду
+        self.buckets[key] = bucket
+        self._prune(now)
+
+        if bucket.tokens < 1:
+            return max(1, math.ceil((1 - bucket.tokens) / rate))
+        bucket.tokens -= 1
+        bucket.pending += 1
+        return 0
+
+    def _prune(self, now: float) -> None:
+        """Прибрати неактивні довше за вікно bucket-и (вони вже повні) і зайві понад MAX_BUCKETS.
+
+        Працює і без Redis; перевіряє лише початок словника, тож у середньому O(1).
+        """
+        while self.buckets:
+            key = next(iter(self.buckets))
+            bucket = self.buckets[key]
+            if len(self.buckets) <= MAX_BUCKETS and now - bucket.updated <= self._windows[key[0]]:
+                return
+            del self.buckets[key]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.policy_for(scope["method"], scope["path"])
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        retry_after = self.take(policy, client_ip_from_scope(scope))
+        if retry_after:
+            response = JSONResponse(
+                {"detail": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": str(retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        self._ensure_sync()
+        await self.app(scope, receive, send)
+
+    def _ensure_sync(self) -> None:
+        if self._sync_task is not None and not self._sync_task.done():
+            return
+        if RedisManager.get_client() is None:
+            return
+        self._sync_task = asyncio.create_task(self._sync_loop())
+
+    async def _sync_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            client = RedisManager.get_client()
+            if client is None:
+                return
+            await self.sync(client)
+
+    async def sync(self, client) -> None:
+        """Додати локальні запити до лічильників Redis і врахувати чужі"""
+        policies = {policy.name: policy for policy in self.policies}
+        now = time.monotonic()
+        pending = []
+        for (name, client_ip), bucket in list(self.buckets.items()):
+            policy = policies[name]
+            if bucket.pending:
+                pending.append((policy, client_ip, bucket, bucket.pending))
+            elif now - bucket.updated > policy.window:
+                # Давно неактивний bucket вже повний - зберігати його нема сенсу
+                del self.buckets[(name, client_ip)]
+        if not pending:
+            return
+
+        wall = time.time()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for policy, client_ip, _, count in pending:
+                    key = f"{KEY_PREFIX}:{policy.name}:{client_ip}:{int(wall // policy.window)}"
+                    pipe.incrby(key, count)
+                    pipe.expire(key, policy.window * 2)
+                results = await pipe.execute()
+        except Exception as e:
+            # Redis недоступний - ліміт діє лише локально
+            logger.error(f"Rate limiter sync error: {e}")
+            for _, _, bucket, count in pending:
+                bucket.pending -= count
+            return
+
+        # Запити, що прийшли під час await, лишаються в pending до наступної синхронізації
+        for index, (policy, _, bucket, count) in enumerate(pending):
+            used = int(results[index * 2])
+            bucket.pending -= count
+            bucket.tokens = min(bucket.tokens, max(policy.limit - used - bucket.pending, 0))
@@ -0,0 +1,85 @@
+"""Read-your-writes для реплік: після власного запису клієнт читає з primary.
+
+Клієнт, що надіслав запит на зміну даних (POST/PUT/PATCH/DELETE), позначається
+на READ_YOUR_WRITES_SECONDS секунд - у пам'яті воркера і в Redis (ryw:{client},
+спільний для всіх воркерів). get_read_db для позначених клієнтів віддає сесію
+primary, тож відставання реплік не "відкочує" щойно створене замовлення,
+адресу чи відгук.
+
+Клієнт - хеш Bearer токену (токен не зберігається), без токену - IP.
+Позначка спільна через Redis, бо фронтенд ходить до API з іншого origin
+без credentials (а SSR - напряму в backend), тож cookie не повертаються.
+Без реплік нічого не пишеться і не читається.
+"""
+import hashlib
+import logging
+import time
+from typing import Dict
+
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.rate_limit import client_ip_from_scope
+from app.core.redis import RedisManager
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ryw"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+# Вище цього розміру з локальних позначок прибираються прострочені
+LOCAL_MAX_SIZE = 10_000
+
+
+def client_key(request: Request) -> str:
+    authorization = request.headers.get("authorization")
+    if authorization:
+        return hashlib.sha256(authorization.encode()).hexdigest()[:32]
+    return client_ip_from_scope(request.scope)
+
+
+class RecentWriters:
+    # client key -> до якого часу читати з primary
+    _local: Dict[str, float] = {}
+
+    @classmethod
+    async def mark(cls, request: Request) -> None:
+        ttl = settings.READ_YOUR_WRITES_SECONDS
+        # Без реплік усі читання і так з primary
+        if ttl <= 0 or not settings.DATABASE_REPLICA_URLS:
+            return
+        key = client_key(request)
+        now = time.time()
+        if len(cls._local) >= LOCAL_MAX_SIZE:
+            cls._local = {client: until for client, until in cls._local.items() if until > now}
+        cls._local[key] = now + ttl
+
+        client = RedisManager.get_client()
+        if not client:
+            return
+        try:
+            await client.set(f"{KEY_PREFIX}:{key}", 1, ex=ttl)
+        except Exception as e:
+            logger.error(f"Failed to mark recent writer: {e}")
+
+    @classmethod
+    async def is_recent(cls, request: Request) -> bool:
+        if not settings.DATABASE_REPLICA_URLS:
+            return False
+        key = client_key(request)
+        until = cls._local.get(key)
+        if until is not None and until > time.time():
+            return True
+
+        client = RedisManager.get_client()
+        if not client:
+            return False
+        try:
+            return bool(await client.exists(f"{KEY_PREFIX}:{key}"))
+        except Exception as e:
+            # Без Redis безпечніше читати з primary
+            logger.error(f"Failed to check recent writer: {e}")
+            return True
+
+    @classmethod
+    def clear_local(cls) -> None:
+        cls._local.clear()
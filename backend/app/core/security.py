@@ -1,16 +1,35 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import secrets
+import time
 import pyotp
 import qrcode
 from io import BytesIO
 import base64
 
 from app.core.config import settings
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.core.token_revocation import TokenRevocation
+
+# min = max = default: хеш з будь-якою іншою вартістю вважається застарілим
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt займає десятки-сотні мс CPU; в async коді виконуємо його в окремому
+# обмеженому пулі, щоб не блокувати event loop і не забрати всі потоки
+# стандартного executor-а
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash",
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +42,24 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def hash_password_async(password: str) -> str:
+    """Хешування пароля в пулі потоків (для async обробників)"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_password_executor, pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Перевірка пароля в пулі потоків.
+
+    Повертає (вірний, новий_хеш): новий_хеш не None, якщо збережений хеш
+    має застарілу вартість і його треба замінити.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Створення JWT токену"""
     to_encode = data.copy()
@@ -31,7 +68,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire})
+    # jti - для відкликання окремого токену, iat (з долями секунди) - для logout-all
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": secrets.token_urlsafe(16)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -49,6 +87,9 @@ def decode_access_token(token: str) -> Optional[dict]:
         # Додаткова перевірка типу токену (access token не повинен мати type="refresh")
         if payload.get("type") == "refresh":
             return None  # Це refresh token, а не access token
+        # Перевірка по дзеркалу відкликань у пам'яті - без мережевого запиту
+        if TokenRevocation.is_revoked(payload):
+            return None
         return payload
     except JWTError:
         return None
@@ -58,7 +99,7 @@ def create_refresh_token(data: dict) -> str:
     """Створення refresh токену"""
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "type": "refresh", "iat": time.time(), "jti": secrets.token_urlsafe(16)})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -69,6 +110,8 @@ def decode_refresh_token(token: str) -> Optional[dict]:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         if payload.get("type") != "refresh":
             return None
+        if TokenRevocation.is_revoked(payload):
+            return None
         return payload
     except JWTError:
         return None
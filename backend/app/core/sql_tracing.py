@@ -0,0 +1,135 @@
+"""Вибіркове трасування SQL замість echo=True.
+
+Обробники подій engine міряють кожен запит і додають його до статистики
+поточного HTTP запиту (ContextVar, встановлює QueryStatsMiddleware). Текст
+запитів пишеться в лог лише для SQL_TRACE_SAMPLE_RATE частки HTTP запитів і
+для запитів, довших за SQL_SLOW_QUERY_MS. Параметри не логуються ніколи -
+в них телефони, коди і токени.
+
+Однаковий за формою SQL (текст із плейсхолдерами), виконаний за один HTTP
+запит SQL_N_PLUS_ONE_THRESHOLD і більше разів, - ймовірний N+1 (запити в
+циклі); такі запити пишуться в лог попередженням. У тестах ту саму статистику
+перевіряє tests.utils.helpers.query_budget.
+
+Трасування вмикає SQL_TRACING_ENABLED (за замовчуванням - лише в development).
+Вимкнене, воно нічого не реєструє, і вартість на запит нульова.
+"""
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import db_queries_per_request, db_time_per_request_seconds
+
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Queries"
+
+
+def sql_tracing_enabled() -> bool:
+    if settings.SQL_TRACING_ENABLED is None:
+        return settings.ENVIRONMENT == "development"
+    return settings.SQL_TRACING_ENABLED
+
+
+class QueryStats:
+    """Лічильники SQL одного HTTP запиту"""
+    __slots__ = ("count", "duration", "sampled", "statements")
+
+    def __init__(self, sampled: bool = False):
+        self.count = 0
+        self.duration = 0.0  # секунд
+        self.sampled = sampled
+        # текст SQL -> скільки разів виконано
+        self.statements: Dict[str, int] = {}
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """SQL, виконані щонайменше threshold разів (найчастіші першими)"""
+        found = [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+        return sorted(found, key=lambda item: item[1], reverse=True)
+
+
+query_stats_var: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def get_query_stats() -> Optional[QueryStats]:
+    """Статистика SQL поточного запиту (None, якщо трасування не активне)"""
+    return query_stats_var.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = query_stats_var.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += elapsed
+        stats.statements[statement] = stats.statements.get(statement, 0) + 1
+
+    elapsed_ms = elapsed * 1000
+    slow_ms = settings.SQL_SLOW_QUERY_MS
+    if slow_ms and elapsed_ms >= slow_ms:
+        logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {statement}")
+    elif stats is not None and stats.sampled:
+        logger.info(f"SQL ({elapsed_ms:.1f} ms): {statement}")
+
+
+def install_sql_tracing(engine) -> None:
+    """Підключити трасування до engine (AsyncEngine або Engine); повторний виклик безпечний"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """Кількість SQL запитів і час у БД на HTTP запит: заголовки і метрики Prometheus"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if query_stats_var.get() is not None:
+            # Статистику вже веде зовнішній код (напр. тестовий query_budget)
+            await self.app(scope, receive, send)
+            return
+
+        sample_rate = settings.SQL_TRACE_SAMPLE_RATE
+        stats = QueryStats(sampled=sample_rate > 0 and random.random() < sample_rate)
+        token = query_stats_var.set(stats)
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers[QUERY_COUNT_HEADER] = str(stats.count)
+                headers.append("Server-Timing", f"db;dur={stats.duration * 1000:.1f}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            query_stats_var.reset(token)
+            # У метрики йдуть і запити, виконані після початку відповіді (стрімінг)
+            db_queries_per_request.observe(stats.count)
+            db_time_per_request_seconds.observe(stats.duration)
+            threshold = settings.SQL_N_PLUS_ONE_THRESHOLD
+            if threshold:
+                for statement, count in stats.repeated(threshold):
+                    logger.warning(
+                        f"Possible N+1 in {scope['method']} {scope['path']}: "
+                        f"{count} x {statement[:300]}"
+                    )
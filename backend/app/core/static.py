@@ -1,12 +1,26 @@
 import typing
+from starlette.exceptions import HTTPException
 from starlette.staticfiles import StaticFiles
 from starlette.responses import Response, FileResponse
 
 class CachedStaticFiles(StaticFiles):
     """
     Custom StaticFiles class to add Cache-Control headers based on file extension.
+    
+    `private_dirs` - підкаталоги, які не віддаються (напр. файли експортів,
+    доступні тільки через авторизований endpoint).
     """
     
+    def __init__(self, *args, private_dirs: typing.Sequence[str] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.private_dirs = set(private_dirs)
+    
+    async def get_response(self, path: str, scope) -> Response:
+        top_level = path.replace("\\", "/").lstrip("/").split("/", 1)[0]
+        if top_level in self.private_dirs:
+            raise HTTPException(status_code=404)
+        return await super().get_response(path, scope)
+    
     def file_response(
         self,
         full_path: str, # type: ignore - StaticsFiles internals
@@ -0,0 +1,167 @@
+"""Відкликання JWT токенів (logout / logout-all) без мережевого запиту на перевірку.
+
+Redis - джерело правди для всіх воркерів:
+    revoked:user:{id}  - unix-час: токени користувача, видані не пізніше, недійсні
+                         (TTL - строк життя refresh токену)
+    revoked:jti:{jti}  - окремий відкликаний токен (TTL - до його exp)
+
+Кожен воркер тримає дзеркало цих ключів у пам'яті: при старті підписується на
+канал token_revocations і завантажує ключі, далі отримує нові відкликання
+подіями. decode_access_token / decode_refresh_token перевіряють тільки дзеркало.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, Optional
+
+from app.core.config import settings
+from app.core.redis import RedisManager
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "revoked"
+CHANNEL = "token_revocations"
+# Пауза перед повторною підпискою, якщо з'єднання з Redis обірвалось
+RESUBSCRIBE_DELAY = 5
+# Вище цього розміру з дзеркала прибираються записи, що вже нічого не відкликають
+PRUNE_SIZE = 10_000
+
+
+class TokenRevocation:
+    # user_id -> unix-час, до якого (включно) видані токени недійсні
+    _users: Dict[int, float] = {}
+    # jti -> exp відкликаного токену
+    _jtis: Dict[str, float] = {}
+    _listener: Optional[asyncio.Task] = None
+
+    @classmethod
+    def is_revoked(cls, payload: dict) -> bool:
+        """Перевірка токену по дзеркалу в пам'яті (без звернень до Redis)"""
+        jti = payload.get("jti")
+        if jti is not None and jti in cls._jtis:
+            return True
+
+        try:
+            user_id = int(payload.get("sub"))
+        except (TypeError, ValueError):
+            return False
+        revoked_before = cls._users.get(user_id)
+        if revoked_before is None:
+            return False
+        # Токени, видані до появи iat, теж відкликаються logout-all
+        issued_at = payload.get("iat")
+        return issued_at is None or float(issued_at) <= revoked_before
+
+    @classmethod
+    def _apply(cls, event: dict) -> None:
+        if "jti" in event:
+            if len(cls._jtis) >= PRUNE_SIZE:
+                now = time.time()
+                cls._jtis = {jti: exp for jti, exp in cls._jtis.items() if exp > now}
+            cls._jtis[event["jti"]] = float(event["exp"])
+        else:
+            if len(cls._users) >= PRUNE_SIZE:
+                # Токени, видані раніше за строк життя refresh токену, вже прострочені
+                oldest = time.time() - settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600
+                cls._users = {uid: before for uid, before in cls._users.items() if before > oldest}
+            user_id = int(event["user_id"])
+            cls._users[user_id] = max(cls._users.get(user_id, 0.0), float(event["before"]))
+
+    @classmethod
+    async def _store(cls, key: str, value: float, ttl: int, event: dict) -> None:
+        cls._apply(event)
+        client = RedisManager.get_client()
+        if not client:
+            return
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.set(key, value, ex=max(ttl, 1))
+                pipe.publish(CHANNEL, json.dumps(event))
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to store token revocation {key}: {e}")
+
+    @classmethod
+    async def revoke_token(cls, payload: dict) -> None:
+        """Відкликати один токен (за jti) до закінчення його строку дії"""
+        jti = payload.get("jti")
+        if jti is None:
+            return
+        exp = float(payload.get("exp", time.time()))
+        await cls._store(
+            f"{KEY_PREFIX}:jti:{jti}", exp, int(exp - time.time()) + 1,
+            {"jti": jti, "exp": exp},
+        )
+
+    @classmethod
+    async def revoke_user(cls, user_id: int) -> None:
+        """Відкликати всі вже видані токени користувача (access і refresh)"""
+        before = time.time()
+        await cls._store(
+            f"{KEY_PREFIX}:user:{user_id}", before, settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+            {"user_id": user_id, "before": before},
+        )
+
+    @classmethod
+    async def _load(cls, client) -> None:
+        async for key in client.scan_iter(f"{KEY_PREFIX}:*", count=1000):
+            value = await client.get(key)
+            if value is None:
+                continue
+            _, kind, ident = key.split(":", 2)
+            if kind == "jti":
+                cls._apply({"jti": ident, "exp": value})
+            else:
+                cls._apply({"user_id": ident, "before": value})
+
+    @classmethod
+    async def _listen(cls) -> None:
+        while True:
+            client = RedisManager.get_client()
+            if not client:
+                # Redis був недоступний при старті - пробуємо підключитись знову,
+                # інші сервіси підхоплять відновлений клієнт
+                await RedisManager.connect()
+                client = RedisManager.get_client()
+            if not client:
+                await asyncio.sleep(RESUBSCRIBE_DELAY)
+                continue
+            pubsub = client.pubsub()
+            try:
+                # Спершу підписка, потім завантаження - події між ними не губляться
+                await pubsub.subscribe(CHANNEL)
+                await cls._load(client)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        cls._apply(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Token revocation listener error: {e}")
+            finally:
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+            await asyncio.sleep(RESUBSCRIBE_DELAY)
+
+    @classmethod
+    async def start(cls) -> None:
+        if cls._listener is None:
+            cls._listener = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls._listener is not None:
+            cls._listener.cancel()
+            try:
+                await cls._listener
+            except asyncio.CancelledError:
+                pass
+            cls._listener = None
+
+    @classmethod
+    def clear_local(cls) -> None:
+        cls._users.clear()
+        cls._jtis.clear()
@@ -0,0 +1,111 @@
+"""Короткоживучий кеш полів користувача для перевірки доступу.
+
+Для рішення "пустити чи ні" на кожному запиті достатньо id, is_active і role -
+їх не треба щоразу читати з users. Поля кешуються на USER_AUTH_CACHE_TTL секунд
+у пам'яті воркера і в Redis (auth_user:{id}, спільний для всіх воркерів).
+Блокування, зміна ролі, видалення акаунта і logout-all скидають обидва рівні;
+у пам'яті інших воркерів запис доживає свій (кілька секунд) TTL.
+"""
+import json
+import logging
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.redis import RedisManager
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "auth_user"
+# Вище цього розміру локальний кеш чиститься від прострочених записів
+LOCAL_MAX_SIZE = 10_000
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Поля користувача, потрібні для авторизації"""
+    id: int
+    is_active: bool
+    role: UserRole
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == UserRole.ADMIN
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(id=user.id, is_active=user.is_active, role=UserRole(user.role))
+
+
+def _key(user_id: int) -> str:
+    return f"{KEY_PREFIX}:{user_id}"
+
+
+class UserAuthCache:
+    # user_id -> (час закінчення, AuthUser)
+    _local: Dict[int, Tuple[float, AuthUser]] = {}
+
+    @classmethod
+    def _remember(cls, auth: AuthUser, expires_at: float) -> None:
+        if len(cls._local) >= LOCAL_MAX_SIZE:
+            now = time.time()
+            cls._local = {key: entry for key, entry in cls._local.items() if entry[0] > now}
+        cls._local[auth.id] = (expires_at, auth)
+
+    @classmethod
+    async def get(cls, user_id: int) -> Optional[AuthUser]:
+        now = time.time()
+        entry = cls._local.get(user_id)
+        if entry and entry[0] > now:
+            return entry[1]
+
+        client = RedisManager.get_client()
+        if not client:
+            return None
+        try:
+            raw = await client.get(_key(user_id))
+        except Exception as e:
+            logger.error(f"Failed to read auth cache for user {user_id}: {e}")
+            return None
+        if raw is None:
+            return None
+
+        data = json.loads(raw)
+        auth = AuthUser(id=user_id, is_active=data["is_active"], role=UserRole(data["role"]))
+        # Локальний запис живе не довше за запис у Redis
+        cls._remember(auth, data["expires_at"])
+        return auth
+
+    @classmethod
+    async def set(cls, auth: AuthUser) -> None:
+        ttl = settings.USER_AUTH_CACHE_TTL
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        cls._remember(auth, expires_at)
+
+        client = RedisManager.get_client()
+        if not client:
+            return
+        payload = {"is_active": auth.is_active, "role": auth.role.value, "expires_at": expires_at}
+        try:
+            await client.set(_key(auth.id), json.dumps(payload), ex=ttl)
+        except Exception as e:
+            logger.error(f"Failed to write auth cache for user {auth.id}: {e}")
+
+    @classmethod
+    async def invalidate(cls, user_id: int) -> None:
+        cls._local.pop(user_id, None)
+        client = RedisManager.get_client()
+        if not client:
+            return
+        try:
+            await client.delete(_key(user_id))
+        except Exception as e:
+            logger.error(f"Failed to invalidate auth cache for user {user_id}: {e}")
+
+    @classmethod
+    def clear_local(cls) -> None:
+        cls._local.clear()
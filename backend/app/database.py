@@ -1,13 +1,20 @@
 """Database configuration and session management."""
 import asyncio
+import itertools
 import logging
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from fastapi import Request
 
 import sqlalchemy
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import DeclarativeBase, Session
 
 from app.core.config import settings
+from app.core.read_your_writes import SAFE_METHODS, RecentWriters
+from app.core.sql_tracing import install_sql_tracing, sql_tracing_enabled
 
 logger = logging.getLogger(__name__)
 
@@ -20,35 +27,84 @@ class Base(DeclarativeBase):
 # Змінні для engine та сесій (створюються при першому використанні)
 _engine: Optional[any] = None
 _AsyncSessionLocal: Optional[any] = None
+# Сесії тільки для читання: primary (спільний пул з _engine) і репліки
+_ReadOnlySessionLocal: Optional[async_sessionmaker] = None
+_read_session_locals: Optional[List[async_sessionmaker]] = None
+_read_counter = itertools.count()
+
+
+def _create_engine(url: str):
+    # БЕЗПЕКА: echo=False в production для запобігання витоку чутливих даних
+    # (echo логує параметри). Для діагностики - SQL_TRACING_ENABLED з вибіркою.
+    engine = create_async_engine(
+        url,
+        echo=settings.ECHO_SQL,
+        pool_pre_ping=True,
+        pool_size=settings.POSTGRES_POOL_SIZE,
+        max_overflow=settings.POSTGRES_MAX_OVERFLOW,
+        pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
+        connect_args={
+            "timeout": settings.POSTGRES_CONNECT_TIMEOUT,
+            "command_timeout": settings.POSTGRES_COMMAND_TIMEOUT,
+            "server_settings": {
+                "jit": "off",  # Optimization for simple queries
+                "application_name": settings.PROJECT_NAME
+            }
+        }
+    )
+    if sql_tracing_enabled():
+        install_sql_tracing(engine)
+    return engine
 
 
 def get_engine():
     """Отримання асинхронного движка (створюється при першому виклику)"""
     global _engine
     if _engine is None:
-        # БЕЗПЕКА: echo=False в production для запобігання витоку чутливих даних
-        # Використовуємо змінну оточення або налаштування для контролю логування
-        echo_sql = True # getattr(settings, 'ECHO_SQL', False)  # DEBUG: Forced True
-        
-        _engine = create_async_engine(
-            settings.DATABASE_URL,
-            echo=echo_sql,
-            pool_pre_ping=True,
-            pool_size=settings.POSTGRES_POOL_SIZE,
-            max_overflow=settings.POSTGRES_MAX_OVERFLOW,
-            pool_timeout=settings.POSTGRES_POOL_TIMEOUT,
-            connect_args={
-                "timeout": settings.POSTGRES_CONNECT_TIMEOUT,
-                "command_timeout": settings.POSTGRES_COMMAND_TIMEOUT,
-                "server_settings": {
-                    "jit": "off",  # Optimization for simple queries
-                    "application_name": settings.PROJECT_NAME
-                }
-            }
-        )
+        _engine = _create_engine(settings.DATABASE_URL)
     return _engine
 
 
+class ReadOnlySession(Session):
+    """Сесія для читання: зміни об'єктів ORM не зберігаються (flush падає)"""
+    
+    def flush(self, objects=None) -> None:
+        if self.new or self.dirty or self.deleted:
+            raise sqlalchemy.exc.InvalidRequestError("Read-only session: changes cannot be flushed")
+        super().flush(objects)
+
+
+def _read_only_sessionmaker(engine) -> async_sessionmaker:
+    # AUTOCOMMIT: без BEGIN і COMMIT/ROLLBACK навколо SELECT-ів. При READ COMMITTED
+    # кожен оператор і так бачить власний знімок, тож видимість даних та сама
+    return async_sessionmaker(
+        engine.execution_options(isolation_level="AUTOCOMMIT"),
+        class_=AsyncSession,
+        sync_session_class=ReadOnlySession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+def get_read_only_session_local() -> async_sessionmaker:
+    """Фабрика сесій тільки для читання з primary (той самий пул з'єднань)"""
+    global _ReadOnlySessionLocal
+    if _ReadOnlySessionLocal is None:
+        _ReadOnlySessionLocal = _read_only_sessionmaker(get_engine())
+    return _ReadOnlySessionLocal
+
+
+def get_read_session_locals() -> List[async_sessionmaker]:
+    """Фабрики сесій реплік (порожній список, якщо репліки не налаштовані)"""
+    global _read_session_locals
+    if _read_session_locals is None:
+        _read_session_locals = [
+            _read_only_sessionmaker(_create_engine(url))
+            for url in settings.DATABASE_REPLICA_URLS
+        ]
+    return _read_session_locals
+
+
 async def check_db_connection() -> bool:
     """Check database connection with retries.
     
@@ -116,7 +172,7 @@ engine = LazyEngine()
 AsyncSessionLocal = LazySessionLocal()
 
 
-async def get_db() -> AsyncSession:
+async def get_db(request: Request) -> AsyncSession:
     """Dependency для отримання сесії БД.
     
     Yields:
@@ -126,7 +182,12 @@ async def get_db() -> AsyncSession:
         - Commits on success
         - Rolls back on exception
         - Always closes the session
+        - A client sending a writing request (POST/PUT/PATCH/DELETE) reads from
+          primary for a few seconds after it (see get_read_db)
     """
+    if request.method not in SAFE_METHODS:
+        # Позначаємо до commit: наступний запит клієнта може прийти одразу після відповіді
+        await RecentWriters.mark(request)
     session_local = get_async_session_local()
     async with session_local() as session:
         try:
@@ -139,3 +200,54 @@ async def get_db() -> AsyncSession:
             raise
         finally:
             await session.close()
+
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """Dependency для endpoint-ів, що тільки читають.
+    
+    Сесія репліки (по колу), або primary - якщо реплік немає чи клієнт
+    нещодавно сам щось записав (read-your-writes). На відміну від get_db:
+        - AUTOCOMMIT: без BEGIN і COMMIT - на один-два round-trip менше
+        - flush змін ORM заборонено (ReadOnlySession)
+    
+    Підключати з scope="function" - тоді з'єднання повертається в пул одразу
+    після обробника, ще до серіалізації і відправки відповіді:
+        db: AsyncSession = Depends(get_read_db, scope="function")
+    Серверні курсори (db.stream, експорти) потребують транзакції - для них get_db.
+    """
+    read_session_locals = get_read_session_locals()
+    if not read_session_locals or await RecentWriters.is_recent(request):
+        session_local = get_read_only_session_local()
+    else:
+        session_local = read_session_locals[next(_read_counter) % len(read_session_locals)]
+    
+    async with session_local() as session:
+        yield session
+
+
+@asynccontextmanager
+async def task_sessionmaker() -> AsyncIterator[async_sessionmaker]:
+    """Фабрика сесій БД для Celery задач.
+    
+    Задачі запускають корутини через asyncio.run (новий event loop на кожен виклик),
+    тому спільний пул з'єднань використовувати не можна - створюємо окремий engine
+    без пулу і закриваємо його після задачі.
+    """
+    task_engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        yield async_sessionmaker(task_engine, class_=AsyncSession, expire_on_commit=False)
+    finally:
+        await task_engine.dispose()
+
+
+@asynccontextmanager
+async def task_session() -> AsyncIterator[AsyncSession]:
+    """Одна сесія БД для Celery задачі (commit при успіху, rollback при помилці)"""
+    async with task_sessionmaker() as session_local:
+        async with session_local() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
@@ -5,11 +5,9 @@ import logging
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
 import redis.asyncio as redis  # Асинхронна версія Redis
 
 from app.core.config import settings
@@ -20,7 +18,12 @@ from app.api.v1.api import api_router
 setup_logging()
 logger = logging.getLogger(__name__)
 
+from app.core.events import EventService
+from app.core.middleware import RequestIdMiddleware, TimingMiddleware
+from app.core.rate_limit import RateLimitMiddleware
 from app.core.redis import RedisManager
+from app.core.sql_tracing import QueryStatsMiddleware, sql_tracing_enabled
+from app.core.token_revocation import TokenRevocation
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -28,10 +31,16 @@ async def lifespan(app: FastAPI):
     
     # Startup: Підключення до Redis
     await RedisManager.connect()
+    # Дзеркало відкликаних токенів у пам'яті воркера
+    await TokenRevocation.start()
+    # Один слухач pub/sub на воркер для всіх SSE стрімів
+    await EventService.start()
     
     yield
     
     # Shutdown: Закриття з'єднання
+    await EventService.stop()
+    await TokenRevocation.stop()
     await RedisManager.close()
 
 
@@ -45,6 +54,8 @@ app = FastAPI(
 # --- Middlewares ---
 # ВАЖЛИВО: В FastAPI middleware, який додано ОСТАННІМ, виконується ПЕРШИМ.
 # Тому CORS ставимо в кінці, щоб він обгортав всі відповіді (включаючи 429).
+# Усі middleware - чистий ASGI (без BaseHTTPMiddleware): тіло відповіді не
+# буферизується, стрімінг проходить як є. Порівняння: scripts/middleware_benchmark.py
 
 # 1. Trusted Host (внутрішній - додаємо першим)
 app.add_middleware(
@@ -53,65 +64,30 @@ app.add_middleware(
 )
 
 
-# 2. Rate Limiting (Async Middleware)
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Async Rate Limiting Middleware using Redis."""
-    
-    def __init__(self, app, limit: int = 100, window: int = 60):
-        super().__init__(app)
-        self.limit = limit
-        self.window = window
-
-    async def dispatch(self, request: Request, call_next):
-        # Пропускаємо OPTIONS запити (CORS preflight) без лімітування
-        if request.method == "OPTIONS":
-            return await call_next(request)
-        
-        # Отримуємо клієнт через менеджер
-        redis_client = RedisManager.get_client()
-        
-        # Якщо Redis не підключено або це статичний файл/docs - пропускаємо
-        if not redis_client or request.url.path.startswith(("/static", "/docs", "/redoc", "/openapi.json")):
-            return await call_next(request)
-        
-        # Отримуємо IP (враховуючи proxy)
-        # Якщо є X-Forwarded-For, беремо перший IP
-        forwarded_for = request.headers.get("X-Forwarded-For")
-        if forwarded_for:
-            client_ip = forwarded_for.split(",")[0].strip()
-        else:
-            client_ip = request.client.host if request.client else "unknown"
-        
-        key = f"rate_limit:{client_ip}"
-        
-        try:
-            # АСИНХРОННИЙ PIPELINE (Atomic operation)
-            async with redis_client.pipeline() as pipe:
-                await pipe.incr(key)
-                await pipe.expire(key, self.window, nx=True)  # nx=True: expire тільки якщо ключа не було
-                results = await pipe.execute()
-            
-            request_count = results[0]
-            
-            if request_count > self.limit:
-                return Response(
-                    "Too Many Requests", 
-                    status_code=429,
-                    headers={"Retry-After": str(self.window)}
-                )
-        
-        except Exception as e:
-            # Якщо Redis впав під час запиту, не блокуємо користувача
-            logger.error(f"Rate limiter error: {e}")
-        
-        return await call_next(request)
-
-
-# Активуємо Rate Limit (1000 запитів за хвилину для комфортної розробки)
-# app.add_middleware(RateLimitMiddleware, limit=1000, window=60)
-
-
-# 3. CORS (ОСТАННІМ - щоб виконувався ПЕРШИМ і обгортав всі відповіді)
+# 2. Rate Limiting (чистий ASGI, локальні token bucket-и з синхронізацією через Redis)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+
+# 3. Стиснення відповідей (SSE не стискається)
+if settings.GZIP_ENABLED:
+    app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE)
+
+
+# 4. Кількість SQL і час у БД на запит (X-DB-Queries, Server-Timing db, метрики, N+1)
+if sql_tracing_enabled():
+    app.add_middleware(QueryStatsMiddleware)
+
+
+# 5. Час обробки (Server-Timing) і лог повільних запитів
+app.add_middleware(TimingMiddleware, slow_request_ms=settings.SLOW_REQUEST_MS)
+
+
+# 6. Request ID (зовнішніше за timing - щоб id був і в логах повільних запитів)
+app.add_middleware(RequestIdMiddleware)
+
+
+# 7. CORS (ОСТАННІМ - щоб виконувався ПЕРШИМ і обгортав всі відповіді)
 # Це гарантує, що навіть 429 відповіді матимуть CORS-заголовки
 
 # Explicitly ensure production origins are allowed (double-safety/security)
@@ -129,7 +105,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
     allow_headers=["Content-Type", "Authorization", "Accept", "X-Requested-With"],
-    expose_headers=["Content-Type", "X-Total-Count"],
+    expose_headers=["Content-Type", "X-Total-Count", "X-Request-ID", "X-DB-Queries"],
     max_age=3600,
 )
 
@@ -161,7 +137,11 @@ upload_dir.mkdir(parents=True, exist_ok=True)
 from app.core.static import CachedStaticFiles
 
 try:
-    app.mount("/static/uploads", CachedStaticFiles(directory=str(upload_dir)), name="static_uploads")
+    app.mount(
+        "/static/uploads",
+        CachedStaticFiles(directory=str(upload_dir), private_dirs=[settings.EXPORT_SUBDIR]),
+        name="static_uploads"
+    )
 except ValueError:
     # Якщо вже змонтовано - ігноруємо
     pass
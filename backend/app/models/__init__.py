@@ -16,6 +16,9 @@ from app.models.newsletter import NewsletterSubscriber
 from app.models.order_history import OrderHistory
 from app.models.setting import Setting
 from app.models.callback import Callback, CallbackStatus
+from app.models.sales_rollup import DailySalesRollup
+from app.models.export_job import ExportJob
+from app.models.customer_analytics import CustomerRFM, CohortRetention
 
 
 __all__ = [
@@ -39,4 +42,8 @@ __all__ = [
     "OrderHistory",
     "Setting",
     "Callback",
+    "DailySalesRollup",
+    "ExportJob",
+    "CustomerRFM",
+    "CohortRetention",
 ]
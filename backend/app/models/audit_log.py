@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
-from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -21,11 +21,10 @@ class AuditLog(Base):
     user_id: Mapped[Optional[int]] = mapped_column(
         Integer,
         ForeignKey("users.id", ondelete="SET NULL"),
-        nullable=True,
-        index=True
+        nullable=True
     )
     action: Mapped[str] = mapped_column(String(100), nullable=False, index=True)  # create, update, delete
-    resource_type: Mapped[str] = mapped_column(String(100), nullable=False, index=True)  # product, category, order
+    resource_type: Mapped[str] = mapped_column(String(100), nullable=False)  # product, category, order
     resource_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     # Старі та нові значення
     old_values: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
@@ -46,3 +45,9 @@ class AuditLog(Base):
         "User"
     )
 
+    __table_args__ = (
+        # Фільтр по користувачу / типу ресурсу з діапазоном дат, сортування за created_at
+        Index("ix_audit_logs_user_id_created_at", "user_id", "created_at"),
+        Index("ix_audit_logs_resource_type_created_at", "resource_type", "created_at"),
+    )
+
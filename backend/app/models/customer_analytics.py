@@ -0,0 +1,50 @@
+"""Моделі підсумкових таблиць клієнтської аналітики (RFM, когорти)"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import String, Integer, Date, DateTime, Numeric, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CustomerRFM(Base):
+    """RFM-оцінка клієнта (клієнт = номер телефону, тож враховуються і гості).
+
+    Перераховується повністю Celery задачею compute_customer_analytics.
+    Оцінки 1-5 - квінтилі серед усіх клієнтів (5 - найкраще).
+    """
+    __tablename__ = "customer_rfm"
+
+    customer_phone: Mapped[str] = mapped_column(String(20), primary_key=True)
+    user_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    first_order_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    last_order_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    recency_days: Mapped[int] = mapped_column(Integer, nullable=False)
+    frequency: Mapped[int] = mapped_column(Integer, nullable=False)
+    monetary: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
+    r_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    f_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    m_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    segment: Mapped[str] = mapped_column(String(30), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        # Список клієнтів сегмента, відсортований за сумою покупок
+        Index("ix_customer_rfm_segment_monetary", "segment", "monetary"),
+    )
+
+
+class CohortRetention(Base):
+    """Місячна когорта: скільки клієнтів першого замовлення `cohort_month`
+    зробили замовлення через `period` місяців (period 0 - розмір когорти)"""
+    __tablename__ = "cohort_retention"
+
+    cohort_month: Mapped[date] = mapped_column(Date, primary_key=True)
+    period: Mapped[int] = mapped_column(Integer, primary_key=True)
+    customers: Mapped[int] = mapped_column(Integer, nullable=False)
+    retention: Mapped[Decimal] = mapped_column(Numeric(6, 4), nullable=False)  # частка від розміру когорти
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,39 @@
+"""Модель фонової задачі експорту"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class ExportJob(Base):
+    """Експорт, який виконується Celery воркером і зберігається у файл"""
+    __tablename__ = "export_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)  # uuid4
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)  # orders, audit_logs
+    format: Mapped[str] = mapped_column(String(10), nullable=False)  # csv, excel
+    params: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
+    # Статуси: pending, running, completed, failed
+    status: Mapped[str] = mapped_column(String(20), default="pending", nullable=False)
+    processed_rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_rows: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    file_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)  # відносно UPLOAD_DIR
+    file_size: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_by: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True,
+        index=True
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        index=True,
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
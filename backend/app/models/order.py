@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List, TYPE_CHECKING
-from sqlalchemy import String, Text, Integer, DateTime, Numeric, ForeignKey, CheckConstraint, JSON
+from sqlalchemy import String, Text, Integer, DateTime, Numeric, ForeignKey, CheckConstraint, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -24,8 +24,7 @@ class Order(Base):
     user_id: Mapped[Optional[int]] = mapped_column(
         Integer, 
         ForeignKey("users.id"), 
-        nullable=True, 
-        index=True
+        nullable=True
     )
     address_id: Mapped[Optional[int]] = mapped_column(
         Integer, 
@@ -35,8 +34,7 @@ class Order(Base):
     status: Mapped[str] = mapped_column(
         String(50), 
         default="pending", 
-        nullable=False, 
-        index=True
+        nullable=False
     )
     # Статуси: pending, confirmed, preparing, delivering, completed, cancelled
     total_amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
@@ -55,8 +53,6 @@ class Order(Base):
     internal_comment: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     # Кур'єр
     courier_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
-    # Історія статусів (JSON зі списком змін)
-    status_history: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), 
         server_default=func.now(), 
@@ -90,10 +86,12 @@ class Order(Base):
         lazy="select"
     )
 
+    # Історія статусів (append-only, один рядок на кожну зміну)
     history: Mapped[List["OrderHistory"]] = relationship(
         "OrderHistory",
         back_populates="order",
         cascade="all, delete-orphan",
+        order_by="OrderHistory.changed_at",
         lazy="select"
     )
 
@@ -102,6 +100,11 @@ class Order(Base):
             "status IN ('pending', 'confirmed', 'preparing', 'ready', 'delivering', 'completed', 'cancelled')",
             name="check_order_status"
         ),
+        # Списки з фільтром по статусу / клієнту та діапазоном дат, відсортовані за created_at
+        Index("ix_orders_status_created_at", "status", "created_at"),
+        Index("ix_orders_user_id_created_at", "user_id", "created_at"),
+        # Пошук попередніх замовлень клієнта (new_customers у sales rollup)
+        Index("ix_orders_customer_phone_id", "customer_phone", "id"),
     )
 
     @property
@@ -1,14 +1,15 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
 from app.database import Base
 
 class OrderHistory(Base):
+    """Append-only журнал змін статусу замовлення (рядки тільки додаються)"""
     __tablename__ = "order_history"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    order_id: Mapped[int] = mapped_column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    order_id: Mapped[int] = mapped_column(Integer, ForeignKey("orders.id"), nullable=False)
     manager_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=True) # ID of manager who changed it
     manager_name: Mapped[str] = mapped_column(String(255), nullable=False)  # Name or email of who changed it
     previous_status: Mapped[str] = mapped_column(String(50), nullable=False)
@@ -22,3 +23,10 @@ class OrderHistory(Base):
 
     # Relationships
     order = relationship("Order", back_populates="history")
+
+    __table_args__ = (
+        # Читання історії одного замовлення в хронологічному порядку
+        Index("ix_order_history_order_id_changed_at", "order_id", "changed_at"),
+        # Загальний журнал змін (history-log) - найновіші першими
+        Index("ix_order_history_changed_at", "changed_at"),
+    )
@@ -0,0 +1,44 @@
+"""Модель денного rollup продажів для адмін-статистики"""
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import String, Integer, Date, DateTime, Numeric, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class DailySalesRollup(Base):
+    """Агрегати замовлень за день (в часовому поясі магазину).
+    
+    Оновлюється інкрементально при створенні замовлення та зміні статусу,
+    звіряється з таблицею orders Celery задачею rebuild_sales_rollup.
+    Сума по всіх рядках дорівнює GROUP BY по orders з тими ж ключами.
+    """
+    __tablename__ = "daily_sales_rollups"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    status: Mapped[str] = mapped_column(String(50), nullable=False)
+    payment_method: Mapped[str] = mapped_column(String(50), nullable=False)  # "unknown" якщо не вказано
+    delivery_type: Mapped[str] = mapped_column(String(20), nullable=False)  # delivery, pickup
+    promo_code_id: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # 0 - без промокоду
+    orders_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    discount: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
+    # Замовлення, які були першими для номера телефону клієнта
+    new_customers: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "day", "status", "payment_method", "delivery_type", "promo_code_id",
+            name="uq_daily_sales_rollups_key"
+        ),
+    )
@@ -175,7 +175,7 @@ class OrderTrack(BaseModel):
     delivery_cost: Decimal = Decimal("0.00")
     discount: Decimal = Decimal("0.00")
     
-    # Історія статусів
+    # Історія статусів (з order_history: status, changed_at, comment)
     status_history: Optional[List[dict]] = None
 
     model_config = ConfigDict(from_attributes=True)
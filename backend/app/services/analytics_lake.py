@@ -0,0 +1,292 @@
+"""Колонкова копія даних для звітності: Parquet-файли + DuckDB.
+
+Нічна Celery задача вивантажує orders, order_items, products і users
+з Postgres у Parquet (orders / order_items - по місяцях магазину, Hive-розбиття
+month=YYYY-MM) в новий знімок і атомарно перемикає на нього файл CURRENT:
+
+    {ANALYTICS_DATA_DIR}/CURRENT
+    {ANALYTICS_DATA_DIR}/snapshots/{timestamp}/orders/month=2026-10/part-0.parquet
+    {ANALYTICS_DATA_DIR}/snapshots/{timestamp}/products/part-0.parquet
+
+Важкі агрегати статистики виконує вбудований DuckDB по цих файлах в потоці,
+не займаючи з'єднання пулу Postgres. Дані актуальні на момент вивантаження.
+"""
+import asyncio
+import logging
+import shutil
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.order import Order, OrderItem
+from app.models.product import Product
+from app.models.user import User
+from app.services.export import stream_rows
+from app.utils.dates import shop_tz
+
+logger = logging.getLogger(__name__)
+
+LAKE_CHUNK_SIZE = 50_000
+CURRENT_FILE = "CURRENT"
+# Порожня партиція, щоб read_parquet мав схему навіть без жодного рядка
+EMPTY_PARTITION = "0000-00"
+
+MONEY = pa.decimal128(10, 2)
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+
+@dataclass
+class LakeTable:
+    query: Callable[[], Select]
+    schema: pa.Schema
+    # Колонка created_at для розбиття по місяцях (запит має бути відсортований за нею)
+    partition_column: Optional[str] = None
+
+
+TABLES: Dict[str, LakeTable] = {
+    "orders": LakeTable(
+        query=lambda: select(
+            Order.id, Order.order_number, Order.user_id, Order.status, Order.customer_phone,
+            Order.payment_method, Order.promo_code_id, Order.discount, Order.delivery_cost,
+            Order.total_amount, Order.created_at,
+        ).order_by(Order.created_at),
+        schema=pa.schema([
+            ("id", pa.int64()), ("order_number", pa.string()), ("user_id", pa.int64()),
+            ("status", pa.string()), ("customer_phone", pa.string()), ("payment_method", pa.string()),
+            ("promo_code_id", pa.int64()), ("discount", MONEY), ("delivery_cost", MONEY),
+            ("total_amount", MONEY), ("created_at", TIMESTAMP),
+        ]),
+        partition_column="created_at",
+    ),
+    "order_items": LakeTable(
+        query=lambda: select(
+            OrderItem.id, OrderItem.order_id, OrderItem.product_id, OrderItem.product_name,
+            OrderItem.quantity, OrderItem.price, Order.created_at.label("order_created_at"),
+        ).join(OrderItem.order).order_by(Order.created_at),
+        schema=pa.schema([
+            ("id", pa.int64()), ("order_id", pa.int64()), ("product_id", pa.int64()),
+            ("product_name", pa.string()), ("quantity", pa.int64()), ("price", MONEY),
+            ("order_created_at", TIMESTAMP),
+        ]),
+        partition_column="order_created_at",
+    ),
+    "products": LakeTable(
+        query=lambda: select(
+            Product.id, Product.category_id, Product.name, Product.image_url, Product.price,
+            Product.is_available, Product.created_at,
+        ),
+        schema=pa.schema([
+            ("id", pa.int64()), ("category_id", pa.int64()), ("name", pa.string()),
+            ("image_url", pa.string()), ("price", MONEY), ("is_available", pa.bool_()),
+            ("created_at", TIMESTAMP),
+        ]),
+    ),
+    "users": LakeTable(
+        query=lambda: select(User.id, User.name, User.phone, User.is_active, User.created_at),
+        schema=pa.schema([
+            ("id", pa.int64()), ("name", pa.string()), ("phone", pa.string()),
+            ("is_active", pa.bool_()), ("created_at", TIMESTAMP),
+        ]),
+    ),
+}
+
+
+def lake_dir() -> Path:
+    return Path(settings.ANALYTICS_DATA_DIR)
+
+
+def current_snapshot() -> Optional[Path]:
+    """Каталог актуального знімка або None, якщо вивантаження ще не було"""
+    try:
+        name = (lake_dir() / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    snapshot = lake_dir() / "snapshots" / name
+    return snapshot if snapshot.is_dir() else None
+
+
+def _batch(rows: List[Sequence[Any]], schema: pa.Schema) -> pa.RecordBatch:
+    columns = list(zip(*rows))
+    return pa.RecordBatch.from_arrays(
+        [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+        schema=schema,
+    )
+
+
+class _MonthPartitions:
+    """Запис відсортованих за часом рядків у файли month=YYYY-MM (по одному відкритому)"""
+
+    def __init__(self, root: Path, schema: pa.Schema, column: str):
+        self.root = root
+        self.schema = schema
+        self.index = schema.get_field_index(column)
+        self.writer: Optional[pq.ParquetWriter] = None
+        self.month_end: Optional[datetime] = None
+
+    def _open(self, moment: datetime) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        local = moment.astimezone(shop_tz())
+        start = local.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        self.month_end = (start + timedelta(days=32)).replace(day=1).astimezone(timezone.utc)
+        self._writer_for(f"{local:%Y-%m}")
+
+    def _writer_for(self, month: str) -> None:
+        path = self.root / f"month={month}" / "part-0.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows: List[Sequence[Any]]) -> None:
+        start = 0
+        for position, row in enumerate(rows):
+            moment = row[self.index]
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            if self.month_end is None or moment >= self.month_end:
+                if position > start:
+                    self.writer.write_batch(_batch(rows[start:position], self.schema))
+                start = position
+                self._open(moment)
+        if len(rows) > start:
+            self.writer.write_batch(_batch(rows[start:], self.schema))
+
+    def close(self) -> None:
+        if self.writer is None:
+            # Жодного рядка - порожній файл зі схемою
+            self._writer_for(EMPTY_PARTITION)
+        self.writer.close()
+        self.writer = None
+
+
+async def _export_table(db: AsyncSession, name: str, table: LakeTable, snapshot: Path) -> int:
+    root = snapshot / name
+    root.mkdir(parents=True, exist_ok=True)
+    count = 0
+
+    if table.partition_column:
+        partitions = _MonthPartitions(root, table.schema, table.partition_column)
+        async for rows in stream_rows(db, table.query(), chunk_size=LAKE_CHUNK_SIZE):
+            partitions.write(rows)
+            count += len(rows)
+        partitions.close()
+        return count
+
+    with pq.ParquetWriter(root / "part-0.parquet", table.schema) as writer:
+        async for rows in stream_rows(db, table.query(), chunk_size=LAKE_CHUNK_SIZE):
+            writer.write_batch(_batch(rows, table.schema))
+            count += len(rows)
+    return count
+
+
+async def export_lake(db: AsyncSession) -> Dict[str, int]:
+    """Вивантажити таблиці в новий знімок і зробити його актуальним"""
+    name = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    snapshot = lake_dir() / "snapshots" / name
+    # Новий каталог щоразу - старі партиції не змішуються з новими
+    snapshot.mkdir(parents=True)
+    counts = {}
+    try:
+        for table_name, table in TABLES.items():
+            counts[table_name] = await _export_table(db, table_name, table, snapshot)
+    except Exception:
+        shutil.rmtree(snapshot, ignore_errors=True)
+        raise
+
+    pointer = lake_dir() / f"{CURRENT_FILE}.tmp"
+    pointer.write_text(name)
+    pointer.replace(lake_dir() / CURRENT_FILE)
+
+    # Попередній знімок лишаємо - його ще можуть читати запити, що вже почались
+    snapshots = sorted(path for path in (lake_dir() / "snapshots").iterdir() if path.is_dir())
+    for old in snapshots[:-settings.ANALYTICS_SNAPSHOTS_KEEP]:
+        shutil.rmtree(old, ignore_errors=True)
+    return counts
+
+
+def _connect(snapshot: Path) -> duckdb.DuckDBPyConnection:
+    connection = duckdb.connect()
+    for name, table in TABLES.items():
+        pattern = snapshot / name / ("*/*.parquet" if table.partition_column else "*.parquet")
+        hive = "true" if table.partition_column else "false"
+        connection.execute(
+            f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{pattern}', hive_partitioning = {hive})"
+        )
+    return connection
+
+
+def _month(moment: datetime) -> str:
+    return f"{moment.astimezone(shop_tz()):%Y-%m}"
+
+
+class AnalyticsLake:
+    """Запити статистики до знімка (None - знімка ще немає)"""
+
+    @staticmethod
+    async def query(sql: str, params: Sequence[Any] = ()) -> Optional[List[Dict[str, Any]]]:
+        snapshot = current_snapshot()
+        if snapshot is None:
+            return None
+
+        def run() -> List[Dict[str, Any]]:
+            with _connect(snapshot) as connection:
+                cursor = connection.execute(sql, list(params))
+                names = [column[0] for column in cursor.description]
+                return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+        try:
+            return await asyncio.to_thread(run)
+        except Exception as e:
+            logger.error(f"Analytics lake query failed: {e}")
+            return None
+
+    @staticmethod
+    async def top_products(start: Optional[datetime], limit: int) -> Optional[List[Dict[str, Any]]]:
+        conditions, params = ["o.status <> 'cancelled'"], []
+        if start is not None:
+            # Умова на month відсікає файли старших партицій
+            conditions += ["i.month >= ?", "o.month >= ?", "o.created_at >= ?"]
+            params += [_month(start), _month(start), start]
+        return await AnalyticsLake.query(
+            f"""
+            SELECT p.id, p.name, p.image_url,
+                   SUM(i.quantity) AS sales,
+                   SUM(i.price * i.quantity) AS revenue
+            FROM order_items i
+            JOIN orders o ON o.id = i.order_id
+            JOIN products p ON p.id = i.product_id
+            WHERE {" AND ".join(conditions)}
+            GROUP BY p.id, p.name, p.image_url
+            ORDER BY sales DESC
+            LIMIT ?
+            """,
+            [*params, limit],
+        )
+
+    @staticmethod
+    async def top_customers(start: Optional[datetime], limit: int) -> Optional[List[Dict[str, Any]]]:
+        conditions, params = ["o.status <> 'cancelled'"], []
+        if start is not None:
+            conditions += ["o.month >= ?", "o.created_at >= ?"]
+            params += [_month(start), start]
+        return await AnalyticsLake.query(
+            f"""
+            SELECT u.id, u.name, u.phone,
+                   COUNT(*) AS orders_count,
+                   SUM(o.total_amount) AS total_spent
+            FROM orders o
+            JOIN users u ON u.id = o.user_id
+            WHERE {" AND ".join(conditions)}
+            GROUP BY u.id, u.name, u.phone
+            ORDER BY total_spent DESC
+            LIMIT ?
+            """,
+            [*params, limit],
+        )
@@ -0,0 +1,219 @@
+"""Лічильники дашборду в Redis (сьогодні / тиждень / місяць / рік).
+
+Ключі (дата - день магазину, тож лічильники "перекидаються" опівночі за
+місцевим часом просто переходом на новий ключ):
+    dashboard:{metric}:day:{YYYY-MM-DD}   (TTL 9 днів - для вікна тижня)
+    dashboard:{metric}:month:{YYYY-MM}
+    dashboard:{metric}:year:{YYYY}
+
+metric: orders (усі замовлення), paid (не скасовані), revenue (копійки, не
+скасовані), new_customers (реєстрації). Оновлюються INCRBY в шляхах створення
+замовлення / зміни статусу / реєстрації і періодично звіряються з БД.
+Дашборд читає все одним MGET; поки звірки не було - рахуємо з БД.
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import RedisManager
+from app.models.order import Order
+from app.models.sales_rollup import DailySalesRollup
+from app.models.user import User
+from app.utils.dates import shop_day, shop_day_start, shop_today
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "dashboard"
+READY_KEY = f"{KEY_PREFIX}:rebuilt_at"
+
+# Тиждень дашборду - сьогодні і 7 попередніх днів
+WEEK_DAYS = 8
+PERIOD_TTL = {
+    "day": (WEEK_DAYS + 1) * 24 * 3600,
+    "month": 62 * 24 * 3600,
+    "year": 400 * 24 * 3600,
+}
+
+
+def _periods(day: date) -> List[Tuple[str, str]]:
+    return [
+        ("day", f"day:{day.isoformat()}"),
+        ("month", f"month:{day:%Y-%m}"),
+        ("year", f"year:{day:%Y}"),
+    ]
+
+
+def _key(metric: str, period: str) -> str:
+    return f"{KEY_PREFIX}:{metric}:{period}"
+
+
+def _cents(amount) -> int:
+    return int(Decimal(amount or 0) * 100)
+
+
+def _order_created_deltas(order: Order) -> Dict[str, int]:
+    deltas = {"orders": 1}
+    if order.status != "cancelled":
+        deltas.update(paid=1, revenue=_cents(order.total_amount))
+    return deltas
+
+
+def _status_change_deltas(order: Order, old_status: str) -> Optional[Dict[str, int]]:
+    """Скасування / відновлення змінює оплачені і виручку; інші переходи - нічого"""
+    if (old_status == "cancelled") == (order.status == "cancelled"):
+        return None
+    sign = -1 if order.status == "cancelled" else 1
+    return {"paid": sign, "revenue": sign * _cents(order.total_amount)}
+
+
+def _queue_increment(pipe, day: date, deltas: Dict[str, int]) -> None:
+    for kind, period in _periods(day):
+        for metric, delta in deltas.items():
+            key = _key(metric, period)
+            pipe.incrby(key, delta)
+            pipe.expire(key, PERIOD_TTL[kind])
+
+
+class DashboardCounters:
+    @staticmethod
+    async def _increment(day: date, deltas: Dict[str, int]) -> None:
+        client = RedisManager.get_client()
+        if not client:
+            return
+        try:
+            async with client.pipeline(transaction=True) as pipe:
+                _queue_increment(pipe, day, deltas)
+                await pipe.execute()
+        except Exception as e:
+            # Розбіжність виправить періодична звірка
+            logger.error(f"Failed to update dashboard counters: {e}")
+
+    @staticmethod
+    def queue_order_created(pipe, order: Order) -> None:
+        _queue_increment(pipe, shop_day(order.created_at), _order_created_deltas(order))
+
+    @staticmethod
+    def queue_status_change(pipe, order: Order, old_status: str) -> None:
+        deltas = _status_change_deltas(order, old_status)
+        if deltas:
+            _queue_increment(pipe, shop_day(order.created_at), deltas)
+
+    @staticmethod
+    async def record_user_registered(user: User) -> None:
+        await DashboardCounters._increment(shop_day(user.created_at), {"new_customers": 1})
+
+    @staticmethod
+    async def read() -> Optional[dict]:
+        """Метрики дашборду одним MGET; None - лічильники недоступні"""
+        client = RedisManager.get_client()
+        if not client:
+            return None
+
+        today = shop_today()
+        days = [f"day:{(today - timedelta(days=i)).isoformat()}" for i in range(WEEK_DAYS)]
+        _, month, year = (period for _, period in _periods(today))
+        keys = [READY_KEY]
+        for metric in ("orders", "revenue"):
+            keys += [_key(metric, period) for period in (*days, month, year)]
+        keys += [
+            _key("paid", month),
+            _key("new_customers", days[0]),
+            _key("new_customers", month),
+        ]
+
+        try:
+            values = await client.mget(keys)
+        except Exception as e:
+            logger.error(f"Failed to read dashboard counters: {e}")
+            return None
+        if values[0] is None:
+            return None
+
+        numbers = [int(value or 0) for value in values[1:]]
+        span = WEEK_DAYS + 2
+        orders, revenue = numbers[:span], numbers[span:2 * span]
+        paid_month, new_today, new_month = numbers[2 * span:]
+
+        def money(cents: int) -> Decimal:
+            return Decimal(cents).scaleb(-2)
+
+        revenue_month = money(revenue[WEEK_DAYS])
+        average_check = revenue_month / paid_month if paid_month else Decimal("0")
+        return {
+            "orders_today": orders[0],
+            "orders_week": sum(orders[:WEEK_DAYS]),
+            "orders_month": orders[WEEK_DAYS],
+            "orders_year": orders[WEEK_DAYS + 1],
+            "revenue_today": money(revenue[0]),
+            "revenue_week": money(sum(revenue[:WEEK_DAYS])),
+            "revenue_month": revenue_month,
+            "revenue_year": money(revenue[WEEK_DAYS + 1]),
+            "average_check": average_check.quantize(Decimal("0.01")),
+            "new_customers_today": new_today,
+            "new_customers_month": new_month,
+        }
+
+
+async def rebuild_dashboard_counters(db: AsyncSession, client: redis.Redis) -> None:
+    """Звірка лічильників з БД: дні вікна тижня, поточні місяць і рік"""
+    today = shop_today()
+    year_start = today.replace(month=1, day=1)
+    first_day = min(year_start, today - timedelta(days=WEEK_DAYS - 1))
+
+    R = DailySalesRollup
+    not_cancelled = R.status != "cancelled"
+    result = await db.execute(
+        select(
+            R.day,
+            func.sum(R.orders_count),
+            func.sum(case((not_cancelled, R.orders_count), else_=0)),
+            func.sum(case((not_cancelled, R.revenue), else_=0)),
+        )
+        .where(R.day >= first_day)
+        .group_by(R.day)
+    )
+
+    counters: Dict[str, int] = {}
+
+    def add(period: str, metric: str, value: int) -> None:
+        key = _key(metric, period)
+        counters[key] = counters.get(key, 0) + value
+
+    week_periods = {f"day:{(today - timedelta(days=i)).isoformat()}" for i in range(WEEK_DAYS)}
+    current_month = f"month:{today:%Y-%m}"
+    current_year = f"year:{today:%Y}"
+    for day, orders, paid, revenue in result.all():
+        for _, period in _periods(day):
+            if period in week_periods or period in (current_month, current_year):
+                add(period, "orders", int(orders or 0))
+                add(period, "paid", int(paid or 0))
+                add(period, "revenue", _cents(revenue))
+
+    users = await db.execute(
+        select(
+            func.count(case((User.created_at >= shop_day_start(today), User.id))),
+            func.count(case((User.created_at >= shop_day_start(today.replace(day=1)), User.id))),
+            func.count(User.id),
+        ).where(User.created_at >= shop_day_start(year_start))
+    )
+    new_today, new_month, new_year = users.one()
+    counters[_key("new_customers", f"day:{today.isoformat()}")] = new_today
+    counters[_key("new_customers", current_month)] = new_month
+    counters[_key("new_customers", current_year)] = new_year
+
+    # Періоди без замовлень мають бути нулями, а не залишками старих значень
+    for period in (*week_periods, current_month, current_year):
+        for metric in ("orders", "paid", "revenue"):
+            counters.setdefault(_key(metric, period), 0)
+
+    async with client.pipeline(transaction=True) as pipe:
+        for key, value in counters.items():
+            kind = key.split(":")[2]
+            pipe.set(key, value, ex=PERIOD_TTL[kind])
+        pipe.set(READY_KEY, datetime.now(timezone.utc).isoformat())
+        await pipe.execute()
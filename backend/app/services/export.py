@@ -0,0 +1,289 @@
+"""Потоковий експорт таблиць в CSV / XLSX.
+
+Рядки читаються з БД серверним курсором порціями (yield_per) і одразу
+кодуються у вихідний формат, тож пам'ять не залежить від розміру вибірки,
+а клієнт отримує перші байти ще до завершення запиту.
+"""
+import csv
+import io
+import json
+import re
+import zipfile
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, select, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.audit_log import AuditLog
+from app.models.order import Order
+from app.utils.dates import date_range_conditions, shop_tz
+
+EXPORT_CHUNK_SIZE = 1000
+
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+RowFormatter = Callable[[Sequence[Any]], Sequence[Any]]
+
+
+ORDERS_EXPORT_HEADERS = [
+    "Номер замовлення", "Статус", "Дата створення", "Клієнт", "Телефон", "Email",
+    "Доставка", "Оплата", "Промокод", "Знижка", "Вартість доставки", "Сума"
+]
+
+AUDIT_LOGS_EXPORT_HEADERS = [
+    "ID", "Дата", "Користувач", "Дія", "Тип ресурсу", "ID ресурсу",
+    "Старі значення", "Нові значення", "IP адреса", "Деталі"
+]
+
+
+def orders_export_query(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    statuses: Optional[Sequence[str]] = None,
+) -> Select:
+    """Запит експорту замовлень (колонки відповідають ORDERS_EXPORT_HEADERS)"""
+    conditions = date_range_conditions(Order.created_at, date_from, date_to)
+    if statuses:
+        conditions.append(Order.status.in_(statuses))
+    return (
+        select(
+            Order.order_number,
+            Order.status,
+            Order.created_at,
+            Order.customer_name,
+            Order.customer_phone,
+            Order.customer_email,
+            case((Order.address_id.is_(None), "pickup"), else_="delivery"),
+            Order.payment_method,
+            Order.promo_code_name,
+            Order.discount,
+            Order.delivery_cost,
+            Order.total_amount
+        )
+        .where(*conditions)
+        .order_by(Order.created_at.desc())
+    )
+
+
+def audit_logs_export_query(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    action: Optional[str] = None,
+    resource_type: Optional[str] = None,
+    user_id: Optional[int] = None,
+) -> Select:
+    """Запит експорту audit logs (колонки відповідають AUDIT_LOGS_EXPORT_HEADERS)"""
+    conditions = date_range_conditions(AuditLog.created_at, date_from, date_to)
+    if action:
+        conditions.append(AuditLog.action == action)
+    if resource_type:
+        conditions.append(AuditLog.resource_type == resource_type)
+    if user_id:
+        conditions.append(AuditLog.user_id == user_id)
+    return (
+        select(
+            AuditLog.id,
+            AuditLog.created_at,
+            AuditLog.user_id,
+            AuditLog.action,
+            AuditLog.resource_type,
+            AuditLog.resource_id,
+            AuditLog.old_values,
+            AuditLog.new_values,
+            AuditLog.ip_address,
+            AuditLog.details
+        )
+        .where(*conditions)
+        .order_by(AuditLog.created_at.desc())
+    )
+
+
+async def stream_rows(
+    db: AsyncSession,
+    stmt: Select,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    row_formatter: Optional[RowFormatter] = None,
+) -> AsyncIterator[List[Sequence[Any]]]:
+    """Порції рядків запиту через серверний курсор (stream_results + yield_per)"""
+    result = await db.stream(stmt.execution_options(yield_per=chunk_size))
+    async for partition in result.partitions(chunk_size):
+        if row_formatter:
+            yield [row_formatter(row) for row in partition]
+        else:
+            yield [tuple(row) for row in partition]
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(shop_tz())
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return str(value)
+
+
+async def csv_stream(headers: Sequence[str], chunks: AsyncIterator[List[Sequence[Any]]]) -> AsyncIterator[bytes]:
+    """CSV по порціях (UTF-8 з BOM, щоб Excel коректно відкривав кирилицю)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield ("\ufeff" + buffer.getvalue()).encode("utf-8")
+
+    async for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_text(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+
+
+# Мінімальний набір частин OOXML-книги з одним аркушем
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+        '</Relationships>'
+    ),
+    "xl/styles.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="1"><fill><patternFill patternType="none"/></fill></fills>'
+        '<borders count="1"><border/></borders>'
+        '<cellStyleXfs count="1"><xf/></cellStyleXfs>'
+        '<cellXfs count="1"><xf xfId="0"/></cellXfs>'
+        '</styleSheet>'
+    ),
+}
+
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+# Символи, заборонені в XML 1.0
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _xlsx_cell(value: Any) -> str:
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = _XML_ILLEGAL.sub("", _text(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(text)}</t></is></c>'
+
+
+def _xlsx_rows(rows) -> bytes:
+    return "".join(
+        "<row>" + "".join(_xlsx_cell(value) for value in row) + "</row>"
+        for row in rows
+    ).encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Не-seekable приймач для ZipFile: накопичує байти до наступного yield"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def xlsx_stream(
+    headers: Sequence[str],
+    chunks: AsyncIterator[List[Sequence[Any]]],
+    sheet_name: str = "Export",
+) -> AsyncIterator[bytes]:
+    """XLSX по порціях: zip пишеться в не-seekable потік (data descriptors)"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        archive.writestr("xl/workbook.xml", _XLSX_WORKBOOK.format(name=escape(sheet_name[:31])))
+
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write(_SHEET_HEAD.encode("utf-8"))
+            sheet.write(_xlsx_rows([headers]))
+            yield sink.drain()
+
+            async for rows in chunks:
+                sheet.write(_xlsx_rows(rows))
+                data = sink.drain()
+                if data:
+                    yield data
+
+            sheet.write(_SHEET_TAIL.encode("utf-8"))
+    yield sink.drain()
+
+
+def export_response(
+    db: AsyncSession,
+    stmt: Select,
+    headers: Sequence[str],
+    filename: str,
+    format: str = "csv",
+    row_formatter: Optional[RowFormatter] = None,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+) -> StreamingResponse:
+    """StreamingResponse з потоковим експортом результату запиту.
+
+    `format`: csv або excel/xlsx. `filename` - без розширення.
+    """
+    chunks = stream_rows(db, stmt, chunk_size=chunk_size, row_formatter=row_formatter)
+    if format in ("excel", "xlsx"):
+        body = xlsx_stream(headers, chunks)
+        media_type, extension = XLSX_MEDIA_TYPE, "xlsx"
+    else:
+        body = csv_stream(headers, chunks)
+        media_type, extension = CSV_MEDIA_TYPE, "csv"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename={filename}.{extension}"},
+    )
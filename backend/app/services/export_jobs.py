@@ -0,0 +1,177 @@
+"""Фонові експорти: задача в БД, файл в UPLOAD_DIR/exports, виконання в Celery.
+
+API тільки створює ExportJob і ставить задачу в чергу - запит до БД, кодування
+та запис файлу виконує воркер, тож важкий експорт не тримає web-процес
+і його з'єднання з БД.
+"""
+import gzip
+import logging
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.export_job import ExportJob
+from app.services.export import (
+    AUDIT_LOGS_EXPORT_HEADERS,
+    ORDERS_EXPORT_HEADERS,
+    audit_logs_export_query,
+    csv_stream,
+    orders_export_query,
+    stream_rows,
+    xlsx_stream,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_KINDS = ("orders", "audit_logs")
+# Задачі в цих статусах ще можна (пере)запустити - воркер міг впасти посеред роботи
+RUNNABLE_STATUSES = ("pending", "running")
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    return date.fromisoformat(value) if value else None
+
+
+def build_export(kind: str, params: Optional[dict]) -> Tuple[Select, Sequence[str]]:
+    """Запит і заголовки для типу експорту"""
+    params = params or {}
+    date_from = _parse_date(params.get("date_from"))
+    date_to = _parse_date(params.get("date_to"))
+
+    if kind == "orders":
+        return orders_export_query(date_from, date_to, params.get("statuses")), ORDERS_EXPORT_HEADERS
+    if kind == "audit_logs":
+        query = audit_logs_export_query(
+            date_from,
+            date_to,
+            action=params.get("action"),
+            resource_type=params.get("resource_type"),
+            user_id=params.get("user_id"),
+        )
+        return query, AUDIT_LOGS_EXPORT_HEADERS
+    raise ValueError(f"Unknown export kind: {kind}")
+
+
+def export_dir() -> Path:
+    return Path(settings.UPLOAD_DIR) / settings.EXPORT_SUBDIR
+
+
+def export_extension(format: str) -> str:
+    # CSV стискаємо gzip; XLSX - вже zip-архів
+    return "xlsx" if format == "excel" else "csv.gz"
+
+
+def export_download_name(job: ExportJob) -> str:
+    created = (job.created_at or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+    return f"{job.kind}_{created}.{export_extension(job.format)}"
+
+
+async def create_export_job(
+    db: AsyncSession,
+    kind: str,
+    format: str,
+    params: Optional[dict] = None,
+    user_id: Optional[int] = None,
+) -> ExportJob:
+    """Створити задачу експорту (без commit і без постановки в чергу)"""
+    if kind not in EXPORT_KINDS:
+        raise ValueError(f"Unknown export kind: {kind}")
+    job = ExportJob(
+        id=str(uuid.uuid4()),
+        kind=kind,
+        format=format,
+        params=params or {},
+        status="pending",
+        processed_rows=0,
+        created_by=user_id,
+    )
+    db.add(job)
+    await db.flush()
+    return job
+
+
+def enqueue_export_job(job_id: str) -> None:
+    """Поставити задачу експорту в чергу Celery"""
+    from app.tasks.export import run_export_job
+    run_export_job.delay(job_id)
+
+
+async def _set_job(session_factory: async_sessionmaker, job_id: str, **values) -> None:
+    async with session_factory() as db:
+        await db.execute(update(ExportJob).where(ExportJob.id == job_id).values(**values))
+        await db.commit()
+
+
+async def _track_progress(
+    chunks: AsyncIterator[List],
+    session_factory: async_sessionmaker,
+    job_id: str,
+    counter: dict,
+) -> AsyncIterator[List]:
+    """Оновлення processed_rows після кожної порції (окремою сесією -
+    сесія зі стрімом тримає серверний курсор у відкритій транзакції)"""
+    async for rows in chunks:
+        counter["rows"] += len(rows)
+        await _set_job(session_factory, job_id, processed_rows=counter["rows"])
+        yield rows
+
+
+async def process_export_job(session_factory: async_sessionmaker, job_id: str) -> None:
+    """Виконати експорт: записати файл і оновити статус задачі"""
+    async with session_factory() as db:
+        job = await db.get(ExportJob, job_id)
+        if job is None or job.status not in RUNNABLE_STATUSES:
+            logger.warning(f"Export job {job_id} is missing or already finished")
+            return
+
+        kind, format, params = job.kind, job.format, job.params
+        query, headers = build_export(kind, params)
+        total = await db.scalar(select(func.count()).select_from(query.order_by(None).subquery()))
+        job.status = "running"
+        job.total_rows = total
+        job.processed_rows = 0
+        job.error = None
+        await db.commit()
+
+    relative_path = f"{settings.EXPORT_SUBDIR}/{job_id}.{export_extension(format)}"
+    target = Path(settings.UPLOAD_DIR) / relative_path
+    target.parent.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(target.name + ".part")
+    counter = {"rows": 0}
+
+    try:
+        async with session_factory() as stream_db:
+            chunks = _track_progress(stream_rows(stream_db, query), session_factory, job_id, counter)
+            if format == "excel":
+                body, output = xlsx_stream(headers, chunks), open(partial, "wb")
+            else:
+                body, output = csv_stream(headers, chunks), gzip.open(partial, "wb")
+            with output:
+                async for data in body:
+                    output.write(data)
+        partial.replace(target)
+    except Exception as e:
+        logger.error(f"Export job {job_id} failed: {e}", exc_info=True)
+        partial.unlink(missing_ok=True)
+        await _set_job(
+            session_factory, job_id,
+            status="failed",
+            error=str(e)[:1000],
+            finished_at=datetime.now(timezone.utc),
+        )
+        return
+
+    await _set_job(
+        session_factory, job_id,
+        status="completed",
+        processed_rows=counter["rows"],
+        file_path=relative_path,
+        file_size=target.stat().st_size,
+        finished_at=datetime.now(timezone.utc),
+    )
+    logger.info(f"Export job {job_id} completed: {counter['rows']} rows")
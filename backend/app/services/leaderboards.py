@@ -0,0 +1,256 @@
+"""Лідерборди топ-товарів і топ-клієнтів на Redis sorted sets.
+
+Ключі (member - id товару / користувача):
+    leaderboard:{board}:{metric}:all          - за весь час
+    leaderboard:{board}:{metric}:day:{date}   - за день магазину (TTL ~ 32 дні)
+    leaderboard:{board}:{metric}:{7d|30d}     - ZUNIONSTORE денних ключів, кеш на хвилину
+
+board/metric: products (quantity, revenue), customers (spent, orders).
+Оновлюються інкрементально при створенні / скасуванні замовлення, звіряються з БД
+Celery задачею. Поки звірки не було (немає READY_KEY) - читаємо з БД.
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import RedisManager
+from app.models.order import Order, OrderItem
+from app.utils.dates import shop_day, shop_day_bounds, shop_today
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "leaderboard"
+READY_KEY = f"{KEY_PREFIX}:rebuilt_at"
+
+WINDOWS = {"all": None, "30d": 30, "7d": 7}
+# Денні ключі живуть трохи довше за найбільше вікно
+DAY_KEY_TTL = 32 * 24 * 3600
+# Кеш об'єднаних вікон 7d/30d
+WINDOW_CACHE_TTL = 60
+
+BOARDS = {
+    "products": ("quantity", "revenue"),
+    "customers": ("spent", "orders"),
+}
+
+
+def _key(board: str, metric: str, suffix: str) -> str:
+    return f"{KEY_PREFIX}:{board}:{metric}:{suffix}"
+
+
+def _day_suffix(day: date) -> str:
+    return f"day:{day.isoformat()}"
+
+
+def order_deltas(order: Order) -> Dict[Tuple[str, str], Dict[int, float]]:
+    """Внесок замовлення в кожен лідерборд: {(board, metric): {member: score}}"""
+    deltas: Dict[Tuple[str, str], Dict[int, float]] = {
+        (board, metric): {} for board, metrics in BOARDS.items() for metric in metrics
+    }
+    for item in order.items:
+        if item.product_id is None:
+            continue
+        quantity = deltas[("products", "quantity")]
+        revenue = deltas[("products", "revenue")]
+        quantity[item.product_id] = quantity.get(item.product_id, 0) + item.quantity
+        revenue[item.product_id] = revenue.get(item.product_id, 0) + float(item.price * item.quantity)
+    if order.user_id is not None:
+        deltas[("customers", "spent")][order.user_id] = float(order.total_amount or 0)
+        deltas[("customers", "orders")][order.user_id] = 1
+    return deltas
+
+
+def _status_sign(order: Order, old_status: str) -> int:
+    """Скасування прибирає замовлення з лідербордів (-1), відновлення - повертає (+1)"""
+    if old_status != "cancelled" and order.status == "cancelled":
+        return -1
+    if old_status == "cancelled" and order.status != "cancelled":
+        return 1
+    return 0
+
+
+def _queue_deltas(pipe, order: Order, sign: int) -> None:
+    day_suffix = _day_suffix(shop_day(order.created_at))
+    for (board, metric), members in order_deltas(order).items():
+        if not members:
+            continue
+        for suffix in ("all", day_suffix):
+            key = _key(board, metric, suffix)
+            for member, score in members.items():
+                pipe.zincrby(key, sign * score, member)
+            if sign < 0:
+                # Після скасування не лишаємо нульових / від'ємних учасників
+                pipe.zremrangebyscore(key, "-inf", 0)
+        pipe.expire(_key(board, metric, day_suffix), DAY_KEY_TTL)
+
+
+class LeaderboardService:
+    @staticmethod
+    def queue_order_created(pipe, order: Order) -> None:
+        """Команди для нового замовлення в pipeline (order.items мають бути завантажені)"""
+        if order.status != "cancelled":
+            _queue_deltas(pipe, order, 1)
+
+    @staticmethod
+    def queue_status_change(pipe, order: Order, old_status: str) -> None:
+        sign = _status_sign(order, old_status)
+        if sign:
+            _queue_deltas(pipe, order, sign)
+
+    @staticmethod
+    async def top(board: str, window: str, limit: int) -> Optional[List[Tuple[int, float, float]]]:
+        """Топ `limit` учасників: [(id, основна метрика, друга метрика)].
+
+        None - лідерборд недоступний (немає Redis або ще не було звірки).
+        """
+        client = RedisManager.get_client()
+        if not client:
+            return None
+
+        primary, secondary = BOARDS[board]
+        try:
+            if not await client.exists(READY_KEY):
+                return None
+
+            if window == "all":
+                primary_key, secondary_key = _key(board, primary, "all"), _key(board, secondary, "all")
+            else:
+                primary_key = await LeaderboardService._window_key(client, board, primary, WINDOWS[window])
+                secondary_key = await LeaderboardService._window_key(client, board, secondary, WINDOWS[window])
+
+            ranked = await client.zrevrange(primary_key, 0, limit - 1, withscores=True)
+            if not ranked:
+                return []
+            members = [member for member, _ in ranked]
+            secondary_scores = await client.zmscore(secondary_key, members)
+        except Exception as e:
+            logger.error(f"Failed to read leaderboard {board}/{window}: {e}")
+            return None
+
+        return [
+            (int(member), score, secondary_score or 0)
+            for (member, score), secondary_score in zip(ranked, secondary_scores)
+        ]
+
+    @staticmethod
+    async def _window_key(client: redis.Redis, board: str, metric: str, days: int) -> str:
+        """Ключ вікна за останні `days` днів (ZUNIONSTORE денних ключів з коротким кешем)"""
+        key = _key(board, metric, f"{days}d")
+        if not await client.exists(key):
+            today = shop_today()
+            day_keys = [_key(board, metric, _day_suffix(today - timedelta(days=i))) for i in range(days)]
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.zunionstore(key, day_keys, aggregate="SUM")
+                pipe.expire(key, WINDOW_CACHE_TTL)
+                await pipe.execute()
+        return key
+
+
+async def _aggregate_all_time(db: AsyncSession) -> Dict[Tuple[str, str], Dict[int, float]]:
+    """Значення лідербордів за весь час з БД (не скасовані замовлення)"""
+    product_conditions = [Order.status != "cancelled", OrderItem.product_id.is_not(None)]
+    customer_conditions = [Order.status != "cancelled", Order.user_id.is_not(None)]
+
+    products = await db.execute(
+        select(
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity),
+            func.sum(OrderItem.price * OrderItem.quantity)
+        )
+        .join(OrderItem.order)
+        .where(*product_conditions)
+        .group_by(OrderItem.product_id)
+    )
+    customers = await db.execute(
+        select(Order.user_id, func.sum(Order.total_amount), func.count(Order.id))
+        .where(*customer_conditions)
+        .group_by(Order.user_id)
+    )
+
+    values: Dict[Tuple[str, str], Dict[int, float]] = {
+        ("products", "quantity"): {}, ("products", "revenue"): {},
+        ("customers", "spent"): {}, ("customers", "orders"): {},
+    }
+    for product_id, quantity, revenue in products.all():
+        values[("products", "quantity")][product_id] = float(quantity or 0)
+        values[("products", "revenue")][product_id] = float(revenue or 0)
+    for user_id, spent, orders in customers.all():
+        values[("customers", "spent")][user_id] = float(spent or 0)
+        values[("customers", "orders")][user_id] = float(orders)
+    return values
+
+
+async def _aggregate_by_day(db: AsyncSession, days: int) -> Dict[date, Dict[Tuple[str, str], Dict[int, float]]]:
+    """Денні значення за останні `days` днів магазину (групування на стороні Python)"""
+    today = shop_today()
+    start, _ = shop_day_bounds(today - timedelta(days=days - 1), today)
+    result = await db.execute(
+        select(Order.id, Order.user_id, Order.total_amount, Order.created_at)
+        .where(Order.status != "cancelled", Order.created_at >= start)
+    )
+    orders = {row.id: row for row in result.all()}
+
+    per_day: Dict[date, Dict[Tuple[str, str], Dict[int, float]]] = {}
+
+    def bucket(day: date, board: str, metric: str) -> Dict[int, float]:
+        return per_day.setdefault(day, {}).setdefault((board, metric), {})
+
+    for order in orders.values():
+        if order.user_id is None:
+            continue
+        day = shop_day(order.created_at)
+        spent = bucket(day, "customers", "spent")
+        spent[order.user_id] = spent.get(order.user_id, 0) + float(order.total_amount or 0)
+        count = bucket(day, "customers", "orders")
+        count[order.user_id] = count.get(order.user_id, 0) + 1
+
+    if orders:
+        items = await db.execute(
+            select(OrderItem.order_id, OrderItem.product_id, OrderItem.quantity, OrderItem.price)
+            .join(OrderItem.order)
+            .where(Order.status != "cancelled", Order.created_at >= start, OrderItem.product_id.is_not(None))
+        )
+        for order_id, product_id, quantity, price in items.all():
+            day = shop_day(orders[order_id].created_at)
+            quantities = bucket(day, "products", "quantity")
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+            revenue = bucket(day, "products", "revenue")
+            revenue[product_id] = revenue.get(product_id, 0) + float(price * quantity)
+    return per_day
+
+
+def _replace_key(pipe, key: str, members: Dict[int, float], ttl: Optional[int] = None) -> None:
+    """Атомарна заміна вмісту ключа (всередині MULTI)"""
+    pipe.delete(key)
+    if members:
+        pipe.zadd(key, {str(member): score for member, score in members.items()})
+        if ttl:
+            pipe.expire(key, ttl)
+
+
+async def rebuild_leaderboards(db: AsyncSession, client: redis.Redis, days: int = 30) -> None:
+    """Звірка лідербордів з БД: all-time та денні ключі за останні `days` днів"""
+    all_time = await _aggregate_all_time(db)
+    per_day = await _aggregate_by_day(db, days)
+    today = shop_today()
+
+    async with client.pipeline(transaction=True) as pipe:
+        for (board, metric), members in all_time.items():
+            _replace_key(pipe, _key(board, metric, "all"), members)
+            for i in range(days):
+                day = today - timedelta(days=i)
+                _replace_key(
+                    pipe,
+                    _key(board, metric, _day_suffix(day)),
+                    per_day.get(day, {}).get((board, metric), {}),
+                    ttl=DAY_KEY_TTL,
+                )
+            # Кеш вікон перерахується при наступному читанні
+            for window_days in (7, 30):
+                pipe.delete(_key(board, metric, f"{window_days}d"))
+        pipe.set(READY_KEY, datetime.now(timezone.utc).isoformat())
+        await pipe.execute()
@@ -0,0 +1,54 @@
+"""Побічні ефекти замовлень у Redis після commit.
+
+Створення та зміна статусу замовлення оновлюють одразу кілька структур:
+події SSE, лідерборди, лічильники дашборду, HyperLogLog клієнтів, кеш
+графіка виручки. Усі команди йдуть одним pipeline - один round-trip до
+Redis замість окремого на кожен сервіс. Помилки Redis не ламають запит:
+розбіжності лічильників виправляє періодична звірка з БД.
+"""
+import logging
+from typing import Optional
+
+from app.core.events import EventService, order_created_events, order_status_events
+from app.core.redis import RedisManager
+from app.models.order import Order
+from app.services.dashboard_counters import DashboardCounters
+from app.services.leaderboards import LeaderboardService
+from app.services.revenue_series import RevenueSeriesCache
+from app.services.unique_counts import UniqueCounters
+
+logger = logging.getLogger(__name__)
+
+
+async def on_order_created(order: Order) -> None:
+    """Нове замовлення (order.items мають бути завантажені)"""
+    client = RedisManager.get_client()
+    if not client:
+        return
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            for channel, data in order_created_events(order):
+                EventService.queue_publish(pipe, channel, data)
+            LeaderboardService.queue_order_created(pipe, order)
+            DashboardCounters.queue_order_created(pipe, order)
+            UniqueCounters.queue_order_created(pipe, order)
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to apply side effects of new order {order.id}: {e}")
+
+
+async def on_order_status_changed(order: Order, old_status: str, comment: Optional[str] = None) -> None:
+    """Зміна статусу: події клієнту та адмін-панелі, скасування / відновлення в лічильниках"""
+    client = RedisManager.get_client()
+    if not client:
+        return
+    try:
+        async with client.pipeline(transaction=True) as pipe:
+            for channel, data in order_status_events(order, old_status, comment):
+                EventService.queue_publish(pipe, channel, data)
+            LeaderboardService.queue_status_change(pipe, order, old_status)
+            DashboardCounters.queue_status_change(pipe, order, old_status)
+            RevenueSeriesCache.queue_status_change(pipe, order, old_status)
+            await pipe.execute()
+    except Exception as e:
+        logger.error(f"Failed to apply side effects of order {order.id} status change: {e}")
@@ -0,0 +1,214 @@
+"""Часовий ряд виручки з довільною гранулярністю (година / день / тиждень / місяць).
+
+Bucket-и рахуються в часовому поясі магазину (date_trunc на Postgres).
+Закриті bucket-и більше не змінюються, тож кешуються в Redis без TTL
+(hash revenue_series:{granularity}, поле - ISO початку bucket-а), а з БД
+щоразу читається тільки поточний відкритий bucket. Скасування / відновлення
+старого замовлення та нічна звірка rollup скидають відповідні поля кешу.
+"""
+import json
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import RedisManager
+from app.models.order import Order
+from app.utils.dates import shop_tz
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = ("hour", "day", "week", "month")
+KEY_PREFIX = "revenue_series"
+# Bucket вважається закритим із запасом: замовлення, створене перед межею,
+# могло ще не бути закомічене на момент першого читання
+CLOSE_GRACE = timedelta(minutes=5)
+
+Bucket = Tuple[float, int]  # (виручка, кількість замовлень)
+
+_PG_SERIES_SQL = text("""
+    SELECT
+        date_trunc(:granularity, o.created_at AT TIME ZONE :tz) AS bucket,
+        SUM(o.total_amount) AS sales,
+        COUNT(*) AS orders
+    FROM orders o
+    WHERE o.created_at >= :start AND o.created_at < :end
+      AND o.status <> 'cancelled'
+    GROUP BY 1
+""")
+
+
+def _key(granularity: str) -> str:
+    return f"{KEY_PREFIX}:{granularity}"
+
+
+def bucket_floor(moment: datetime, granularity: str) -> datetime:
+    """Початок bucket-а (naive, місцевий час магазину), аналог date_trunc"""
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "hour":
+        return moment
+    moment = moment.replace(hour=0)
+    if granularity == "week":
+        return moment - timedelta(days=moment.weekday())
+    if granularity == "month":
+        return moment.replace(day=1)
+    return moment
+
+
+def next_bucket(start: datetime, granularity: str) -> datetime:
+    if granularity == "hour":
+        return start + timedelta(hours=1)
+    if granularity == "day":
+        return start + timedelta(days=1)
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def bucket_starts(start: datetime, end: datetime, granularity: str) -> List[datetime]:
+    """Початки bucket-ів, що перетинаються з [start, end) (місцевий час)"""
+    starts = []
+    current = bucket_floor(start, granularity)
+    while current < end:
+        starts.append(current)
+        current = next_bucket(current, granularity)
+    return starts
+
+
+def local_now() -> datetime:
+    return datetime.now(shop_tz()).replace(tzinfo=None)
+
+
+def _local(moment: datetime) -> datetime:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(shop_tz()).replace(tzinfo=None)
+
+
+def _utc(local: datetime) -> datetime:
+    return local.replace(tzinfo=shop_tz()).astimezone(timezone.utc)
+
+
+async def _query_buckets(
+    db: AsyncSession,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+) -> Dict[datetime, Bucket]:
+    """Виручка по bucket-ах за [start, end) місцевого часу одним запитом"""
+    if db.get_bind().dialect.name == "postgresql":
+        result = await db.execute(
+            _PG_SERIES_SQL,
+            {"granularity": granularity, "tz": settings.SHOP_TIMEZONE, "start": _utc(start), "end": _utc(end)},
+        )
+        return {row.bucket: (float(row.sales or 0), row.orders) for row in result.all()}
+
+    # Інші діалекти (SQLite в тестах): групування на стороні Python
+    result = await db.execute(
+        select(Order.created_at, Order.total_amount).where(
+            Order.status != "cancelled",
+            Order.created_at >= _utc(start),
+            Order.created_at < _utc(end),
+        )
+    )
+    buckets: Dict[datetime, Bucket] = {}
+    for created_at, amount in result.all():
+        bucket = bucket_floor(_local(created_at), granularity)
+        sales, orders = buckets.get(bucket, (0.0, 0))
+        buckets[bucket] = (sales + float(amount or 0), orders + 1)
+    return buckets
+
+
+def _queue_invalidate(pipe, start: datetime, end: datetime) -> None:
+    for granularity in GRANULARITIES:
+        fields = [s.isoformat() for s in bucket_starts(start, end, granularity)]
+        if fields:
+            pipe.hdel(_key(granularity), *fields)
+
+
+def _status_change_range(order: Order, old_status: str) -> Optional[Tuple[datetime, datetime]]:
+    """Годинний bucket дати створення, якщо скасування / відновлення змінює виручку"""
+    if (old_status == "cancelled") == (order.status == "cancelled"):
+        return None
+    start = bucket_floor(_local(order.created_at), "hour")
+    return start, next_bucket(start, "hour")
+
+
+class RevenueSeriesCache:
+    @staticmethod
+    async def series(
+        db: AsyncSession,
+        granularity: str,
+        date_from: date,
+        date_to: date,
+    ) -> List[Tuple[datetime, Bucket]]:
+        """Точки ряду за дні [date_from, date_to] включно; bucket-и - цілі
+        (тиждень / місяць на краях діапазону не обрізаються)"""
+        start = datetime.combine(date_from, datetime.min.time())
+        end = datetime.combine(date_to + timedelta(days=1), datetime.min.time())
+        starts = bucket_starts(start, end, granularity)
+
+        now = local_now()
+        closed = [s for s in starts if next_bucket(s, granularity) + CLOSE_GRACE <= now]
+        live = [s for s in starts[len(closed):] if s <= now]
+        values: Dict[datetime, Bucket] = {}
+
+        client = RedisManager.get_client()
+        if client and closed:
+            try:
+                cached = await client.hmget(_key(granularity), [s.isoformat() for s in closed])
+                for bucket, raw in zip(closed, cached):
+                    if raw is not None:
+                        sales, orders = json.loads(raw)
+                        values[bucket] = (sales, orders)
+            except Exception as e:
+                logger.error(f"Failed to read revenue series cache: {e}")
+                client = None
+
+        missing = [s for s in closed if s not in values]
+        to_query = missing + live
+        if to_query:
+            fresh = await _query_buckets(
+                db, granularity, min(to_query), next_bucket(max(to_query), granularity)
+            )
+            for bucket in to_query:
+                values[bucket] = fresh.get(bucket, (0.0, 0))
+
+            if client and missing:
+                try:
+                    await client.hset(
+                        _key(granularity),
+                        mapping={s.isoformat(): json.dumps(values[s]) for s in missing},
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to write revenue series cache: {e}")
+
+        # Майбутні bucket-и - нульові
+        return [(s, values.get(s, (0.0, 0))) for s in starts]
+
+    @staticmethod
+    async def invalidate(
+        start: datetime,
+        end: datetime,
+        client: Optional[redis.Redis] = None,
+    ) -> None:
+        """Скинути кеш bucket-ів усіх гранулярностей, що перетинаються з [start, end) (місцевий час)"""
+        client = client or RedisManager.get_client()
+        if not client:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                _queue_invalidate(pipe, start, end)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to invalidate revenue series cache: {e}")
+
+    @staticmethod
+    def queue_status_change(pipe, order: Order, old_status: str) -> None:
+        bounds = _status_change_range(order, old_status)
+        if bounds:
+            _queue_invalidate(pipe, *bounds)
@@ -0,0 +1,182 @@
+"""Денний rollup продажів (daily_sales_rollups).
+
+Адмін-статистика читає готові агрегати замість GROUP BY по всій таблиці orders.
+Rollup оновлюється інкрементально в тій самій транзакції, що й замовлення,
+а нічна Celery задача перераховує останні дні з orders (звірка).
+"""
+import logging
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from sqlalchemy import select, delete, text, exists, inspect
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.core.config import settings
+from app.models.order import Order
+from app.models.sales_rollup import DailySalesRollup
+from app.utils.dates import date_range_conditions, shop_day, shop_day_bounds
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_PAYMENT_METHOD = "unknown"
+NO_PROMO_CODE = 0
+
+# Колонки-лічильники, які додаються при upsert
+_COUNTERS = ("orders_count", "revenue", "discount", "new_customers")
+
+
+def _bucket(order: Order, day: date, status: str, sign: int, is_new_customer: bool) -> dict:
+    return {
+        "day": day,
+        "status": status,
+        "payment_method": order.payment_method or UNKNOWN_PAYMENT_METHOD,
+        "delivery_type": order.delivery_type,
+        "promo_code_id": order.promo_code_id or NO_PROMO_CODE,
+        "orders_count": sign,
+        "revenue": sign * Decimal(order.total_amount or 0),
+        "discount": sign * Decimal(order.discount or 0),
+        "new_customers": sign if is_new_customer else 0,
+    }
+
+
+async def _upsert(db: AsyncSession, rows: List[dict]) -> None:
+    """Атомарне додавання дельт до рядків rollup (INSERT ... ON CONFLICT DO UPDATE)"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = pg_insert(DailySalesRollup)
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(DailySalesRollup)
+    else:
+        raise RuntimeError(f"Sales rollup upsert is not supported for {dialect}")
+
+    table = DailySalesRollup.__table__
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "status", "payment_method", "delivery_type", "promo_code_id"],
+        set_={
+            **{name: table.c[name] + stmt.excluded[name] for name in _COUNTERS},
+            "updated_at": datetime.now(timezone.utc),
+        },
+    )
+    await db.execute(stmt, rows)
+
+
+async def _is_first_order(db: AsyncSession, order: Order) -> bool:
+    """Чи немає у цього телефону більш раннього замовлення"""
+    earlier = aliased(Order)
+    result = await db.execute(
+        select(
+            ~exists().where(
+                earlier.customer_phone == order.customer_phone,
+                earlier.id < order.id,
+            )
+        )
+    )
+    return bool(result.scalar())
+
+
+async def _created_day(db: AsyncSession, order: Order) -> date:
+    """День створення замовлення - той самий ключ, що в зміні статусу і звірці"""
+    state = inspect(order)
+    if state.pending:
+        await db.flush()
+    if "created_at" in state.unloaded:
+        # server_default: значення є тільки в БД після flush
+        await db.refresh(order, ["created_at"])
+    return shop_day(order.created_at)
+
+
+async def record_order_created(db: AsyncSession, order: Order) -> None:
+    """Додати нове замовлення до rollup (викликати до commit)"""
+    day = await _created_day(db, order)
+    is_new = await _is_first_order(db, order)
+    await _upsert(db, [_bucket(order, day, order.status, 1, is_new)])
+
+
+async def record_order_status_change(db: AsyncSession, order: Order, old_status: str) -> None:
+    """Перенести замовлення з бакету старого статусу в бакет нового"""
+    if old_status == order.status:
+        return
+    day = shop_day(order.created_at)
+    is_new = await _is_first_order(db, order)
+    # Два різні ключі - один multi-row upsert
+    await _upsert(db, [
+        _bucket(order, day, old_status, -1, is_new),
+        _bucket(order, day, order.status, 1, is_new),
+    ])
+
+
+_PG_REBUILD_SQL = text("""
+    INSERT INTO daily_sales_rollups (
+        day, status, payment_method, delivery_type, promo_code_id,
+        orders_count, revenue, discount, new_customers, updated_at
+    )
+    SELECT
+        (o.created_at AT TIME ZONE :tz)::date AS day,
+        o.status,
+        COALESCE(o.payment_method, 'unknown'),
+        CASE WHEN o.address_id IS NULL THEN 'pickup' ELSE 'delivery' END,
+        COALESCE(o.promo_code_id, 0),
+        count(*),
+        COALESCE(sum(o.total_amount), 0),
+        COALESCE(sum(o.discount), 0),
+        count(*) FILTER (WHERE NOT EXISTS (
+            SELECT 1 FROM orders e
+            WHERE e.customer_phone = o.customer_phone AND e.id < o.id
+        )),
+        now()
+    FROM orders o
+    WHERE o.created_at >= :start AND o.created_at < :end
+    GROUP BY 1, 2, 3, 4, 5
+""")
+
+
+async def rebuild_sales_rollup(db: AsyncSession, date_from: date, date_to: date) -> None:
+    """Перерахувати rollup за діапазон днів з таблиці orders (без commit)"""
+    start, end = shop_day_bounds(date_from, date_to)
+
+    await db.execute(
+        delete(DailySalesRollup).where(
+            DailySalesRollup.day >= date_from,
+            DailySalesRollup.day <= date_to,
+        )
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(
+            _PG_REBUILD_SQL,
+            {"tz": settings.SHOP_TIMEZONE, "start": start, "end": end},
+        )
+        return
+
+    # Інші діалекти (SQLite в тестах): агрегація на стороні Python
+    earlier = aliased(Order)
+    is_new = ~exists().where(
+        earlier.customer_phone == Order.customer_phone,
+        earlier.id < Order.id,
+    )
+    result = await db.execute(
+        select(Order, is_new.label("is_new")).where(
+            *date_range_conditions(Order.created_at, date_from, date_to)
+        )
+    )
+
+    buckets: dict = {}
+    for order, first in result.all():
+        row = _bucket(order, shop_day(order.created_at), order.status, 1, bool(first))
+        key = tuple(row[k] for k in ("day", "status", "payment_method", "delivery_type", "promo_code_id"))
+        if key in buckets:
+            for name in _COUNTERS:
+                buckets[key][name] += row[name]
+        else:
+            buckets[key] = row
+
+    if buckets:
+        await db.execute(
+            DailySalesRollup.__table__.insert(),
+            [{**row, "updated_at": datetime.now(timezone.utc)} for row in buckets.values()],
+        )
+
@@ -0,0 +1,144 @@
+"""Наближені унікальні клієнти / відвідувачі на Redis HyperLogLog.
+
+Ключі (один HLL ~12 KB незалежно від кількості елементів, похибка ~0.81%):
+    hll:customers:day:{YYYY-MM-DD}  - телефони, з яких оформили замовлення
+    hll:visitors:day:{YYYY-MM-DD}   - анонімні id відвідувачів з /analytics/visit
+
+Вікно (7 / 30 днів, поточний місяць) - PFCOUNT по денних ключах, Redis
+об'єднує їх на льоту. Замовлення з HLL не видаляються, тож скасовані теж
+враховуються ("з якого номера хоч раз замовляли"). Денні ключі клієнтів
+звіряються з orders Celery задачею; поки звірки не було - COUNT(DISTINCT) з БД.
+"""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import redis.asyncio as redis
+from sqlalchemy import select, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.redis import RedisManager
+from app.models.order import Order
+from app.utils.dates import shop_day, shop_day_bounds, shop_day_start, shop_today
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "hll"
+READY_KEY = f"{KEY_PREFIX}:customers:rebuilt_at"
+METRICS = ("customers", "visitors")
+WINDOWS = ("today", "7d", "30d", "month")
+# Денні ключі живуть трохи довше за найбільше вікно
+DAY_KEY_TTL = 40 * 24 * 3600
+PFADD_BATCH_SIZE = 10_000
+# Стандартна похибка HyperLogLog в Redis
+STANDARD_ERROR = 0.0081
+
+
+def _key(metric: str, day: date) -> str:
+    return f"{KEY_PREFIX}:{metric}:day:{day.isoformat()}"
+
+
+def window_days(window: str, today: date) -> List[date]:
+    """Дні вікна: today, 7d, 30d (включно з сьогодні) або month (з 1-го числа)"""
+    if window == "today":
+        count = 1
+    elif window == "month":
+        count = today.day
+    else:
+        count = int(window.rstrip("d"))
+    return [today - timedelta(days=i) for i in range(count)]
+
+
+def _queue_add(pipe, metric: str, day: date, member: str) -> None:
+    key = _key(metric, day)
+    pipe.pfadd(key, member)
+    pipe.expire(key, DAY_KEY_TTL)
+
+
+class UniqueCounters:
+    @staticmethod
+    async def _add(metric: str, day: date, member: str) -> None:
+        client = RedisManager.get_client()
+        if not client:
+            return
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                _queue_add(pipe, metric, day, member)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to update HyperLogLog {_key(metric, day)}: {e}")
+
+    @staticmethod
+    def queue_order_created(pipe, order: Order) -> None:
+        _queue_add(pipe, "customers", shop_day(order.created_at), order.customer_phone)
+
+    @staticmethod
+    async def record_visit(visitor_id: str) -> None:
+        await UniqueCounters._add("visitors", shop_today(), visitor_id)
+
+    @staticmethod
+    async def counts() -> Optional[Dict[str, Dict[str, Optional[int]]]]:
+        """{metric: {window: кількість}}; None - Redis недоступний.
+
+        Клієнти - None, поки HLL не звірені з БД.
+        """
+        client = RedisManager.get_client()
+        if not client:
+            return None
+
+        today = shop_today()
+        try:
+            ready = await client.exists(READY_KEY)
+            async with client.pipeline(transaction=False) as pipe:
+                for metric in METRICS:
+                    for window in WINDOWS:
+                        pipe.pfcount(*[_key(metric, day) for day in window_days(window, today)])
+                values = await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to read HyperLogLog counts: {e}")
+            return None
+
+        result = {}
+        for index, metric in enumerate(METRICS):
+            metric_values = values[index * len(WINDOWS):(index + 1) * len(WINDOWS)]
+            if metric == "customers" and not ready:
+                metric_values = [None] * len(WINDOWS)
+            result[metric] = dict(zip(WINDOWS, metric_values))
+        return result
+
+
+async def count_distinct_customers(db: AsyncSession) -> Dict[str, int]:
+    """Точний COUNT(DISTINCT customer_phone) по вікнах з БД (fallback без Redis)"""
+    today = shop_today()
+    starts = {window: shop_day_start(window_days(window, today)[-1]) for window in WINDOWS}
+    result = await db.execute(
+        select(*[
+            func.count(func.distinct(case((Order.created_at >= start, Order.customer_phone))))
+            for start in starts.values()
+        ]).where(Order.created_at >= min(starts.values()))
+    )
+    return dict(zip(starts, result.one()))
+
+
+async def rebuild_unique_customers(db: AsyncSession, client: redis.Redis, days: int = 31) -> None:
+    """Перезаповнити денні HLL клієнтів з orders за останні `days` днів"""
+    today = shop_today()
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        start, end = shop_day_bounds(day, day)
+        phones = (await db.scalars(
+            select(Order.customer_phone)
+            .where(Order.created_at >= start, Order.created_at < end)
+            .distinct()
+        )).all()
+
+        key = _key("customers", day)
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            for batch_start in range(0, len(phones), PFADD_BATCH_SIZE):
+                pipe.pfadd(key, *phones[batch_start:batch_start + PFADD_BATCH_SIZE])
+            if phones:
+                pipe.expire(key, DAY_KEY_TTL)
+            await pipe.execute()
+
+    await client.set(READY_KEY, datetime.now(timezone.utc).isoformat())
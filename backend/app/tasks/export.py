@@ -0,0 +1,20 @@
+"""Celery tasks для фонових експортів"""
+import asyncio
+import logging
+
+from app.celery_app import celery_app
+from app.database import task_sessionmaker
+from app.services.export_jobs import process_export_job
+
+logger = logging.getLogger(__name__)
+
+
+async def _run(job_id: str) -> None:
+    async with task_sessionmaker() as session_local:
+        await process_export_job(session_local, job_id)
+
+
+@celery_app.task(name="app.tasks.export.run_export_job")
+def run_export_job(job_id: str) -> None:
+    """Виконати експорт ExportJob і зберегти файл в UPLOAD_DIR/exports"""
+    asyncio.run(_run(job_id))
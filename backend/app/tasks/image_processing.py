@@ -200,10 +200,11 @@ def optimize_image(
 
 @celery_app.task(name="app.tasks.image_processing.cleanup_old_files")
 def cleanup_old_files(days: int = 30) -> int:
-    """Очищення старих тимчасових файлів
+    """Очищення старих тимчасових файлів та файлів експортів
     
     Args:
         days: Кількість днів, після яких файли вважаються старими
+            (для експортів - settings.EXPORT_RETENTION_DAYS)
         
     Returns:
         Кількість видалених файлів
@@ -214,13 +215,17 @@ def cleanup_old_files(days: int = 30) -> int:
             return 0
         
         # Використовуємо aware datetime для коректного порівняння
-        cutoff_date = datetime.now(timezone.utc) - timedelta(days=days)
+        now = datetime.now(timezone.utc)
         deleted_count = 0
         
         # Шукаємо файли в тимчасових директоріях
-        temp_dirs = ["temp", "tmp"]
+        temp_dirs = {
+            "temp": now - timedelta(days=days),
+            "tmp": now - timedelta(days=days),
+            settings.EXPORT_SUBDIR: now - timedelta(days=settings.EXPORT_RETENTION_DAYS),
+        }
         
-        for temp_dir in temp_dirs:
+        for temp_dir, cutoff_date in temp_dirs.items():
             temp_path = upload_dir / temp_dir
             if temp_path.exists():
                 for file_path in temp_path.iterdir():
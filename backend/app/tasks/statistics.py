@@ -0,0 +1,123 @@
+"""Celery tasks для статистики"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+import redis.asyncio as redis
+
+from app.celery_app import celery_app
+from app.core.config import settings
+from app.database import task_session
+from app.services.analytics_lake import export_lake
+from app.services.customer_analytics import refresh_customer_analytics
+from app.services.dashboard_counters import rebuild_dashboard_counters as rebuild_counters
+from app.services.leaderboards import rebuild_leaderboards as rebuild_boards
+from app.services.revenue_series import RevenueSeriesCache
+from app.services.sales_rollup import rebuild_sales_rollup as rebuild_rollup
+from app.services.unique_counts import rebuild_unique_customers as rebuild_unique
+from app.utils.dates import shop_today
+
+logger = logging.getLogger(__name__)
+
+
+async def _rebuild_recent_days(days: int) -> None:
+    date_to = shop_today()
+    date_from = date_to - timedelta(days=days - 1)
+    async with task_session() as db:
+        await rebuild_rollup(db, date_from, date_to)
+
+    # Кеш часового ряду виручки за ці дні теж міг розійтися з БД
+    client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        await RevenueSeriesCache.invalidate(
+            datetime.combine(date_from, datetime.min.time()),
+            datetime.combine(date_to + timedelta(days=1), datetime.min.time()),
+            client=client,
+        )
+    finally:
+        await client.aclose()
+    logger.info(f"Sales rollup перераховано за {date_from} - {date_to}")
+
+
+@celery_app.task(name="app.tasks.statistics.rebuild_sales_rollup")
+def rebuild_sales_rollup(days: int = 3) -> None:
+    """Звірка денного rollup продажів з таблицею orders за останні `days` днів
+    
+    Виправляє можливий дрейф інкрементальних оновлень (ручні правки в БД,
+    замовлення, змінені поза API, пізні зміни статусів).
+    """
+    asyncio.run(_rebuild_recent_days(days))
+
+
+async def _rebuild_leaderboards(days: int) -> None:
+    client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        async with task_session() as db:
+            await rebuild_boards(db, client, days=days)
+    finally:
+        await client.aclose()
+    logger.info("Лідерборди звірено з БД")
+
+
+@celery_app.task(name="app.tasks.statistics.rebuild_leaderboards")
+def rebuild_leaderboards(days: int = 30) -> None:
+    """Звірка Redis лідербордів (топ товарів / клієнтів) з таблицями замовлень"""
+    asyncio.run(_rebuild_leaderboards(days))
+
+
+async def _compute_customer_analytics() -> None:
+    async with task_session() as db:
+        counts = await refresh_customer_analytics(db)
+    logger.info(
+        f"Клієнтську аналітику перераховано: {counts['orders']} замовлень, "
+        f"{counts['customers']} клієнтів, {counts['cohort_cells']} клітинок когорт"
+    )
+
+
+@celery_app.task(name="app.tasks.statistics.compute_customer_analytics")
+def compute_customer_analytics() -> None:
+    """Перерахунок RFM-сегментів клієнтів і місячних когорт утримання"""
+    asyncio.run(_compute_customer_analytics())
+
+
+async def _rebuild_dashboard_counters() -> None:
+    client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        async with task_session() as db:
+            await rebuild_counters(db, client)
+    finally:
+        await client.aclose()
+
+
+@celery_app.task(name="app.tasks.statistics.rebuild_dashboard_counters")
+def rebuild_dashboard_counters() -> None:
+    """Звірка Redis лічильників дашборду (сьогодні / тиждень / місяць / рік) з БД"""
+    asyncio.run(_rebuild_dashboard_counters())
+
+
+async def _rebuild_unique_customers(days: int) -> None:
+    client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+    try:
+        async with task_session() as db:
+            await rebuild_unique(db, client, days=days)
+    finally:
+        await client.aclose()
+    logger.info(f"HyperLogLog унікальних клієнтів перезаповнено за {days} днів")
+
+
+@celery_app.task(name="app.tasks.statistics.rebuild_unique_customers")
+def rebuild_unique_customers(days: int = 31) -> None:
+    """Звірка денних HyperLogLog унікальних клієнтів з таблицею orders"""
+    asyncio.run(_rebuild_unique_customers(days))
+
+
+async def _export_analytics_lake() -> None:
+    async with task_session() as db:
+        counts = await export_lake(db)
+    logger.info(f"Знімок для аналітики вивантажено: {counts}")
+
+
+@celery_app.task(name="app.tasks.statistics.export_analytics_lake")
+def export_analytics_lake() -> None:
+    """Вивантаження orders / order_items / products / users в Parquet для DuckDB"""
+    asyncio.run(_export_analytics_lake())
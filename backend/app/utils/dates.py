@@ -0,0 +1,48 @@
+"""Утиліти для роботи з датами в часовому поясі магазину"""
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from app.core.config import settings
+
+
+def shop_tz() -> ZoneInfo:
+    return ZoneInfo(settings.SHOP_TIMEZONE)
+
+
+def shop_today() -> date:
+    """Поточна дата в часовому поясі магазину"""
+    return datetime.now(shop_tz()).date()
+
+
+def shop_day(moment: Optional[datetime]) -> date:
+    """День моменту часу в часовому поясі магазину (naive datetime вважаємо UTC)"""
+    if moment is None:
+        return shop_today()
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(shop_tz()).date()
+
+
+def shop_day_start(day: date) -> datetime:
+    """Початок дня магазину (00:00 за місцевим часом) в UTC"""
+    return datetime.combine(day, datetime.min.time(), tzinfo=shop_tz()).astimezone(timezone.utc)
+
+
+def shop_day_bounds(date_from: date, date_to: date) -> Tuple[datetime, datetime]:
+    """UTC межі [date_from 00:00, date_to+1 00:00) в часовому поясі магазину"""
+    return shop_day_start(date_from), shop_day_start(date_to + timedelta(days=1))
+
+
+def date_range_conditions(column, date_from: Optional[date] = None, date_to: Optional[date] = None) -> List:
+    """Фільтр по timestamp-колонці за днями магазину (включно з обох боків).
+    
+    Генерує напіввідкритий діапазон `column >= start AND column < end` замість
+    `func.date(column)`, щоб БД могла використати індекс по колонці.
+    """
+    conditions = []
+    if date_from:
+        conditions.append(column >= shop_day_start(date_from))
+    if date_to:
+        conditions.append(column < shop_day_start(date_to + timedelta(days=1)))
+    return conditions
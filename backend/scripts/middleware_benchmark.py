@@ -0,0 +1,200 @@
+"""Мікробенчмарк стеку middleware: BaseHTTPMiddleware проти чистого ASGI.
+
+Однакові за змістом стеки (request id, timing, rate limit) навколо мінімального
+Starlette застосунку викликаються напряму через ASGI-інтерфейс (без мережі і
+HTTP-клієнта), тож вимірюється саме накладна вартість middleware.
+Для кожного варіанту виводить requests/second для JSON і стрімінгової відповіді.
+
+Приклади:
+    python scripts/middleware_benchmark.py
+    python scripts/middleware_benchmark.py --requests 20000 --concurrency 100 --json bench.json
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Додаємо кореневу директорію до шляхів пошуку модулів, щоб можна було імпортувати app
+sys.path.append(str(Path(__file__).parent.parent))
+
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.core.middleware import RequestIdMiddleware, TimingMiddleware
+from app.core.rate_limit import RateLimitMiddleware, RateLimitPolicy, client_ip_from_scope
+
+# Ліміт, який бенчмарк ніколи не вичерпає - міряємо лише вартість перевірки
+POLICIES = (RateLimitPolicy("default", limit=10**9, window=60),)
+STREAM_CHUNKS = 20
+
+
+async def json_endpoint(request):
+    return JSONResponse({"id": 1, "name": "Філадельфія", "price": "289.00"})
+
+
+async def stream_endpoint(request):
+    async def chunks():
+        for index in range(STREAM_CHUNKS):
+            yield f"row {index}\n".encode()
+
+    return StreamingResponse(chunks(), media_type="text/plain")
+
+
+def build_app() -> Starlette:
+    return Starlette(routes=[
+        Route("/json", json_endpoint),
+        Route("/stream", stream_endpoint),
+    ])
+
+
+# Попередній стиль: ті самі middleware через BaseHTTPMiddleware
+class LegacyRequestIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyTimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        started = time.perf_counter()
+        response = await call_next(request)
+        response.headers["Server-Timing"] = f"app;dur={(time.perf_counter() - started) * 1000:.1f}"
+        return response
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    def __init__(self, app):
+        super().__init__(app)
+        self.limiter = RateLimitMiddleware(None, policies=POLICIES)
+
+    async def dispatch(self, request, call_next):
+        policy = self.limiter.policy_for(request.method, request.url.path)
+        if policy and self.limiter.take(policy, client_ip_from_scope(request.scope)):
+            return Response("Too Many Requests", status_code=429)
+        return await call_next(request)
+
+
+def plain_stack() -> Callable:
+    return build_app()
+
+
+def legacy_stack() -> Callable:
+    app = build_app()
+    app.add_middleware(LegacyRateLimitMiddleware)
+    app.add_middleware(LegacyTimingMiddleware)
+    app.add_middleware(LegacyRequestIdMiddleware)
+    return app
+
+
+def asgi_stack() -> Callable:
+    app = build_app()
+    app.add_middleware(RateLimitMiddleware, policies=POLICIES)
+    app.add_middleware(TimingMiddleware, slow_request_ms=0)
+    app.add_middleware(RequestIdMiddleware)
+    return app
+
+
+STACKS = {
+    "no middleware": plain_stack,
+    "BaseHTTPMiddleware": legacy_stack,
+    "pure ASGI": asgi_stack,
+}
+
+
+async def call(app, path: str) -> int:
+    """Один запит напряму через ASGI; повертає кількість байт тіла"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    received = False
+    body_size = 0
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal body_size
+        if message["type"] == "http.response.body":
+            body_size += len(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return body_size
+
+
+async def measure(app, path: str, requests: int, concurrency: int) -> float:
+    # Прогрів (ініціалізація стеку middleware Starlette)
+    await asyncio.gather(*(call(app, path) for _ in range(concurrency)))
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await call(app, path)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return requests / (time.perf_counter() - started)
+
+
+async def run_benchmark(requests: int, concurrency: int, rounds: int) -> List[Dict]:
+    results = []
+    for name, factory in STACKS.items():
+        app = factory()
+        for path in ("/json", "/stream"):
+            # Найкращий з кількох прогонів - менше шуму від GC і планувальника
+            rps = max([await measure(app, path, requests, concurrency) for _ in range(rounds)])
+            results.append({"stack": name, "endpoint": path, "rps": round(rps)})
+    return results
+
+
+def print_report(results: List[Dict]) -> None:
+    baseline = {r["endpoint"]: r["rps"] for r in results if r["stack"] == "no middleware"}
+    header = f"{'stack':<22}{'endpoint':<10}{'req/s':>10}{'vs none':>10}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        ratio = r["rps"] / baseline[r["endpoint"]] if baseline.get(r["endpoint"]) else 0
+        print(f"{r['stack']:<22}{r['endpoint']:<10}{r['rps']:>10}{ratio:>9.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Middleware microbenchmark")
+    parser.add_argument("--requests", type=int, default=5000, help="Кількість запитів на прогін")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3, help="Прогонів на варіант (береться найкращий)")
+    parser.add_argument("--json", help="Зберегти результати в JSON файл")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.requests, args.concurrency, args.rounds))
+    print_report(results)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
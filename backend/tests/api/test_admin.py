@@ -154,3 +154,120 @@ async def test_admin_add_bonus(admin_client: AsyncClient, test_user, db_session:
     await db_session.refresh(test_user)
     assert test_user.bonus_balance == initial_balance + 100
 
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_admin_orders_stream_snapshot(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест live-дошки: знімок містить тільки відкриті замовлення"""
+    import json
+    from decimal import Decimal
+    from app.models.order import Order
+
+    for number, status in [("BOARD-1", "pending"), ("BOARD-2", "preparing"), ("BOARD-3", "completed")]:
+        db_session.add(Order(
+            order_number=number,
+            status=status,
+            total_amount=Decimal("300.00"),
+            delivery_cost=Decimal("0.00"),
+            customer_phone="+380501234567"
+        ))
+    await db_session.commit()
+
+    response = await admin_client.get("/api/v1/admin/orders/stream")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: snapshot" in response.text
+
+    data_line = next(line for line in response.text.splitlines() if line.startswith("data: "))
+    orders = json.loads(data_line[len("data: "):])["orders"]
+    assert {o["order_number"] for o in orders} == {"BOARD-1", "BOARD-2"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_admin_orders_stream_requires_manager(authenticated_client: AsyncClient):
+    """Тест live-дошки: звичайний користувач не має доступу"""
+    response = await authenticated_client.get("/api/v1/admin/orders/stream")
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_publish_order_status_notifies_customer_and_admin_channels(monkeypatch):
+    """Тест що зміна статусу публікується і клієнту, і в адмін-канал"""
+    import json
+    from types import SimpleNamespace
+    from app.core.redis import RedisManager
+    from app.services.order_hooks import on_order_status_changed
+
+    published = []
+
+    class RecordingPipeline:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *args):
+            return False
+
+        def publish(self, channel, message):
+            published.append((channel, json.loads(message)))
+
+        async def execute(self):
+            return []
+
+    class RecordingRedis:
+        def pipeline(self, transaction=True):
+            return RecordingPipeline()
+
+    monkeypatch.setattr(RedisManager, "client", RecordingRedis())
+
+    order = SimpleNamespace(id=7, order_number="ORD-7", status="confirmed")
+    await on_order_status_changed(order, "pending", "ok")
+
+    assert [channel for channel, _ in published] == ["order_events:ORD-7", "admin_order_events"]
+    assert published[1][1]["type"] == "status_changed"
+    assert published[1][1]["order_id"] == 7
+    assert published[0][1]["previous_status"] == "pending"
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_auth_cache_invalidated_on_block_and_role_change(
+    client: AsyncClient, db_session: AsyncSession, test_user, test_admin_user
+):
+    """Тест кешу авторизації: повторні запити без БД, блокування і зміна ролі діють одразу"""
+    from sqlalchemy import update
+    from app.core.security import create_access_token
+    from app.models.user import User
+
+    user_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_user.id)})}"}
+    admin_headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(test_admin_user.id)})}"}
+
+    response = await client.get("/api/v1/users/me/favorites", headers=user_headers)
+    assert response.status_code == 200
+
+    # Зміна в обхід API не скидає кеш - поки діє TTL, відповідь з кешу
+    await db_session.execute(update(User).where(User.id == test_user.id).values(is_active=False))
+    await db_session.commit()
+    response = await client.get("/api/v1/users/me/favorites", headers=user_headers)
+    assert response.status_code == 200
+
+    await db_session.execute(update(User).where(User.id == test_user.id).values(is_active=True))
+    await db_session.commit()
+    response = await client.put(f"/api/v1/admin/users/{test_user.id}/block", headers=admin_headers)
+    assert response.status_code == 200
+    response = await client.get("/api/v1/users/me/favorites", headers=user_headers)
+    assert response.status_code == 403
+
+    response = await client.put(f"/api/v1/admin/users/{test_user.id}/unblock", headers=admin_headers)
+    assert response.status_code == 200
+    response = await client.get("/api/v1/admin/orders", headers=user_headers)
+    assert response.status_code == 403
+
+    response = await client.put(
+        f"/api/v1/admin/users/{test_user.id}", json={"role": "manager"}, headers=admin_headers
+    )
+    assert response.status_code == 200
+    response = await client.get("/api/v1/admin/orders", headers=user_headers)
+    assert response.status_code == 200
@@ -1,4 +1,6 @@
 """Детальні тести для authentication endpoints"""
+import asyncio
+
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -416,3 +418,242 @@ async def test_reset_password_nonexistent_user(client: AsyncClient):
     # Може бути 404 або 200 (не розкриваємо чи існує користувач)
     assert response.status_code in [200, 404, 503, 500]
 
+
+
+class FakeAttemptsRedis:
+    """In-memory заміна async Redis: get/setex/pipeline і Lua-скрипти app.core.attempts"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.data[key] = str(value)
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class Pipeline:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *args):
+                return False
+
+            def setex(self, key, ttl, value):
+                redis.data[key] = str(value)
+
+            async def execute(self):
+                return []
+
+        return Pipeline()
+
+    def register_script(self, source):
+        from app.core import attempts
+
+        async def hit(keys, args):
+            current = int(self.data.get(keys[0], 0))
+            if current >= int(args[0]):
+                return -1
+            self.data[keys[0]] = str(current + 1)
+            return current + 1
+
+        async def consume(keys, args):
+            if self.data.get(keys[0]) != args[0]:
+                return 0
+            for key in keys:
+                self.data.pop(key, None)
+            return 1
+
+        return {attempts._HIT_SCRIPT: hit, attempts._CONSUME_SCRIPT: consume}[source]
+
+
+@pytest.mark.asyncio
+@pytest.mark.auth
+async def test_sms_login_and_password_reset_with_async_redis(client: AsyncClient, monkeypatch):
+    """Тест SMS входу і відновлення пароля через async Redis: ліміти і одноразові коди"""
+    from app.core.redis import RedisManager
+    from app.tasks.sms import send_verification_code
+
+    fake_redis = FakeAttemptsRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+    sent = []
+    monkeypatch.setattr(send_verification_code, "delay", lambda phone, code: sent.append(code))
+
+    phone = "380501111120"
+    for _ in range(3):
+        response = await client.post("/api/v1/auth/send-sms", json={"phone": f"+{phone}"})
+        assert response.status_code == 200
+    response = await client.post("/api/v1/auth/send-sms", json={"phone": f"+{phone}"})
+    assert response.status_code == 400
+
+    wrong = "000000" if sent[-1] != "000000" else "111111"
+    response = await client.post("/api/v1/auth/verify-sms", json={"phone": f"+{phone}", "code": wrong})
+    assert response.status_code == 401
+    assert fake_redis.data[f"sms_verify_rate:{phone}"] == "1"
+
+    response = await client.post("/api/v1/auth/verify-sms", json={"phone": f"+{phone}", "code": sent[-1]})
+    assert response.status_code == 200
+    assert "access_token" in response.json()
+    # Код і лічильник спроб видалені - повторно код не спрацює
+    assert f"sms_verify_rate:{phone}" not in fake_redis.data
+    response = await client.post("/api/v1/auth/verify-sms", json={"phone": f"+{phone}", "code": sent[-1]})
+    assert response.status_code == 401
+
+    # Користувач, створений SMS входом
+    response = await client.post("/api/v1/auth/reset-password", json={"phone": f"+{phone}"})
+    assert response.status_code == 200
+    reset_code = sent[-1]
+    payload = {"new_password": "NewSecurePass987!", "reset_code": reset_code}
+    response = await client.post("/api/v1/auth/change-password", json=payload)
+    assert response.status_code == 200
+    response = await client.post("/api/v1/auth/change-password", json=payload)
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+@pytest.mark.auth
+async def test_verify_sms_attempts_limit(client: AsyncClient, monkeypatch):
+    """Тест що після 5 спроб навіть вірний код відхиляється"""
+    from app.core.redis import RedisManager
+
+    fake_redis = FakeAttemptsRedis()
+    fake_redis.data["sms_code:380501111121"] = "123456"
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+
+    for _ in range(5):
+        response = await client.post("/api/v1/auth/verify-sms", json={"phone": "+380501111121", "code": "654321"})
+        assert response.status_code == 401
+    response = await client.post("/api/v1/auth/verify-sms", json={"phone": "+380501111121", "code": "123456"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.auth
+async def test_logout_and_logout_all_revoke_tokens(client: AsyncClient, test_user: User):
+    """Тест що logout відкликає поточні токени, а logout-all - усі видані раніше"""
+    async def login():
+        response = await client.post(
+            "/api/v1/auth/login",
+            json={"phone": test_user.phone, "password": "testpassword123"}
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    def auth(tokens):
+        return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+    first = await login()
+    second = await login()
+
+    response = await client.post(
+        "/api/v1/auth/logout",
+        json={"refresh_token": first["refresh_token"]},
+        headers=auth(first)
+    )
+    assert response.status_code == 200
+    assert (await client.get("/api/v1/users/me", headers=auth(first))).status_code == 401
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": first["refresh_token"]})
+    assert response.status_code == 401
+    # Інший пристрій не зачеплено
+    assert (await client.get("/api/v1/users/me", headers=auth(second))).status_code == 200
+
+    response = await client.post("/api/v1/auth/logout-all", headers=auth(second))
+    assert response.status_code == 200
+    assert (await client.get("/api/v1/users/me", headers=auth(second))).status_code == 401
+    response = await client.post("/api/v1/auth/refresh", json={"refresh_token": second["refresh_token"]})
+    assert response.status_code == 401
+
+    # Новий вхід після logout-all працює
+    third = await login()
+    assert (await client.get("/api/v1/users/me", headers=auth(third))).status_code == 200
+
+
+class FakeRevocationRedis:
+    """In-memory заміна Redis для дзеркала відкликаних токенів"""
+
+    def __init__(self, data):
+        self.data = data
+
+    async def scan_iter(self, pattern, count=None):
+        prefix = pattern.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    def pubsub(self):
+        return FakeRevocationPubSub()
+
+
+class FakeRevocationPubSub:
+    async def subscribe(self, channel):
+        return None
+
+    async def listen(self):
+        # Нових подій немає - чекаємо до зупинки слухача
+        await asyncio.Event().wait()
+        yield
+
+    async def aclose(self):
+        return None
+
+
+@pytest.mark.asyncio
+@pytest.mark.auth
+async def test_revocation_listener_recovers_when_redis_comes_back(monkeypatch):
+    """Тест що слухач відкликань стартує без Redis і підхоплює його після відновлення"""
+    import time
+    from app.core import token_revocation
+    from app.core.redis import RedisManager
+    from app.core.token_revocation import TokenRevocation
+
+    revoked_before = time.time()
+    fake_redis = FakeRevocationRedis({"revoked:user:5": str(revoked_before)})
+    attempts = []
+
+    async def fake_connect():
+        attempts.append(1)
+        # Перша спроба - Redis ще недоступний
+        RedisManager.client = fake_redis if len(attempts) > 1 else None
+
+    monkeypatch.setattr(token_revocation, "RESUBSCRIBE_DELAY", 0.01)
+    monkeypatch.setattr(RedisManager, "client", None)
+    monkeypatch.setattr(RedisManager, "connect", fake_connect)
+
+    await TokenRevocation.start()
+    try:
+        for _ in range(200):
+            if 5 in TokenRevocation._users:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await TokenRevocation.stop()
+
+    assert len(attempts) == 2
+    assert TokenRevocation.is_revoked({"sub": "5", "iat": revoked_before - 1})
+    assert not TokenRevocation.is_revoked({"sub": "5", "iat": revoked_before + 1})
+
+
+@pytest.mark.asyncio
+@pytest.mark.auth
+async def test_revocation_mirror_prunes_expired_users(monkeypatch):
+    """Тест що logout-all, старші за строк refresh токену, прибираються з дзеркала"""
+    import time
+    from app.core import token_revocation
+    from app.core.config import settings
+    from app.core.token_revocation import TokenRevocation
+
+    monkeypatch.setattr(token_revocation, "PRUNE_SIZE", 2)
+    now = time.time()
+    stale = now - (settings.REFRESH_TOKEN_EXPIRE_DAYS + 1) * 24 * 3600
+
+    TokenRevocation._apply({"user_id": 1, "before": stale})
+    TokenRevocation._apply({"user_id": 2, "before": now})
+    TokenRevocation._apply({"user_id": 3, "before": now})
+
+    assert set(TokenRevocation._users) == {2, 3}
@@ -0,0 +1,62 @@
+"""Тести для кошика користувача"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from decimal import Decimal
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_save_and_get_cart(authenticated_client: AsyncClient, test_product, db_session: AsyncSession):
+    """Тест збереження кошика з кількома позиціями"""
+    from app.models.product_size import ProductSize
+
+    size = ProductSize(
+        product_id=test_product.id,
+        name="Велика",
+        price=Decimal("150.00")
+    )
+    db_session.add(size)
+    await db_session.commit()
+    await db_session.refresh(size)
+
+    response = await authenticated_client.post(
+        "/api/v1/users/me/cart",
+        json={
+            "items": [
+                {"product_id": test_product.id, "quantity": 2},
+                {"product_id": test_product.id, "size_id": size.id, "quantity": 1},
+            ]
+        }
+    )
+    assert response.status_code == 204
+
+    response = await authenticated_client.get("/api/v1/users/me/cart")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 2
+    assert data["total_items"] == 3
+    assert data["total_amount"] == 350.0
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_save_cart_skips_missing_product_and_size(authenticated_client: AsyncClient, test_product):
+    """Тест що видалені продукти пропускаються, а видалені розміри скидаються"""
+    response = await authenticated_client.post(
+        "/api/v1/users/me/cart",
+        json={
+            "items": [
+                {"product_id": 99999, "quantity": 1},
+                {"product_id": test_product.id, "size_id": 99999, "quantity": 1},
+            ]
+        }
+    )
+    assert response.status_code == 204
+
+    response = await authenticated_client.get("/api/v1/users/me/cart")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["items"]) == 1
+    assert data["items"][0]["product_id"] == test_product.id
+    assert data["items"][0]["size_id"] is None
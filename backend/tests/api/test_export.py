@@ -0,0 +1,184 @@
+"""Тести потокового експорту (CSV / XLSX)"""
+import csv
+import io
+import zipfile
+import pytest
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import Order
+from app.services.export import csv_stream, stream_rows, xlsx_stream
+
+
+async def _create_orders(db_session: AsyncSession, count: int):
+    for i in range(count):
+        db_session.add(Order(
+            order_number=f"EXP-{i:04d}",
+            status="completed" if i % 2 else "pending",
+            total_amount=Decimal("150.50"),
+            delivery_cost=Decimal("0.00"),
+            customer_name="Іван & <Co>",
+            customer_phone="+380501234567"
+        ))
+    await db_session.commit()
+
+
+async def _collect(stream):
+    return [chunk async for chunk in stream]
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_export_orders_csv(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест експорту замовлень в CSV"""
+    await _create_orders(db_session, 3)
+
+    response = await admin_client.get("/api/v1/admin/orders/export?status=pending,completed")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert ".csv" in response.headers["content-disposition"]
+
+    rows = list(csv.reader(io.StringIO(response.content.decode("utf-8-sig"))))
+    assert rows[0][0] == "Номер замовлення"
+    assert sorted(row[0] for row in rows[1:]) == ["EXP-0000", "EXP-0001", "EXP-0002"]
+    assert rows[1][3] == "Іван & <Co>"
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_export_statistics_excel(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест експорту статистики в XLSX"""
+    await _create_orders(db_session, 2)
+
+    response = await admin_client.get("/api/v1/admin/statistics/export?format=excel")
+    assert response.status_code == 200
+    assert ".xlsx" in response.headers["content-disposition"]
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read("xl/worksheets/sheet1.xml").decode("utf-8")
+    assert sheet.count("<row>") == 3
+    assert "EXP-0001" in sheet
+    assert "Іван &amp; &lt;Co&gt;" in sheet
+    assert "<c><v>150.50</v></c>" in sheet
+
+
+@pytest.mark.asyncio
+async def test_export_streams_in_chunks(db_session: AsyncSession):
+    """Тест що рядки читаються і кодуються порціями, а не одним блоком"""
+    await _create_orders(db_session, 5)
+    query = select(Order.order_number).order_by(Order.id)
+
+    chunks = await _collect(stream_rows(db_session, query, chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    csv_chunks = await _collect(csv_stream(["Номер"], stream_rows(db_session, query, chunk_size=2)))
+    # Заголовок + 3 порції
+    assert len(csv_chunks) == 4
+
+    xlsx_chunks = await _collect(xlsx_stream(["Номер"], stream_rows(db_session, query, chunk_size=2)))
+    with zipfile.ZipFile(io.BytesIO(b"".join(xlsx_chunks))) as archive:
+        assert archive.read("xl/worksheets/sheet1.xml").decode("utf-8").count("<row>") == 6
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_export_job_lifecycle(admin_client: AsyncClient, db_session: AsyncSession, tmp_path, monkeypatch):
+    """Тест фонового експорту: створення, виконання воркером, прогрес і завантаження"""
+    import gzip
+    from app.core.config import settings
+    from app.api.v1.endpoints.admin import exports
+    from app.services.export_jobs import process_export_job
+    from tests.conftest import TestingSessionLocal
+
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    enqueued = []
+    monkeypatch.setattr(exports, "enqueue_export_job", enqueued.append)
+    await _create_orders(db_session, 3)
+
+    response = await admin_client.post("/api/v1/admin/exports", json={"kind": "orders", "statuses": ["pending"]})
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+    assert job["download_url"] is None
+    assert enqueued == [job["id"]]
+
+    # Виконання задачі (те саме робить Celery воркер)
+    await process_export_job(TestingSessionLocal, job["id"])
+
+    response = await admin_client.get(f"/api/v1/admin/exports/{job['id']}")
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "completed"
+    assert job["processed_rows"] == job["total_rows"] == 2
+    assert job["progress"] == 100.0
+    assert job["download_url"].endswith(f"/admin/exports/{job['id']}/download")
+
+    response = await admin_client.get(f"/api/v1/admin/exports/{job['id']}/download")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/gzip"
+    content = gzip.decompress(response.content).decode("utf-8-sig")
+    assert "EXP-0000" in content and "EXP-0002" in content
+    assert "EXP-0001" not in content  # completed не входить у фільтр
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_audit_logs_export_enqueues_job(admin_client: AsyncClient, monkeypatch):
+    """Тест що експорт audit logs не виконується в API процесі, а ставиться в чергу"""
+    from app.api.v1.endpoints.admin import exports
+
+    enqueued = []
+    monkeypatch.setattr(exports, "enqueue_export_job", enqueued.append)
+
+    response = await admin_client.get("/api/v1/admin/audit-logs/export?format=excel&date_from=2026-01-01")
+    assert response.status_code == 202
+    data = response.json()
+    assert data["kind"] == "audit_logs"
+    assert data["format"] == "excel"
+    assert enqueued == [data["id"]]
+
+    response = await admin_client.get(f"/api/v1/admin/exports/{data['id']}/download")
+    assert response.status_code == 409
+
+
+@pytest.mark.asyncio
+async def test_export_files_not_served_as_static(client: AsyncClient, monkeypatch, tmp_path):
+    """Тест що файли експортів недоступні через /static/uploads"""
+    from app.core.config import settings
+    from app.main import app
+
+    # Каталог uploads і змонтовані з нього статичні файли - тимчасові
+    monkeypatch.setattr(settings, "UPLOAD_DIR", str(tmp_path))
+    static = next(route.app for route in app.routes if getattr(route, "name", None) == "static_uploads")
+    monkeypatch.setattr(static, "directory", str(tmp_path))
+    monkeypatch.setattr(static, "all_directories", [str(tmp_path)])
+
+    (tmp_path / "public.txt").write_bytes(b"public")
+    export_dir = tmp_path / settings.EXPORT_SUBDIR
+    export_dir.mkdir()
+    (export_dir / "static-check.csv.gz").write_bytes(b"secret")
+
+    response = await client.get("/static/uploads/public.txt")
+    assert response.status_code == 200
+    response = await client.get(f"/static/uploads/{settings.EXPORT_SUBDIR}/static-check.csv.gz")
+    assert response.status_code == 404
+
+
+def test_caddy_blocks_export_files():
+    """Тест що Caddy в production не віддає файли експортів з volume uploads"""
+    from pathlib import Path
+    from app.core.config import settings
+
+    caddyfile = Path(__file__).resolve().parents[3] / "Caddyfile"
+    if not caddyfile.is_file():
+        pytest.skip("Caddyfile is not available (tests run inside the backend image)")
+
+    config = caddyfile.read_text()
+    block = f"handle /static/uploads/{settings.EXPORT_SUBDIR}/* {{"
+    assert block in config
+    assert "respond 404" in config[config.index(block):].split("}", 1)[0]
+    # Правило стоїть перед file_server для /static/uploads/*
+    assert config.index(block) < config.index("handle_path /static/uploads/* {")
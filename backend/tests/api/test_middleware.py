@@ -0,0 +1,65 @@
+"""Тести чистих ASGI middleware (request id, timing)"""
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_request_id_and_server_timing_headers(client: AsyncClient):
+    """Тест що відповідь має X-Request-ID (новий або від проксі) і Server-Timing"""
+    response = await client.get("/health")
+    assert response.status_code == 200
+    generated = response.headers["X-Request-ID"]
+    assert len(generated) == 32
+    assert "app;dur=" in response.headers["Server-Timing"]
+
+    response = await client.get("/health", headers={"X-Request-ID": "proxy-id.42"})
+    assert response.headers["X-Request-ID"] == "proxy-id.42"
+
+    # Небезпечний id (потрапляє в логи) замінюється новим
+    response = await client.get("/health", headers={"X-Request-ID": "bad id\twith spaces"})
+    assert response.headers["X-Request-ID"] not in ("bad id\twith spaces", generated)
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_request_id_log_filter(client: AsyncClient):
+    """Тест фільтра логів: поза запитом request_id - "-"."""
+    from app.core.middleware import RequestIdLogFilter, get_request_id
+
+    assert get_request_id() is None
+    record = logging.LogRecord("test", logging.INFO, __file__, 0, "message", None, None)
+    RequestIdLogFilter().filter(record)
+    assert record.request_id == "-"
+
+    response = await client.get("/api/v1/products/", headers={"X-Request-ID": "trace-1"})
+    assert response.headers["X-Request-ID"] == "trace-1"
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_query_stats_middleware(client: AsyncClient, db_session, caplog, monkeypatch):
+    """Тест трасування SQL: кількість запитів у заголовку, вибірковий лог без параметрів"""
+    from httpx import ASGITransport
+    from app.core.config import settings
+    from app.core.sql_tracing import QueryStatsMiddleware, install_sql_tracing
+    from app.main import app
+    from tests.conftest import test_engine
+
+    install_sql_tracing(test_engine)
+    monkeypatch.setattr(settings, "SQL_TRACE_SAMPLE_RATE", 1.0)
+    traced = QueryStatsMiddleware(app)
+
+    with caplog.at_level(logging.INFO, logger="app.core.sql_tracing"):
+        async with AsyncClient(transport=ASGITransport(app=traced), base_url="http://test") as traced_client:
+            response = await traced_client.get("/api/v1/products/")
+            assert response.status_code == 200
+            assert int(response.headers["X-DB-Queries"]) >= 1
+            assert "db;dur=" in response.headers["Server-Timing"]
+
+            response = await traced_client.get("/health")
+            assert response.headers["X-DB-Queries"] == "0"
+
+    assert any(record.getMessage().startswith("SQL (") for record in caplog.records)
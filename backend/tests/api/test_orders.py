@@ -410,6 +410,41 @@ async def test_cancel_order(authenticated_client: AsyncClient, test_user, db_ses
     assert order.status == "cancelled"
 
 
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_cancel_order_appends_history(authenticated_client: AsyncClient, test_user, db_session: AsyncSession):
+    """Тест що зміна статусу додає рядок в order_history і він видний при відстеженні"""
+    from sqlalchemy import select
+    from app.models.order_history import OrderHistory
+
+    order = Order(
+        user_id=test_user.id,
+        order_number="TEST-HISTORY",
+        status="confirmed",
+        total_amount=Decimal("200.00"),
+        delivery_cost=Decimal("50.00"),
+        customer_phone=test_user.phone
+    )
+    db_session.add(order)
+    await db_session.commit()
+
+    response = await authenticated_client.put(f"/api/v1/users/me/orders/{order.id}/cancel")
+    assert response.status_code == 200
+    history = response.json()["history"]
+    assert len(history) == 1
+    assert history[0]["previous_status"] == "confirmed"
+    assert history[0]["new_status"] == "cancelled"
+
+    result = await db_session.execute(select(OrderHistory).where(OrderHistory.order_id == order.id))
+    assert len(result.scalars().all()) == 1
+
+    response = await authenticated_client.get("/api/v1/orders/TEST-HISTORY/track")
+    assert response.status_code == 200
+    status_history = response.json()["status_history"]
+    assert [entry["status"] for entry in status_history] == ["cancelled"]
+    assert status_history[0]["comment"] == "Скасовано користувачем"
+
+
 @pytest.mark.asyncio
 @pytest.mark.api
 async def test_cancel_completed_order(authenticated_client: AsyncClient, test_user, db_session: AsyncSession, test_product):
@@ -546,3 +581,181 @@ async def test_create_order_min_amount(client: AsyncClient, db_session: AsyncSes
     detail = response.json()["detail"].lower()
     assert "мінімальн" in detail or "minimum" in detail
 
+
+
+class FakePubSub:
+    """Заміна redis PubSub для спільного слухача подій.
+
+    Повідомлення (канал, дані) віддаються, коли на канал вже є підписник-стрім.
+    """
+    def __init__(self, messages, fail_subscribe=False):
+        self.messages = list(messages)
+        self.fail_subscribe = fail_subscribe
+        self.closed = False
+
+    async def subscribe(self, *channels):
+        if self.fail_subscribe:
+            from redis.exceptions import ConnectionError as RedisConnectionError
+            raise RedisConnectionError("Connection refused")
+
+    async def psubscribe(self, *patterns):
+        pass
+
+    async def listen(self):
+        import asyncio
+        from app.core.events import EventService
+
+        while True:
+            if self.messages and self.messages[0][0] in EventService._subscriptions:
+                channel, data = self.messages.pop(0)
+                yield {"type": "pmessage", "channel": channel, "data": data}
+            else:
+                await asyncio.sleep(0.01)
+
+    async def aclose(self):
+        self.closed = True
+
+
+class FakeEventsRedis:
+    def __init__(self, pubsub):
+        self.pubsubs = 0
+        self._pubsub = pubsub
+
+    def pubsub(self):
+        self.pubsubs += 1
+        return self._pubsub
+
+
+@pytest.fixture
+async def event_listener(monkeypatch):
+    """Запуск спільного слухача подій воркера на fake Redis"""
+    import asyncio
+    from app.core import events
+    from app.core.events import EventService
+    from app.core.redis import RedisManager
+
+    monkeypatch.setattr(events, "RESUBSCRIBE_DELAY", 0.01)
+
+    async def start(pubsub):
+        redis_client = FakeEventsRedis(pubsub)
+        monkeypatch.setattr(RedisManager, "client", redis_client)
+        await EventService.start()
+        for _ in range(50):
+            if EventService._connected or pubsub.closed:
+                break
+            await asyncio.sleep(0.01)
+        return redis_client
+
+    yield start
+    await EventService.stop()
+    EventService._connected = False
+    EventService._subscriptions.clear()
+
+
+async def _add_sse_order(db_session: AsyncSession, number: str, status: str):
+    db_session.add(Order(
+        order_number=number,
+        status=status,
+        total_amount=Decimal("200.00"),
+        delivery_cost=Decimal("0.00"),
+        customer_phone="+380501234567"
+    ))
+    await db_session.commit()
+
+
+def _sse_statuses(text: str):
+    import json
+    return [
+        json.loads(line[len("data: "):])["status"]
+        for line in text.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_order_events_snapshot_without_redis(client: AsyncClient, db_session: AsyncSession):
+    """Тест SSE стріму: без Redis віддається тільки поточний статус"""
+    await _add_sse_order(db_session, "SSE-001", "preparing")
+
+    response = await client.get("/api/v1/orders/SSE-001/events")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert "event: status" in response.text
+    assert '"status": "preparing"' in response.text
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_order_events_streams_published_updates(client: AsyncClient, db_session: AsyncSession, event_listener):
+    """Тест SSE стріму: події зі спільного pub/sub передаються клієнту до фінального статусу"""
+    import json
+    from app.core.events import EventService
+
+    await _add_sse_order(db_session, "SSE-002", "pending")
+    channel = "order_events:SSE-002"
+    redis_client = await event_listener(FakePubSub([
+        (channel, json.dumps({"order_number": "SSE-002", "status": "confirmed"})),
+        (channel, json.dumps({"order_number": "SSE-002", "status": "cancelled"})),
+        (channel, json.dumps({"order_number": "SSE-002", "status": "never-sent"})),
+    ]))
+
+    response = await client.get("/api/v1/orders/SSE-002/events")
+    assert response.status_code == 200
+    assert _sse_statuses(response.text) == ["pending", "confirmed", "cancelled"]
+    # Стрім відписався, з'єднання з Redis одне на воркер
+    assert channel not in EventService._subscriptions
+    assert redis_client.pubsubs == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_order_events_subscribe_only_open_orders(
+    client: AsyncClient, db_session: AsyncSession, event_listener, monkeypatch
+):
+    """Тест що неіснуюче і завершене замовлення не підписуються на події"""
+    from app.core.events import EventService
+
+    await event_listener(FakePubSub([]))
+    await _add_sse_order(db_session, "SSE-DONE", "completed")
+
+    subscribed = []
+    original = EventService.subscribe
+
+    def recording_subscribe(channel):
+        subscribed.append(channel)
+        return original(channel)
+
+    monkeypatch.setattr(EventService, "subscribe", recording_subscribe)
+
+    response = await client.get("/api/v1/orders/UNKNOWN-SSE/events")
+    assert response.status_code == 404
+    response = await client.get("/api/v1/orders/SSE-DONE/events")
+    assert response.status_code == 200
+    assert _sse_statuses(response.text) == ["completed"]
+    assert subscribed == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_order_events_snapshot_when_redis_down(client: AsyncClient, db_session: AsyncSession, event_listener):
+    """Тест SSE стріму: Redis налаштований, але недоступний - лише поточний статус, не 500"""
+    from app.core.events import EventService
+
+    pubsub = FakePubSub([], fail_subscribe=True)
+    await event_listener(pubsub)
+    assert pubsub.closed
+    assert not EventService._connected
+
+    await _add_sse_order(db_session, "SSE-003", "preparing")
+    response = await client.get("/api/v1/orders/SSE-003/events")
+    assert response.status_code == 200
+    assert _sse_statuses(response.text) == ["preparing"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_order_events_not_found(client: AsyncClient):
+    """Тест SSE стріму для неіснуючого замовлення"""
+    response = await client.get("/api/v1/orders/UNKNOWN/events")
+    assert response.status_code == 404
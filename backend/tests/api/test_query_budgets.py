@@ -0,0 +1,113 @@
+"""Бюджети SQL запитів: кількість запитів endpoint-а не росте з розміром даних (N+1)"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tests.utils.helpers import query_budget
+
+ITEMS = 6
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_set_default_address_query_budget(
+    authenticated_client: AsyncClient, db_session: AsyncSession, test_user
+):
+    """Тест що зміна адреси за замовчуванням не перебирає всі адреси"""
+    from app.models.address import Address
+
+    user_id = test_user.id
+    addresses = [
+        Address(user_id=user_id, street=f"Вулиця {i}", house=str(i), is_default=(i == 0))
+        for i in range(ITEMS)
+    ]
+    db_session.add_all(addresses)
+    await db_session.commit()
+    target_id = addresses[-1].id
+
+    # Прогрів кешу авторизації - бюджет міряє лише сам endpoint
+    await authenticated_client.get("/api/v1/users/me/addresses")
+
+    with query_budget(4):
+        response = await authenticated_client.put(f"/api/v1/users/me/addresses/{target_id}/default")
+    assert response.status_code == 200
+    assert response.json()["is_default"] is True
+
+    db_session.expire_all()
+    result = await db_session.execute(
+        select(Address.id).where(Address.user_id == user_id, Address.is_default.is_(True))
+    )
+    assert result.scalars().all() == [target_id]
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_reorder_categories_query_budget(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест що зміна порядку категорій - один SELECT на всі категорії"""
+    from app.models.category import Category
+
+    categories = [Category(name=f"Категорія {i}", slug=f"budget-category-{i}", position=i) for i in range(ITEMS)]
+    db_session.add_all(categories)
+    await db_session.commit()
+    items = [{"id": category.id, "position": ITEMS - index} for index, category in enumerate(categories)]
+    category_ids = [item["id"] for item in items]
+
+    await admin_client.get("/api/v1/admin/categories")
+
+    with query_budget(2):
+        response = await admin_client.put("/api/v1/admin/categories/reorder", json={"items": items})
+    assert response.status_code == 204
+
+    db_session.expire_all()
+    result = await db_session.execute(
+        select(Category.id, Category.position).where(Category.id.in_(category_ids))
+    )
+    assert dict(result.all()) == {item["id"]: item["position"] for item in items}
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_update_settings_query_budget(admin_client: AsyncClient):
+    """Тест що оновлення налаштувань не шукає кожен ключ окремим запитом"""
+    payload = {
+        "project_name": "Croco",
+        "contact_phone": "+380501234567",
+        "contact_email": "info@example.com",
+        "address": "Бровари",
+        "working_hours": "10:00 - 23:00",
+        "min_order_amount": 300.0,
+        "is_maintenance_mode": False,
+    }
+    await admin_client.get("/api/v1/admin/settings")
+
+    with query_budget(3):
+        response = await admin_client.put("/api/v1/admin/settings", json=payload)
+    assert response.status_code == 200
+    assert response.json()["working_hours"] == "10:00 - 23:00"
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_save_cart_query_budget(
+    authenticated_client: AsyncClient, db_session: AsyncSession, test_category
+):
+    """Тест що збереження кошика не робить запит на кожен товар"""
+    from decimal import Decimal
+    from app.models.product import Product
+
+    products = [
+        Product(name=f"Рол {i}", slug=f"budget-roll-{i}", price=Decimal("100.00"), category_id=test_category.id)
+        for i in range(ITEMS)
+    ]
+    db_session.add_all(products)
+    await db_session.commit()
+
+    await authenticated_client.get("/api/v1/users/me/addresses")
+
+    with query_budget(4):
+        response = await authenticated_client.post(
+            "/api/v1/users/me/cart",
+            json={"items": [{"product_id": product.id, "quantity": 2} for product in products]},
+        )
+    assert response.status_code == 204
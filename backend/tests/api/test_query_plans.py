@@ -0,0 +1,127 @@
+"""EXPLAIN-тести: фільтри списків мають йти по індексах, а не повним скануванням.
+
+Основні тести перевіряють плани SQLite (тестова БД). Планувальник Postgres
+обирає інакше, тому є варіант, що компілює ті самі запити під Postgres і
+перевіряє EXPLAIN там - він запускається лише з TEST_POSTGRES_URL
+(postgresql+asyncpg://..., окрема порожня БД).
+"""
+import os
+import re
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import event, Select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database import Base
+from tests.conftest import test_engine
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+requires_postgres = pytest.mark.skipif(
+    not POSTGRES_URL,
+    reason="TEST_POSTGRES_URL is not set"
+)
+
+FILTERED_LISTINGS = [
+    ("/api/v1/admin/orders?date_from=2026-01-01&date_to=2026-01-31", "orders"),
+    ("/api/v1/admin/orders?status=pending&date_from=2026-01-01&date_to=2026-01-31", "orders"),
+    ("/api/v1/admin/orders?user_id=1&date_from=2026-01-01", "orders"),
+    ("/api/v1/admin/statistics/orders?date_from=2026-01-01&date_to=2026-01-31", "orders"),
+    ("/api/v1/admin/audit-logs?user_id=1&date_from=2026-01-01&date_to=2026-01-31", "audit_logs"),
+    ("/api/v1/admin/audit-logs?resource_type=order&date_from=2026-01-01", "audit_logs"),
+    ("/api/v1/admin/audit-logs?date_from=2026-01-01&date_to=2026-01-31", "audit_logs"),
+]
+
+
+async def _query_plans(db_session: AsyncSession, client: AsyncClient, url: str, table: str):
+    """Виконати запит до endpoint та повернути EXPLAIN QUERY PLAN його SELECT-ів по `table`"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and re.search(rf"\bFROM {table}\b", statement):
+            statements.append((statement, parameters))
+
+    event.listen(test_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        response = await client.get(url)
+    finally:
+        event.remove(test_engine.sync_engine, "before_cursor_execute", capture)
+    assert response.status_code == 200, response.text
+    assert statements, f"{url} не виконав SELECT по {table}"
+
+    conn = await db_session.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append([row[-1] for row in result.all()])
+    return plans
+
+
+async def _postgres_plans(client: AsyncClient, url: str, table: str):
+    """Ті самі SELECT-и endpoint-а, скомпільовані під Postgres, та їх EXPLAIN"""
+    statements = []
+
+    def capture(conn, clauseelement, multiparams, params, execution_options):
+        if isinstance(clauseelement, Select) and re.search(rf"\bFROM {table}\b", str(clauseelement)):
+            statements.append(clauseelement)
+
+    event.listen(test_engine.sync_engine, "before_execute", capture)
+    try:
+        response = await client.get(url)
+    finally:
+        event.remove(test_engine.sync_engine, "before_execute", capture)
+    assert response.status_code == 200, response.text
+    assert statements, f"{url} не виконав SELECT по {table}"
+
+    engine = create_async_engine(POSTGRES_URL)
+    plans = []
+    try:
+        # Без commit - таблиці створюються і зникають разом з транзакцією
+        async with engine.connect() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            # На порожніх таблицях Seq Scan завжди дешевший; так він лишається
+            # в плані тільки коли жоден індекс не підходить
+            await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+            for statement in statements:
+                sql = statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+                result = await conn.exec_driver_sql(f"EXPLAIN {sql}")
+                plans.append([row[0] for row in result.all()])
+            await conn.rollback()
+    finally:
+        await engine.dispose()
+    return plans
+
+
+def _table_steps(plan, table):
+    return [step for step in plan if re.match(rf"(SCAN|SEARCH) {table}\b", step)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+@pytest.mark.parametrize("url,table", FILTERED_LISTINGS)
+async def test_date_range_filters_use_index_search(admin_client: AsyncClient, db_session: AsyncSession, url, table):
+    """Тест що фільтри по датах (і статусу / користувачу) йдуть через SEARCH по індексу (план SQLite)"""
+    for plan in await _query_plans(db_session, admin_client, url, table):
+        steps = _table_steps(plan, table)
+        assert steps, plan
+        for step in steps:
+            assert step.startswith(f"SEARCH {table} USING"), f"{url}: {plan}"
+
+
+@requires_postgres
+@pytest.mark.asyncio
+@pytest.mark.admin
+@pytest.mark.parametrize("url,table", FILTERED_LISTINGS)
+async def test_date_range_filters_avoid_seq_scan_on_postgres(admin_client: AsyncClient, db_session: AsyncSession, url, table):
+    """Тест що в Postgres ті самі фільтри не скатуються в Seq Scan по таблиці"""
+    for plan in await _postgres_plans(admin_client, url, table):
+        assert not any(f"Seq Scan on {table}" in line for line in plan), f"{url}: {plan}"
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_history_log_reads_changed_at_index(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест що журнал змін читається по індексу changed_at без сортування в пам'яті"""
+    for plan in await _query_plans(db_session, admin_client, "/api/v1/admin/orders/history-log", "order_history"):
+        assert any("INDEX ix_order_history_changed_at" in step for step in _table_steps(plan, "order_history")), plan
+        assert not any("TEMP B-TREE" in step for step in plan), plan
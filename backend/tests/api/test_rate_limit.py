@@ -0,0 +1,133 @@
+"""Тести ASGI rate limiter-а (політики, локальний token bucket, синхронізація з Redis)"""
+import time
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.core.rate_limit import RateLimitMiddleware, RateLimitPolicy
+
+
+def _build(policies):
+    async def ok(request):
+        return PlainTextResponse("ok")
+
+    inner = Starlette(routes=[
+        Route("/api/v1/auth/login", ok, methods=["POST"]),
+        Route("/api/v1/products", ok, methods=["GET"]),
+        Route("/static/logo.png", ok),
+    ])
+    middleware = RateLimitMiddleware(inner, policies=policies)
+    client = AsyncClient(transport=ASGITransport(app=middleware), base_url="http://test")
+    return middleware, client
+
+
+POLICIES = (
+    RateLimitPolicy("auth", limit=2, window=60, prefixes=("/api/v1/auth/",)),
+    RateLimitPolicy("catalog", limit=5, window=60, prefixes=("/api/v1/products",), methods=frozenset({"GET"})),
+)
+
+
+class FakeCounterPipeline:
+    def __init__(self, data):
+        self.data = data
+        self.results = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def incrby(self, key, amount):
+        self.data[key] = self.data.get(key, 0) + amount
+        self.results.append(self.data[key])
+
+    def expire(self, key, ttl):
+        self.results.append(True)
+
+    async def execute(self):
+        return self.results
+
+
+class FakeCounterRedis:
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self, transaction=True):
+        return FakeCounterPipeline(self.data)
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_rate_limit_policies_per_route_and_client():
+    """Тест що політики окремі для маршрутів і IP, а статика не лімітується"""
+    _, client = _build(POLICIES)
+    async with client:
+        for _ in range(2):
+            assert (await client.post("/api/v1/auth/login")).status_code == 200
+        response = await client.post("/api/v1/auth/login")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        # Інший IP і інша політика мають власні bucket-и
+        response = await client.post("/api/v1/auth/login", headers={"X-Forwarded-For": "10.0.0.2"})
+        assert response.status_code == 200
+        for _ in range(5):
+            assert (await client.get("/api/v1/products")).status_code == 200
+        assert (await client.get("/api/v1/products")).status_code == 429
+
+        for _ in range(10):
+            assert (await client.get("/static/logo.png")).status_code == 200
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_rate_limit_sync_accounts_for_other_workers():
+    """Тест що синхронізація з Redis зменшує локальний bucket на запити інших воркерів"""
+    middleware, client = _build(POLICIES)
+    fake_redis = FakeCounterRedis()
+    async with client:
+        assert (await client.get("/api/v1/products")).status_code == 200
+
+        # Інший воркер уже пропустив 3 запити цього клієнта в поточному вікні
+        key = next(iter(middleware.buckets))
+        policy = POLICIES[1]
+        redis_key = f"rate_limit:catalog:{key[1]}:{int(time.time() // policy.window)}"
+        fake_redis.data[redis_key] = 3
+        await middleware.sync(fake_redis)
+        assert fake_redis.data[redis_key] == 4
+        assert middleware.buckets[key].pending == 0
+
+        assert (await client.get("/api/v1/products")).status_code == 200
+        assert (await client.get("/api/v1/products")).status_code == 429
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_rate_limit_buckets_bounded_without_redis(monkeypatch):
+    """Тест що bucket-и не накопичуються без Redis: неактивні і зайві витісняються"""
+    from app.core import rate_limit
+
+    monkeypatch.setattr(rate_limit, "MAX_BUCKETS", 3)
+    middleware = RateLimitMiddleware(None, policies=POLICIES)
+    auth = POLICIES[0]
+
+    # Клієнт може підставити будь-який X-Forwarded-For - ліміт на кількість bucket-ів
+    for index in range(10):
+        middleware.take(auth, f"10.0.0.{index}")
+    assert list(middleware.buckets) == [("auth", "10.0.0.7"), ("auth", "10.0.0.8"), ("auth", "10.0.0.9")]
+
+    # Активний клієнт переміщується в кінець і не витісняється першим
+    middleware.take(auth, "10.0.0.7")
+    middleware.take(auth, "10.0.0.10")
+    assert ("auth", "10.0.0.7") in middleware.buckets
+    assert ("auth", "10.0.0.8") not in middleware.buckets
+
+    # Неактивні довше за вікно прибираються при наступному запиті
+    now = time.monotonic()
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now + auth.window + 1)
+    middleware.take(auth, "10.0.0.11")
+    assert list(middleware.buckets) == [("auth", "10.0.0.11")]
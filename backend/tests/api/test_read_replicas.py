@@ -0,0 +1,154 @@
+"""Сесії тільки для читання: репліки, read-your-writes, заборона змін"""
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import text
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app import database
+from app.core.config import settings
+from app.core.read_your_writes import RecentWriters
+from app.main import app
+from tests.conftest import TestingSessionLocal
+
+
+def _request(method: str) -> Request:
+    """Запит як від тестового клієнта httpx (ASGITransport: 127.0.0.1)"""
+    return Request({"type": "http", "method": method, "headers": [], "client": ("127.0.0.1", 123)})
+
+
+@pytest.fixture
+def read_sessions(client: AsyncClient, monkeypatch):
+    """Справжній get_read_db: "репліка" і primary - сесії до тестової БД з лічильниками"""
+    opened = {"replica": 0, "primary": 0}
+
+    def counting(name):
+        def session_local():
+            opened[name] += 1
+            return TestingSessionLocal()
+        return session_local
+
+    app.dependency_overrides.pop(database.get_read_db)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", ["sqlite+aiosqlite:///replica"])
+    monkeypatch.setattr(database, "_read_session_locals", [counting("replica")])
+    monkeypatch.setattr(database, "_ReadOnlySessionLocal", counting("primary"))
+    monkeypatch.setattr(RecentWriters, "_local", {})
+    return opened
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_reads_go_to_replica_until_own_write(client: AsyncClient, test_category, read_sessions):
+    """Тест що GET читає з репліки, а після власного запису клієнта - з primary"""
+    response = await client.get("/api/v1/categories/")
+    assert response.status_code == 200
+    assert [c["slug"] for c in response.json()] == ["test-category"]
+    assert read_sessions == {"replica": 1, "primary": 0}
+
+    # Запит на зміну даних позначає клієнта (get_db; у тестах він підмінений)
+    await RecentWriters.mark(_request("POST"))
+    assert await RecentWriters.is_recent(_request("GET"))
+
+    response = await client.get("/api/v1/categories/")
+    assert response.status_code == 200
+    assert read_sessions == {"replica": 1, "primary": 1}
+
+    # Інший клієнт (інший токен) і далі читає з репліки
+    response = await client.get("/api/v1/categories/", headers={"Authorization": "Bearer other"})
+    assert response.status_code == 200
+    assert read_sessions == {"replica": 2, "primary": 1}
+
+
+class FakeMarksRedis:
+    """Спільне між воркерами сховище позначок (рахує звернення)"""
+
+    def __init__(self):
+        self.data = {}
+        self.calls = 0
+
+    async def set(self, key, value, ex=None):
+        self.calls += 1
+        self.data[key] = value
+
+    async def exists(self, key):
+        self.calls += 1
+        return int(key in self.data)
+
+    # Кеш endpoint-ів (категорії): завжди промах, запис ігнорується
+    async def get(self, key):
+        return None
+
+    async def setex(self, key, seconds, value):
+        return True
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_recent_writer_shared_between_workers(client: AsyncClient, test_category, read_sessions, monkeypatch):
+    """Тест що позначка запису з одного воркера діє на інших (через Redis)"""
+    from app.core.redis import RedisManager
+
+    fake_redis = FakeMarksRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+    headers = {"Authorization": "Bearer writer"}
+
+    await RecentWriters.mark(Request({
+        "type": "http", "method": "POST", "client": ("10.0.0.1", 1),
+        "headers": [(b"authorization", b"Bearer writer")],
+    }))
+    # Інший воркер: локальних позначок немає
+    RecentWriters.clear_local()
+
+    response = await client.get("/api/v1/categories/", headers=headers)
+    assert response.status_code == 200
+    assert read_sessions == {"replica": 0, "primary": 1}
+
+    response = await client.get("/api/v1/categories/", headers={"Authorization": "Bearer other"})
+    assert response.status_code == 200
+    assert read_sessions == {"replica": 1, "primary": 1}
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_recent_writer_skips_redis_without_replicas(monkeypatch):
+    """Тест що без реплік позначки не пишуться і не читаються з Redis"""
+    from app.core.redis import RedisManager
+
+    fake_redis = FakeMarksRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+    monkeypatch.setattr(settings, "DATABASE_REPLICA_URLS", [])
+
+    await RecentWriters.mark(_request("POST"))
+    assert not await RecentWriters.is_recent(_request("GET"))
+    assert fake_redis.calls == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_reads_use_primary_without_replicas(client: AsyncClient, test_category):
+    """Тест що без налаштованих реплік GET працює через сесію primary"""
+    assert database.get_read_session_locals() == []
+    response = await client.get("/api/v1/categories/")
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_read_only_session_rejects_changes():
+    """Тест сесії тільки для читання: AUTOCOMMIT, flush змін заборонено"""
+    from app.models.category import Category
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    try:
+        session_local = database._read_only_sessionmaker(engine)
+        async with session_local() as session:
+            assert (await session.execute(text("SELECT 1"))).scalar() == 1
+            assert session.bind.get_execution_options()["isolation_level"] == "AUTOCOMMIT"
+
+            session.add(Category(name="Нова", slug="read-only-category"))
+            with pytest.raises(InvalidRequestError):
+                await session.flush()
+    finally:
+        await engine.dispose()
@@ -351,6 +351,34 @@ async def test_password_stored_hashed(client: AsyncClient, db_session: AsyncSess
             assert verify_password(password, user.hashed_password) is True
 
 
+
+@pytest.mark.asyncio
+@pytest.mark.security
+async def test_login_rehashes_password_with_outdated_cost(client: AsyncClient, db_session: AsyncSession):
+    """Тест що при вході хеш зі старою вартістю bcrypt замінюється новим"""
+    from passlib.context import CryptContext
+    from app.core.config import settings
+
+    old_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    user = User(
+        phone="+380501234599",
+        name="Rehash Test",
+        hashed_password=old_context.hash("RehashPassword123"),
+        is_active=True
+    )
+    db_session.add(user)
+    await db_session.commit()
+
+    response = await client.post(
+        "/api/v1/auth/login",
+        json={"phone": user.phone, "password": "RehashPassword123"}
+    )
+    assert response.status_code == 200
+
+    await db_session.refresh(user)
+    assert user.hashed_password.startswith(f"$2b${settings.BCRYPT_ROUNDS:02d}$")
+    assert verify_password("RehashPassword123", user.hashed_password) is True
+
 # ========== Тести захисту від атак ==========
 
 @pytest.mark.asyncio
@@ -0,0 +1,738 @@
+"""Тести для адмін-статистики (денний rollup продажів)"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.models.order import Order, OrderItem
+from app.models.sales_rollup import DailySalesRollup
+from app.services.customer_analytics import refresh_customer_analytics
+from app.services.dashboard_counters import rebuild_dashboard_counters
+from app.services.order_hooks import on_order_created, on_order_status_changed
+from app.services.sales_rollup import rebuild_sales_rollup, record_order_created
+from app.utils.dates import shop_day, shop_day_start, shop_today
+
+
+async def _create_orders(db_session: AsyncSession, rows):
+    for number, status, amount, phone in rows:
+        db_session.add(Order(
+            order_number=number,
+            status=status,
+            total_amount=Decimal(amount),
+            delivery_cost=Decimal("0.00"),
+            payment_method="cash",
+            customer_phone=phone
+        ))
+    await db_session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_rebuild_sales_rollup_matches_orders(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест що статистика з перерахованого rollup збігається з замовленнями"""
+    await _create_orders(db_session, [
+        ("STAT-1", "completed", "300.00", "+380501110001"),
+        ("STAT-2", "pending", "200.00", "+380501110001"),
+        ("STAT-3", "cancelled", "500.00", "+380501110002"),
+    ])
+    today = shop_today()
+    await rebuild_sales_rollup(db_session, today, today)
+    await db_session.commit()
+
+    response = await admin_client.get("/api/v1/admin/statistics/orders")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_orders"] == 3
+    assert data["completed_orders"] == 1
+    assert data["cancelled_orders"] == 1
+    assert data["pending_orders"] == 1
+    assert Decimal(str(data["total_revenue"])) == Decimal("500.00")
+    assert Decimal(str(data["average_check"])) == Decimal("250.00")
+    # Перше замовлення кожного телефону
+    assert data["new_customers"] == 2
+
+    response = await admin_client.get("/api/v1/admin/statistics/dashboard")
+    assert response.status_code == 200
+    dashboard = response.json()
+    assert dashboard["orders_today"] == 3
+    assert Decimal(str(dashboard["revenue_today"])) == Decimal("500.00")
+
+    response = await admin_client.get("/api/v1/admin/statistics/revenue")
+    assert response.status_code == 200
+    assert response.json()[-1] == {"date": today.strftime("%d.%m"), "sales": 500.0, "orders": 2}
+
+
+@pytest.mark.asyncio
+@pytest.mark.api
+async def test_cancel_order_moves_rollup_bucket(authenticated_client: AsyncClient, db_session: AsyncSession, test_user):
+    """Тест що скасування переносить замовлення з бакету pending в cancelled"""
+    order = Order(
+        order_number="STAT-CANCEL",
+        user_id=test_user.id,
+        status="pending",
+        total_amount=Decimal("400.00"),
+        delivery_cost=Decimal("0.00"),
+        customer_phone=test_user.phone
+    )
+    db_session.add(order)
+    await db_session.flush()
+    await record_order_created(db_session, order)
+    await db_session.commit()
+
+    response = await authenticated_client.put(f"/api/v1/users/me/orders/{order.id}/cancel")
+    assert response.status_code == 200
+
+    result = await db_session.execute(
+        select(DailySalesRollup.status, DailySalesRollup.orders_count, DailySalesRollup.revenue)
+        .execution_options(populate_existing=True)
+    )
+    buckets = {row.status: (row.orders_count, row.revenue) for row in result.all()}
+    assert buckets["pending"] == (0, Decimal("0.00"))
+    assert buckets["cancelled"] == (1, Decimal("400.00"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_rollup_created_uses_order_day(db_session: AsyncSession):
+    """Тест що нове замовлення потрапляє в бакет дня свого created_at, як при звірці"""
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+    late = Order(
+        order_number="STAT-LATE", status="pending", total_amount=Decimal("100.00"),
+        delivery_cost=Decimal("0.00"), customer_phone="+380501110001", created_at=yesterday
+    )
+    # Без flush і з created_at від server_default
+    fresh = Order(
+        order_number="STAT-FRESH", status="pending", total_amount=Decimal("200.00"),
+        delivery_cost=Decimal("0.00"), customer_phone="+380501110002"
+    )
+    db_session.add_all([late, fresh])
+    await record_order_created(db_session, late)
+    await record_order_created(db_session, fresh)
+    await db_session.commit()
+
+    result = await db_session.execute(select(DailySalesRollup.day, DailySalesRollup.revenue))
+    assert sorted(result.all()) == [
+        (shop_day(yesterday), Decimal("100.00")),
+        (shop_day(fresh.created_at), Decimal("200.00")),
+    ]
+
+
+class FakeSortedSetRedis:
+    """Мінімальна in-memory заміна Redis для sorted set команд лідербордів"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def publish(self, channel, message):
+        return 0
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        ranked = sorted(self.data.get(key, {}).items(), key=lambda item: -item[1])[start:end + 1]
+        return ranked if withscores else [member for member, _ in ranked]
+
+    async def zmscore(self, key, members):
+        zset = self.data.get(key, {})
+        return [zset.get(member) for member in members]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self):
+        data = self.redis.data
+        for name, args, kwargs in self.commands:
+            if name == "zincrby":
+                key, amount, member = args
+                zset = data.setdefault(key, {})
+                zset[str(member)] = zset.get(str(member), 0) + amount
+            elif name == "zremrangebyscore":
+                key = args[0]
+                data[key] = {m: s for m, s in data.get(key, {}).items() if s > 0}
+            elif name == "zunionstore":
+                dest, keys = args
+                union = {}
+                for key in keys:
+                    for member, score in data.get(key, {}).items():
+                        union[member] = union.get(member, 0) + score
+                data[dest] = union
+            elif name == "zadd":
+                data.setdefault(args[0], {}).update(args[1])
+            elif name == "delete":
+                data.pop(args[0], None)
+            elif name == "set":
+                data[args[0]] = args[1]
+        self.commands = []
+
+
+async def _load_items(db_session: AsyncSession, order: Order) -> Order:
+    """Замовлення з завантаженими items - як його передають в order hooks"""
+    return (await db_session.execute(
+        select(Order).where(Order.id == order.id).options(selectinload(Order.items))
+    )).scalar_one()
+
+
+async def _create_order_with_items(db_session: AsyncSession, number, user, product, quantity, status="pending"):
+    from app.models.order import OrderItem
+
+    order = Order(
+        order_number=number,
+        user_id=user.id,
+        status=status,
+        total_amount=product.price * quantity,
+        delivery_cost=Decimal("0.00"),
+        customer_phone=user.phone
+    )
+    db_session.add(order)
+    await db_session.flush()
+    db_session.add(OrderItem(
+        order_id=order.id,
+        product_id=product.id,
+        product_name=product.name,
+        quantity=quantity,
+        price=product.price
+    ))
+    await db_session.commit()
+    return order
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_products_statistics_falls_back_to_db_without_redis(admin_client: AsyncClient, db_session: AsyncSession, test_user, test_product):
+    """Тест що без Redis топ товарів рахується з БД (скасовані не враховуються)"""
+    await _create_order_with_items(db_session, "LB-1", test_user, test_product, 3)
+    await _create_order_with_items(db_session, "LB-2", test_user, test_product, 5, status="cancelled")
+
+    response = await admin_client.get("/api/v1/admin/statistics/products?window=7d")
+    assert response.status_code == 200
+    assert response.json() == [{
+        "id": test_product.id,
+        "name": test_product.name,
+        "image_url": test_product.image_url,
+        "sales": 3,
+        "revenue": 300.0
+    }]
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_leaderboards_rebuild_and_incremental_cancel(
+    admin_client: AsyncClient, db_session: AsyncSession, test_user, test_product, monkeypatch
+):
+    """Тест лідербордів: звірка з БД, читання вікон та інкрементальне скасування"""
+    from app.core.redis import RedisManager
+    from app.core.security import create_access_token
+    from app.services.leaderboards import rebuild_leaderboards
+
+    fake_redis = FakeSortedSetRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+
+    await _create_order_with_items(db_session, "LB-1", test_user, test_product, 2)
+    order = await _create_order_with_items(db_session, "LB-2", test_user, test_product, 1)
+    await rebuild_leaderboards(db_session, fake_redis, days=30)
+
+    for window in ("all", "7d"):
+        response = await admin_client.get(f"/api/v1/admin/statistics/products?window={window}")
+        assert response.status_code == 200
+        assert response.json()[0]["sales"] == 3
+        assert response.json()[0]["name"] == test_product.name
+
+    response = await admin_client.get("/api/v1/admin/statistics/customers")
+    assert response.status_code == 200
+    assert response.json()["top_customers"][0] == {
+        "id": test_user.id,
+        "name": test_user.name,
+        "phone": test_user.phone,
+        "orders_count": 2,
+        "total_spent": 300.0
+    }
+
+    # Скасування зменшує лідерборд без повторної звірки
+    client_token = create_access_token(data={"sub": str(test_user.id)})
+    response = await admin_client.put(
+        f"/api/v1/users/me/orders/{order.id}/cancel",
+        headers={"Authorization": f"Bearer {client_token}"}
+    )
+    assert response.status_code == 200
+
+    response = await admin_client.get("/api/v1/admin/statistics/products")
+    assert response.json()[0]["sales"] == 2
+    response = await admin_client.get("/api/v1/admin/statistics/customers")
+    assert response.json()["top_customers"][0]["orders_count"] == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_order_hooks_use_single_pipeline(db_session: AsyncSession, test_user, test_product, monkeypatch):
+    """Тест що побічні ефекти замовлення йдуть в Redis одним pipeline"""
+    from app.core.redis import RedisManager
+
+    pipelines = []
+
+    class RecordingRedis(FakeSortedSetRedis):
+        def pipeline(self, transaction=True):
+            pipelines.append(FakePipeline(self))
+            return pipelines[-1]
+
+    monkeypatch.setattr(RedisManager, "client", RecordingRedis())
+    order = await _create_order_with_items(db_session, "HOOK-1", test_user, test_product, 2)
+    order = await _load_items(db_session, order)
+
+    def commands():
+        names = {name for name, _, _ in pipelines[-1].commands}
+        pipelines.clear()
+        return names
+
+    # execute() очищає команди - знімаємо їх до виконання
+    monkeypatch.setattr(FakePipeline, "execute", lambda self: _noop())
+
+    await on_order_created(order)
+    assert len(pipelines) == 1
+    assert {"publish", "zincrby", "incrby", "pfadd"} <= commands()
+
+    order.status = "cancelled"
+    await on_order_status_changed(order, "pending", "test")
+    assert len(pipelines) == 1
+    assert {"publish", "zincrby", "zremrangebyscore", "incrby", "hdel"} <= commands()
+
+    # Перехід без скасування - лише події
+    order.status = "confirmed"
+    await on_order_status_changed(order, "pending")
+    assert commands() == {"publish"}
+
+
+async def _noop():
+    return []
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_customer_analytics_rfm_and_cohorts(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест RFM-сегментів і когорт після перерахунку батч-задачею"""
+    def moment(month, day):
+        return datetime(2026, month, day, 12, 0, tzinfo=timezone.utc)
+
+    orders = [
+        # (номер, статус, сума, телефон, дата)
+        ("RFM-1", "completed", "100.00", "+380501110001", moment(1, 10)),
+        ("RFM-2", "completed", "150.00", "+380501110001", moment(1, 20)),
+        ("RFM-3", "completed", "200.00", "+380501110001", moment(3, 5)),
+        ("RFM-4", "completed", "300.00", "+380501110002", moment(1, 15)),
+        ("RFM-5", "completed", "50.00", "+380501110003", moment(2, 1)),
+        ("RFM-6", "pending", "80.00", "+380501110003", moment(2, 20)),
+        ("RFM-7", "cancelled", "900.00", "+380501110004", moment(3, 1)),
+    ]
+    for number, status, amount, phone, created_at in orders:
+        db_session.add(Order(
+            order_number=number,
+            status=status,
+            total_amount=Decimal(amount),
+            delivery_cost=Decimal("0.00"),
+            payment_method="cash",
+            customer_phone=phone,
+            created_at=created_at
+        ))
+    await db_session.commit()
+
+    counts = await refresh_customer_analytics(db_session)
+    assert counts == {"orders": 6, "customers": 3, "cohort_cells": 5}
+
+    response = await admin_client.get("/api/v1/admin/statistics/rfm")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_customers"] == 3
+    assert data["computed_at"] is not None
+
+    response = await admin_client.get("/api/v1/admin/statistics/rfm/customers")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    top = data["items"][0]
+    assert top["customer_phone"] == "+380501110001"
+    assert top["frequency"] == 3
+    assert top["monetary"] == 450.0
+    assert top["f_score"] == 5
+    # Скасоване замовлення не робить клієнта
+    assert "+380501110004" not in {item["customer_phone"] for item in data["items"]}
+
+    segment = top["segment"]
+    response = await admin_client.get(f"/api/v1/admin/statistics/rfm/customers?segment={segment}")
+    assert all(item["segment"] == segment for item in response.json()["items"])
+
+    response = await admin_client.get("/api/v1/admin/statistics/cohorts")
+    assert response.status_code == 200
+    cohorts = {c["cohort_month"]: c for c in response.json()}
+    assert set(cohorts) == {"2026-01", "2026-02"}
+    january = cohorts["2026-01"]
+    assert january["size"] == 2
+    # Другий клієнт січня більше не замовляв, перший повернувся в березні
+    assert [p["customers"] for p in january["periods"]] == [2, 0, 1]
+    assert [p["retention"] for p in january["periods"]] == [1.0, 0.0, 0.5]
+    assert january["periods"][0]["revenue"] == 550.0
+    assert [p["customers"] for p in cohorts["2026-02"]["periods"]] == [1, 0]
+
+
+class FakeHashRedis:
+    """Мінімальна in-memory заміна Redis для hash команд кешу часового ряду"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def hmget(self, key, fields):
+        values = self.data.get(key, {})
+        return [values.get(field) for field in fields]
+
+    async def hset(self, key, mapping):
+        self.data.setdefault(key, {}).update(mapping)
+
+    async def hdel(self, key, *fields):
+        for field in fields:
+            self.data.get(key, {}).pop(field, None)
+
+    def pipeline(self, transaction=True):
+        return FakeCommandPipeline(self)
+
+
+class FakeCommandPipeline(FakePipeline):
+    """Pipeline, що виконує накопичені команди методами fake-клієнта.
+
+    Команди, яких fake не підтримує (події, структури інших сервісів з
+    order hooks), пропускаються.
+    """
+
+    async def execute(self):
+        results = []
+        for name, args, kwargs in self.commands:
+            method = getattr(self.redis, name, None)
+            results.append(await method(*args, **kwargs) if method else None)
+        self.commands = []
+        return results
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_revenue_series_caches_closed_buckets(admin_client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Тест що закриті bucket-и беруться з кешу, а відкритий рахується з БД"""
+    from app.core.redis import RedisManager
+    fake_redis = FakeHashRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+
+    now = datetime.now(timezone.utc)
+    old_order = Order(
+        order_number="SERIES-1", status="completed", total_amount=Decimal("300.00"),
+        delivery_cost=Decimal("0.00"), customer_phone="+380501110001",
+        created_at=now - timedelta(days=5)
+    )
+    db_session.add(old_order)
+    db_session.add(Order(
+        order_number="SERIES-2", status="pending", total_amount=Decimal("120.00"),
+        delivery_cost=Decimal("0.00"), customer_phone="+380501110002"
+    ))
+    await db_session.commit()
+
+    today = shop_today()
+    old_day = today - timedelta(days=5)
+    params = {"granularity": "day", "date_from": str(today - timedelta(days=6)), "date_to": str(today)}
+
+    response = await admin_client.get("/api/v1/admin/statistics/revenue/series", params=params)
+    assert response.status_code == 200
+    points = {p["bucket"][:10]: p for p in response.json()["points"]}
+    assert len(points) == 7
+    assert points[str(old_day)]["sales"] == 300.0
+    assert points[str(today)] == {"bucket": f"{today}T00:00:00", "sales": 120.0, "orders": 1}
+
+    cached = fake_redis.data["revenue_series:day"]
+    assert f"{old_day}T00:00:00" in cached
+    # Відкритий bucket не кешується
+    assert f"{today}T00:00:00" not in cached
+
+    # Замовлення в минулому дні, додане в обхід API, не видно - bucket закешований
+    db_session.add(Order(
+        order_number="SERIES-3", status="completed", total_amount=Decimal("50.00"),
+        delivery_cost=Decimal("0.00"), customer_phone="+380501110003",
+        created_at=now - timedelta(days=5)
+    ))
+    await db_session.commit()
+    response = await admin_client.get("/api/v1/admin/statistics/revenue/series", params=params)
+    points = {p["bucket"][:10]: p for p in response.json()["points"]}
+    assert points[str(old_day)]["sales"] == 300.0
+
+    # Скасування старого замовлення скидає його bucket-и
+    old_order = await _load_items(db_session, old_order)
+    old_order.status = "cancelled"
+    await db_session.commit()
+    await on_order_status_changed(old_order, "completed")
+    response = await admin_client.get("/api/v1/admin/statistics/revenue/series", params=params)
+    points = {p["bucket"][:10]: p for p in response.json()["points"]}
+    assert points[str(old_day)] == {"bucket": f"{old_day}T00:00:00", "sales": 50.0, "orders": 1}
+
+    response = await admin_client.get(
+        "/api/v1/admin/statistics/revenue/series",
+        params={"granularity": "month", "date_from": str(today), "date_to": str(today)}
+    )
+    assert response.status_code == 200
+    assert response.json()["points"][0]["bucket"] == f"{today.replace(day=1)}T00:00:00"
+
+    response = await admin_client.get(
+        "/api/v1/admin/statistics/revenue/series",
+        params={"granularity": "hour", "date_from": str(today - timedelta(days=40)), "date_to": str(today)}
+    )
+    assert response.status_code == 400
+
+
+class FakeCounterRedis:
+    """Мінімальна in-memory заміна Redis для лічильників дашборду"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def incrby(self, key, amount):
+        self.data[key] = str(int(self.data.get(key, 0)) + amount)
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+
+    def pipeline(self, transaction=True):
+        return FakeCommandPipeline(self)
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_dashboard_counters_match_database(admin_client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Тест що дашборд з Redis лічильників збігається з розрахунком по БД"""
+    from app.core.redis import RedisManager
+
+    async def add_order(number, status, amount):
+        order = Order(
+            order_number=number, status=status, total_amount=Decimal(amount),
+            delivery_cost=Decimal("0.00"), payment_method="cash", customer_phone="+380501110001"
+        )
+        db_session.add(order)
+        await db_session.flush()
+        await record_order_created(db_session, order)
+        await db_session.commit()
+        return await _load_items(db_session, order)
+
+    async def dashboard():
+        response = await admin_client.get("/api/v1/admin/statistics/dashboard")
+        assert response.status_code == 200
+        return response.json()
+
+    await add_order("DASH-1", "completed", "300.00")
+    await add_order("DASH-2", "cancelled", "100.00")
+    from_db = await dashboard()
+    assert from_db["orders_today"] == 2
+
+    fake_redis = FakeCounterRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+    # До першої звірки - fallback на БД
+    assert await dashboard() == from_db
+
+    await rebuild_dashboard_counters(db_session, fake_redis)
+    assert await dashboard() == from_db
+
+    # Інкрементальні оновлення
+    order = await add_order("DASH-3", "pending", "250.00")
+    await on_order_created(order)
+    counted = await dashboard()
+    assert counted["orders_today"] == 3
+    assert Decimal(str(counted["revenue_today"])) == Decimal("550.00")
+    assert Decimal(str(counted["average_check"])) == Decimal("275.00")
+
+    order.status = "cancelled"
+    await on_order_status_changed(order, "pending")
+    counted = await dashboard()
+    assert counted["orders_week"] == 3
+    assert Decimal(str(counted["revenue_month"])) == Decimal("300.00")
+
+
+class FakeHyperLogLogRedis:
+    """In-memory заміна Redis для HyperLogLog (точні множини замість HLL)"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def pfadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def pfcount(self, *keys):
+        return len(set().union(*(self.data.get(key, set()) for key in keys)))
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakeCommandPipeline(self)
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_unique_counts_from_hyperloglog(admin_client: AsyncClient, db_session: AsyncSession, monkeypatch):
+    """Тест унікальних клієнтів і відвідувачів: HLL після звірки, БД без Redis"""
+    from app.core.redis import RedisManager
+    from app.services.unique_counts import rebuild_unique_customers
+
+    now = datetime.now(timezone.utc)
+    for number, phone, created_at in [
+        ("UNIQ-1", "+380501110001", now),
+        ("UNIQ-2", "+380501110001", now),
+        ("UNIQ-3", "+380501110002", now),
+        ("UNIQ-4", "+380501110003", now - timedelta(days=10)),
+    ]:
+        db_session.add(Order(
+            order_number=number, status="pending", total_amount=Decimal("100.00"),
+            delivery_cost=Decimal("0.00"), customer_phone=phone, created_at=created_at
+        ))
+    await db_session.commit()
+
+    response = await admin_client.get("/api/v1/admin/statistics/unique")
+    assert response.status_code == 200
+    exact = response.json()
+    assert exact["approximate"] is False
+    assert exact["visitors"] is None
+    assert exact["customers"]["today"] == 2
+    assert exact["customers"]["30d"] == 3
+
+    fake_redis = FakeHyperLogLogRedis()
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+    for visitor in ("visitor-aaaa", "visitor-aaaa", "visitor-bbbb"):
+        response = await admin_client.post("/api/v1/analytics/visit", json={"visitor_id": visitor})
+        assert response.status_code == 200
+
+    # До звірки клієнти рахуються з БД, відвідувачі - з HLL
+    data = (await admin_client.get("/api/v1/admin/statistics/unique")).json()
+    assert data["approximate"] is False
+    assert data["customers"] == exact["customers"]
+    assert data["visitors"]["today"] == 2
+
+    await rebuild_unique_customers(db_session, fake_redis, days=31)
+    data = (await admin_client.get("/api/v1/admin/statistics/unique")).json()
+    assert data["approximate"] is True
+    assert data["customers"] == exact["customers"]
+    assert data["visitors"]["7d"] == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_statistics_from_analytics_lake(
+    admin_client: AsyncClient, db_session: AsyncSession, test_user, test_product, monkeypatch, tmp_path
+):
+    """Тест Parquet-знімка: розбиття по місяцях і топи статистики з DuckDB"""
+    from app.core.config import settings
+    from app.services.analytics_lake import export_lake
+
+    monkeypatch.setattr(settings, "ANALYTICS_DATA_DIR", str(tmp_path))
+
+    old = await _create_order_with_items(db_session, "LAKE-1", test_user, test_product, 2, status="completed")
+    old.created_at = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+    await _create_order_with_items(db_session, "LAKE-2", test_user, test_product, 3)
+    await _create_order_with_items(db_session, "LAKE-3", test_user, test_product, 5, status="cancelled")
+    await db_session.commit()
+
+    counts = await export_lake(db_session)
+    assert counts["orders"] == 3 and counts["order_items"] == 3 and counts["products"] == 1
+    snapshot = tmp_path / "snapshots" / (tmp_path / "CURRENT").read_text()
+    assert (snapshot / "orders" / "month=2026-01" / "part-0.parquet").is_file()
+    assert len(list((snapshot / "order_items").iterdir())) == 2
+
+    # Замовлення після вивантаження в знімок не потрапляє - відповідь саме з нього
+    await _create_order_with_items(db_session, "LAKE-4", test_user, test_product, 10)
+
+    response = await admin_client.get("/api/v1/admin/statistics/products")
+    assert response.status_code == 200
+    assert response.json() == [{
+        "id": test_product.id,
+        "name": test_product.name,
+        "image_url": test_product.image_url,
+        "sales": 5,
+        "revenue": float(test_product.price * 5)
+    }]
+
+    response = await admin_client.get("/api/v1/admin/statistics/products?window=30d")
+    assert response.json()[0]["sales"] == 3
+
+    response = await admin_client.get("/api/v1/admin/statistics/customers")
+    assert response.status_code == 200
+    top = response.json()["top_customers"]
+    assert top[0]["id"] == test_user.id
+    assert top[0]["orders_count"] == 2
+
+    # Лідерборди в Redis (актуальні на зараз) мають пріоритет над знімком
+    from app.core.redis import RedisManager
+    from app.services.leaderboards import rebuild_leaderboards
+
+    fake_redis = FakeSortedSetRedis()
+    await rebuild_leaderboards(db_session, fake_redis, days=30)
+    monkeypatch.setattr(RedisManager, "client", fake_redis)
+    response = await admin_client.get("/api/v1/admin/statistics/products?window=7d")
+    assert response.json()[0]["sales"] == 13
+    monkeypatch.setattr(RedisManager, "client", None)
+
+    # Порожні таблиці теж читаються (порожня партиція зі схемою)
+    await db_session.execute(OrderItem.__table__.delete())
+    await db_session.execute(Order.__table__.delete())
+    await db_session.commit()
+    assert (await export_lake(db_session))["orders"] == 0
+    response = await admin_client.get("/api/v1/admin/statistics/products")
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.admin
+async def test_customers_statistics_new_by_shop_day(admin_client: AsyncClient, db_session: AsyncSession):
+    """Тест що нові клієнти за сьогодні / місяць рахуються від півночі за часом магазину"""
+    from app.models.user import User
+
+    async def customers():
+        response = await admin_client.get("/api/v1/admin/statistics/customers")
+        assert response.status_code == 200
+        return response.json()
+
+    before = await customers()
+    day_start = shop_day_start(shop_today())
+    for phone, created_at in (
+        ("+380501110101", day_start + timedelta(minutes=1)),
+        ("+380501110102", day_start - timedelta(minutes=1)),
+    ):
+        db_session.add(User(phone=phone, name="Client", hashed_password="x", is_active=True, created_at=created_at))
+    await db_session.commit()
+
+    after = await customers()
+    assert after["new_today"] - before["new_today"] == 1
+    # Вчорашній клієнт - у поточному місяці, якщо сьогодні не перше число
+    expected_month = 1 if shop_today().day == 1 else 2
+    assert after["new_month"] - before["new_month"] == expected_month
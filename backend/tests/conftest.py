@@ -7,6 +7,8 @@ os.environ["REDIS_URL"] = "redis://localhost:6379/0"
 os.environ["CELERY_BROKER_URL"] = "redis://localhost:6379/0"
 os.environ["CELERY_RESULT_BACKEND"] = "redis://localhost:6379/0"
 os.environ["ALLOWED_HOSTS"] = "*"
+# Rate limiter тестується окремо на власному застосунку
+os.environ["RATE_LIMIT_ENABLED"] = "false"
 
 import asyncio
 from typing import AsyncGenerator, Generator
@@ -15,7 +17,7 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
-from app.database import get_db, Base
+from app.database import get_db, get_read_db, Base
 from app.core.security import get_password_hash
 from app.models.user import User
 
@@ -72,8 +74,9 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_get_db():
         yield db_session
     
-    # Замінюємо dependency get_db на тестову сесію
+    # Замінюємо dependency get_db (і get_read_db) на тестову сесію
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     
     # Використовуємо ASGITransport для FastAPI app
     transport = ASGITransport(app=app)
@@ -199,6 +202,19 @@ def mock_redis(monkeypatch):
     monkeypatch.setattr("redis.from_url", mock_from_url)
     return mock_redis_client
 
+@pytest.fixture(autouse=True)
+def clear_local_auth_state():
+    """Кеш авторизації і відкликання токенів не переживають тест (id користувачів повторюються)"""
+    from app.core.token_revocation import TokenRevocation
+    from app.core.user_cache import UserAuthCache
+
+    UserAuthCache.clear_local()
+    TokenRevocation.clear_local()
+    yield
+    UserAuthCache.clear_local()
+    TokenRevocation.clear_local()
+
+
 @pytest.fixture(autouse=True)
 async def clear_redis():
     """Очищає Redis перед кожним тестом (mocked)"""
@@ -1,11 +1,13 @@
 """Допоміжні функції для тестів"""
 import random
 import string
+from contextlib import contextmanager
 from decimal import Decimal
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 
 from app.core.security import get_password_hash, create_access_token
+from app.core.sql_tracing import QueryStats, install_sql_tracing, query_stats_var
 
 
 def generate_random_phone() -> str:
@@ -276,4 +278,30 @@ async def assert_response_error(response, expected_status: int, error_contains:
             f"Expected '{error_contains}' in error detail, got: {detail}"
 
 
-
+@contextmanager
+def query_budget(max_queries: int, n_plus_one_threshold: int = 3) -> Iterator[QueryStats]:
+    """Бюджет SQL запитів для блоку коду (зазвичай одного запиту до API).
+
+    Падає, якщо виконано більше max_queries запитів або однаковий SQL
+    повторився n_plus_one_threshold і більше разів (N+1):
+
+        with query_budget(4):
+            response = await client.get("/api/v1/users/me/addresses")
+    """
+    from tests.conftest import test_engine
+
+    install_sql_tracing(test_engine)
+    stats = QueryStats()
+    token = query_stats_var.set(stats)
+    try:
+        yield stats
+    finally:
+        query_stats_var.reset(token)
+
+    repeated = stats.repeated(n_plus_one_threshold) if n_plus_one_threshold else []
+    details = "".join(f"\n  {count} x {statement}" for statement, count in repeated)
+    assert not repeated, f"Ймовірний N+1 ({len(repeated)} повторюваних SQL):{details}"
+    statements = "".join(f"\n  {count} x {statement}" for statement, count in stats.statements.items())
+    assert stats.count <= max_queries, (
+        f"Виконано {stats.count} SQL запитів, бюджет {max_queries}:{statements}"
+    )